@@ -0,0 +1,248 @@
+"""
+Cache reads that survive hot keys expiring under load.
+
+``get_or_compute(key, compute, timeout)`` returns the cached value or stores
+``compute()``. Three things keep a popular key from stampeding the database
+when it expires (say the course page at the start of an exam):
+
+* Probabilistic early expiration ("XFetch"): entries are stored with the time
+  their computation took, and a reader recomputes slightly before expiry with
+  a probability that rises as expiry approaches and with the cost of the
+  computation, so one request refreshes the key while the rest still hit.
+* Request coalescing: only one thread per process computes a key at a time,
+  and a short lock taken with ``cache.add`` does the same across processes.
+  Everyone else gets the old value if there is one, or waits for the winner.
+  The cross-process lock needs a backend whose ``add`` is atomic (Redis,
+  Memcached, the database cache). The default file cache checks then
+  writes, so there it narrows the race without excluding other processes;
+  coalescing is only guaranteed per process.
+* Hit, miss and compute-time counters per key family in ``metrics``, served
+  by the staff-only ``/_profiling/cache/`` endpoint. They are per process.
+
+A ``compute`` that returns None is not cached. Entries are plain cache keys,
+so invalidation is still ``cache.delete(key)``.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache as default_cache
+
+LOCK_SUFFIX = ":compute-lock"
+LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+EVENTS = ("hits", "misses", "early", "stale", "coalesced")
+
+
+class CacheMetrics:
+    """Thread-safe counters per key family (``lms:course-summary`` and so on)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = defaultdict(Counter)
+        self._compute_time = Counter()
+
+    def record(self, name, event):
+        with self._lock:
+            self._events[name][event] += 1
+
+    def record_compute(self, name, seconds):
+        with self._lock:
+            self._events[name]["computes"] += 1
+            self._compute_time[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._events.clear()
+            self._compute_time.clear()
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for name, counts in sorted(self._events.items()):
+                lookups = counts["hits"] + counts["misses"] + counts["early"]
+                computes = counts["computes"]
+                result[name] = {
+                    **{event: counts[event] for event in EVENTS},
+                    "computes": computes,
+                    "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else None,
+                    "mean_compute_ms": (
+                        round(self._compute_time[name] * 1000 / computes, 3) if computes else None
+                    ),
+                }
+            return result
+
+
+metrics = CacheMetrics()
+
+
+def metric_name(key):
+    """Key family used for metrics: the first two ``:`` separated parts."""
+    return ":".join(key.split(":")[:2])
+
+
+def _fresh(entry, beta):
+    _, delta, expires_at = entry
+    if expires_at is None:
+        return True
+    # -log(u) for u in (0, 1] is an exponential draw; costly entries go early.
+    return time.time() - delta * beta * math.log(1.0 - random.random()) < expires_at
+
+
+def _entry(value, delta, timeout):
+    return (value, delta, None if timeout is None else time.time() + timeout)
+
+
+def store(key, value, timeout, *, cache=None):
+    """Write ``value`` the way ``get_or_compute`` reads it, e.g. to prime a key."""
+    cache = default_cache if cache is None else cache
+    cache.set(key, _entry(value, 0.0, timeout), timeout)
+
+
+def _lookup(cache, key, beta, name):
+    """Return ``(value, stale_entry)``; value is the cached one on a fresh hit."""
+    entry = cache.get(key)
+    if entry is not None and _fresh(entry, beta):
+        metrics.record(name, "hits")
+        return entry[0], None
+    metrics.record(name, "early" if entry is not None else "misses")
+    return None, entry
+
+
+async def _alookup(cache, key, beta, name):
+    entry = await cache.aget(key)
+    if entry is not None and _fresh(entry, beta):
+        metrics.record(name, "hits")
+        return entry[0], None
+    metrics.record(name, "early" if entry is not None else "misses")
+    return None, entry
+
+
+# Keys being computed in this process, each with an event set when it is done.
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _join_flight(key):
+    """Return None if the caller should compute ``key``, else the event to wait on."""
+    with _flights_lock:
+        event = _flights.get(key)
+        if event is None:
+            _flights[key] = threading.Event()
+        return event
+
+
+def _end_flight(key):
+    with _flights_lock:
+        _flights.pop(key).set()
+
+
+def _compute(cache, key, compute, timeout, name):
+    started = time.perf_counter()
+    value = compute()
+    delta = time.perf_counter() - started
+    metrics.record_compute(name, delta)
+    if value is not None:
+        cache.set(key, _entry(value, delta, timeout), timeout)
+    return value
+
+
+def _wait_for(cache, key, lock_timeout):
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _lead(cache, key, compute, timeout, stale, lock_timeout, name):
+    # Best effort unless cache.add is atomic; see the module docstring.
+    lock = key + LOCK_SUFFIX
+    locked = cache.add(lock, 1, lock_timeout)
+    if not locked:
+        # Another process is computing this key.
+        if stale is not None:
+            metrics.record(name, "stale")
+            return stale[0]
+        entry = _wait_for(cache, key, lock_timeout)
+        if entry is not None:
+            metrics.record(name, "coalesced")
+            return entry[0]
+        # The other process died or is too slow; compute it here.
+    try:
+        return _compute(cache, key, compute, timeout, name)
+    finally:
+        if locked:
+            cache.delete(lock)
+
+
+def get_or_compute(key, compute, timeout, *, cache=None, name=None, beta=1.0,
+                   lock_timeout=LOCK_TIMEOUT):
+    """
+    Return the value cached under ``key``, computing and storing it with
+    ``compute()`` on a miss or an early expiration. ``beta`` > 1 favours
+    earlier recomputation, 0 turns it off.
+    """
+    cache = default_cache if cache is None else cache
+    name = name or metric_name(key)
+    value, stale = _lookup(cache, key, beta, name)
+    if stale is None and value is not None:
+        return value
+
+    event = _join_flight(key)
+    if event is not None:
+        # Another thread in this process is computing it.
+        if stale is not None:
+            metrics.record(name, "stale")
+            return stale[0]
+        event.wait(lock_timeout)
+        entry = cache.get(key)
+        if entry is not None:
+            metrics.record(name, "coalesced")
+            return entry[0]
+        return _compute(cache, key, compute, timeout, name)
+    try:
+        return _lead(cache, key, compute, timeout, stale, lock_timeout, name)
+    finally:
+        _end_flight(key)
+
+
+async def aget_or_compute(key, compute, timeout, *, cache=None, name=None, beta=1.0,
+                          lock_timeout=LOCK_TIMEOUT):
+    """``get_or_compute`` for a coroutine function ``compute``; coalesces via the cache lock."""
+    cache = default_cache if cache is None else cache
+    name = name or metric_name(key)
+    value, stale = await _alookup(cache, key, beta, name)
+    if stale is None and value is not None:
+        return value
+
+    lock = key + LOCK_SUFFIX
+    locked = await cache.aadd(lock, 1, lock_timeout)
+    if not locked:
+        if stale is not None:
+            metrics.record(name, "stale")
+            return stale[0]
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            entry = await cache.aget(key)
+            if entry is not None:
+                metrics.record(name, "coalesced")
+                return entry[0]
+    try:
+        started = time.perf_counter()
+        value = await compute()
+        delta = time.perf_counter() - started
+        metrics.record_compute(name, delta)
+        if value is not None:
+            await cache.aset(key, _entry(value, delta, timeout), timeout)
+        return value
+    finally:
+        if locked:
+            await cache.adelete(lock)
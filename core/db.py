@@ -0,0 +1,88 @@
+"""
+Database profile helpers.
+
+* ``ReplicaRouter`` sends reads to the ``settings.DATABASE_REPLICA`` alias
+  while a view wrapped in ``read_replica`` runs, and everything else
+  (including every write) to ``default``. Without a replica alias in
+  ``DATABASES`` it routes nothing and Django uses ``default``.
+* ``configure_sqlite`` applies ``settings.SQLITE_PRAGMAS`` to every new SQLite
+  connection (WAL, a busy timeout, relaxed fsync), so readers stop blocking
+  the single writer during submission bursts.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when there is none."""
+    alias = getattr(settings, "DATABASE_REPLICA", "replica")
+    return alias if alias in connections.settings else None
+
+
+@contextmanager
+def use_replica():
+    """Route reads in this block (and tasks it spawns) to the replica."""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def read_replica(view):
+    """Serve a read-only view (sync or async) from the replica."""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with use_replica():
+                return await view(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas follow the primary; never migrate them directly.
+        if db == replica_alias():
+            return False
+        return None
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """``connection_created`` receiver applying ``settings.SQLITE_PRAGMAS``."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
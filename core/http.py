@@ -0,0 +1,87 @@
+"""
+Conditional GET for pages whose content is described by a version stamp.
+
+``conditional_page(stamp)`` wraps a sync or async view. ``stamp(*args,
+**kwargs)`` gets the view's URL arguments and returns ``(token,
+last_modified)`` (or None to skip, e.g. for a missing object); it should cost
+at most one cheap query. The strong ETag hashes the token with the path, the
+user and the CSRF cookie, because the rendered page includes all three. A
+matching ``If-None-Match`` or ``If-Modified-Since`` gets a 304 before the
+view runs, so no template is rendered.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def page_etag(request, token):
+    messages = getattr(request, "_messages", None)
+    if messages is not None and len(messages):
+        # Pending flash messages are part of the page; render it fresh.
+        return None
+    user = getattr(request, "user", None)
+    raw = "|".join(
+        [
+            request.get_full_path(),
+            str(user.pk if user is not None and user.is_authenticated else ""),
+            request.META.get("CSRF_COOKIE", ""),
+            token,
+        ]
+    )
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _conditional(request, stamp):
+    """Return ``(response, etag, last_modified)``; response is a 304/412 or None."""
+    if request.method not in ("GET", "HEAD") or stamp is None:
+        return None, None, None
+    token, modified = stamp
+    etag = page_etag(request, token)
+    if etag is None:
+        return None, None, None
+    timestamp = int(modified.timestamp()) if modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return response, etag, timestamp
+
+
+def _finish(response, etag, timestamp):
+    if response.status_code in (200, 304) and etag:
+        response.headers.setdefault("ETag", etag)
+        if timestamp:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def conditional_page(stamp_func):
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                stamp = None
+                if request.method in ("GET", "HEAD"):
+                    stamp = await sync_to_async(stamp_func)(*args, **kwargs)
+                response, etag, timestamp = await sync_to_async(_conditional)(request, stamp)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, timestamp)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            stamp = stamp_func(*args, **kwargs) if request.method in ("GET", "HEAD") else None
+            response, etag, timestamp = _conditional(request, stamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(response, etag, timestamp)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,66 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .profiling import QueryCollector, registry
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfilerMiddleware:
+    """
+    Record SQL query count, DB time, repeated queries and latency per request.
+
+    Results are aggregated per URL name in ``core.profiling.registry`` and
+    returned to the client as a ``Server-Timing`` header. A statement shape
+    repeated ``PROFILING_REPEAT_THRESHOLD`` times in one request is logged as
+    a likely N+1.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.repeat_threshold = getattr(settings, "PROFILING_REPEAT_THRESHOLD", 5)
+        self.server_timing = getattr(settings, "PROFILING_SERVER_TIMING", True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with QueryCollector() as collector:
+            response = self.get_response(request)
+        return self.finish(request, response, collector, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with QueryCollector() as collector:
+            response = await self.get_response(request)
+        return self.finish(request, response, collector, started)
+
+    def finish(self, request, response, collector, started):
+        latency_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, "resolver_match", None)
+        name = match.view_name if match else "<unresolved>"
+        registry.record(name, latency_ms, collector, self.repeat_threshold)
+
+        sql, repeats = collector.similar
+        if repeats >= self.repeat_threshold:
+            logger.warning(
+                "Possible N+1 in %s: %s queries, one statement ran %s times: %s",
+                name, collector.count, repeats, sql,
+            )
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={collector.duration * 1000:.2f};desc="{collector.count} queries"',
+                    f'dup;desc="{collector.duplicates} duplicate, {repeats} max repeats"',
+                    f"total;dur={latency_ms:.2f}",
+                ]
+            )
+        return response
@@ -0,0 +1,165 @@
+"""
+Per-request SQL and latency profiling.
+
+``QueryCollector`` hooks into every database connection with
+``execute_wrapper`` and records how many statements ran, how long they
+took and which ones were repeated verbatim (the N+1 signature).
+``registry`` aggregates the results per URL name into fixed-bucket
+histograms that the staff-only profiling endpoint serves.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connection, connections
+
+# Upper bounds in milliseconds (or query counts); the last bucket is open.
+LATENCY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class QueryCounter:
+    """Count the SQL statements executed on ``connection`` inside the block."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._wrapper.__exit__(*exc_info)
+
+
+class QueryCollector:
+    """Record count, time and repeats of the statements run on all connections."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql, repr(params)] += 1
+
+    @property
+    def duplicates(self):
+        """Statements that ran more than once with the same parameters."""
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    @property
+    def similar(self):
+        """The most repeated SQL text regardless of parameters, with its count."""
+        shapes = Counter()
+        for (sql, _), count in self.statements.items():
+            shapes[sql] += count
+        return shapes.most_common(1)[0] if shapes else (None, 0)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.samples = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.samples += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the given quantile."""
+        target = fraction * self.samples
+        seen = 0
+        for bound, count in zip(self.buckets + (None,), self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound if bound is not None else self.max
+        return 0
+
+    def as_dict(self):
+        labels = [f"<={bound}" for bound in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.samples,
+            "mean": self.total / self.samples if self.samples else 0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency_ms = Histogram(LATENCY_BUCKETS)
+        self.db_ms = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.requests_with_duplicates = 0
+        self.worst_duplicate = None
+
+    def as_dict(self):
+        return {
+            "latency_ms": self.latency_ms.as_dict(),
+            "db_ms": self.db_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+            "requests_with_duplicates": self.requests_with_duplicates,
+            "worst_duplicate": self.worst_duplicate,
+        }
+
+
+class ProfileRegistry:
+    """Process-wide aggregate of request profiles, keyed by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, name, latency_ms, collector, repeat_threshold):
+        sql, repeats = collector.similar
+        with self._lock:
+            stats = self._endpoints.setdefault(name, EndpointStats())
+            stats.latency_ms.observe(latency_ms)
+            stats.db_ms.observe(collector.duration * 1000)
+            stats.queries.observe(collector.count)
+            if collector.duplicates or repeats >= repeat_threshold:
+                stats.requests_with_duplicates += 1
+                if not stats.worst_duplicate or repeats > stats.worst_duplicate["count"]:
+                    stats.worst_duplicate = {"sql": sql, "count": repeats}
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = ProfileRegistry()
@@ -0,0 +1,44 @@
+"""
+Token-bucket rate limiting backed by the shared cache.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+second; every request takes one. The bucket is ``(tokens, updated_at)``
+under one cache key, so all workers sharing the cache share it. The
+read-modify-write is not atomic: two requests racing on one bucket can both
+take its last token, which is acceptable for throttling one user's clicks.
+"""
+
+import math
+import time
+
+from django.core.cache import cache as default_cache
+
+
+class TokenBucket:
+    def __init__(self, name, capacity, rate, cache=None):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+        self.cache = default_cache if cache is None else cache
+
+    def key(self, ident):
+        return f"ratelimit:{self.name}:{ident}"
+
+    def consume(self, ident, now=None):
+        """
+        Take a token for ``ident``. Returns 0 when the request may go ahead,
+        otherwise the seconds until a token is available. A bucket with no
+        capacity or no refill rate never limits.
+        """
+        if self.capacity <= 0 or self.rate <= 0:
+            return 0
+        now = time.time() if now is None else now
+        key = self.key(ident)
+        tokens, updated_at = self.cache.get(key) or (self.capacity, now)
+        tokens = min(self.capacity, tokens + max(now - updated_at, 0) * self.rate)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+        # Kept until the bucket would be full again; a missing key is full.
+        timeout = math.ceil((self.capacity - tokens + 1) / self.rate)
+        self.cache.set(key, (tokens - 1, now), timeout)
+        return 0
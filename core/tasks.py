@@ -0,0 +1,120 @@
+"""
+Pluggable background tasks.
+
+``enqueue(func, *args)`` runs ``func(*args)`` after the current transaction
+commits, on the backend named by ``settings.TASK_BACKEND``:
+
+* ``"celery"``: a Celery worker (``celery -A studybun worker``); needs
+  ``CELERY_BROKER_URL``.
+* ``"thread"``: a thread pool inside the web process.
+* ``"database"``: nothing runs now; the caller's own rows are the queue and
+  a management command drains them.
+* ``"immediate"``: inline, once the transaction commits (tests, debugging).
+
+Tasks are plain module-level functions referenced by dotted path, so they
+must be idempotent: the same call may run more than once.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional.
+    shared_task = None
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(path, args):
+    """Import and call a task function; used by every backend."""
+    try:
+        return import_string(path)(*args)
+    except Exception:
+        logger.exception("Background task %s%r failed", path, tuple(args))
+        raise
+
+
+if shared_task is not None:
+    celery_run_task = shared_task(name="core.run_task")(run_task)
+
+
+class ImmediateBackend:
+    def submit(self, path, args):
+        try:
+            run_task(path, args)
+        except Exception:
+            pass  # Logged by run_task; the caller's queue row is still pending.
+
+
+class ThreadBackend:
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "TASK_THREADS", 4), thread_name_prefix="task"
+        )
+
+    def submit(self, path, args):
+        self.executor.submit(self.run, path, args)
+
+    def run(self, path, args):
+        # Each pool thread has its own connections; recycle them like a request.
+        close_old_connections()
+        try:
+            run_task(path, args)
+        finally:
+            close_old_connections()
+
+
+class CeleryBackend:
+    def __init__(self):
+        if shared_task is None:
+            raise ImproperlyConfigured("TASK_BACKEND 'celery' needs Celery (pip install celery).")
+        # Configures the Celery app from the CELERY_* settings.
+        import studybun.celery  # noqa: F401
+
+    def submit(self, path, args):
+        celery_run_task.delay(path, list(args))
+
+
+class DatabaseBackend:
+    def submit(self, path, args):
+        pass
+
+
+BACKENDS = {
+    "immediate": ImmediateBackend,
+    "thread": ThreadBackend,
+    "celery": CeleryBackend,
+    "database": DatabaseBackend,
+}
+
+_backends = {}
+_lock = threading.Lock()
+
+
+def backend_name():
+    name = getattr(settings, "TASK_BACKEND", "")
+    if name:
+        return name
+    return "celery" if getattr(settings, "CELERY_BROKER_URL", "") else "thread"
+
+
+def get_backend():
+    name = backend_name()
+    with _lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def enqueue(func, *args):
+    """Run ``func(*args)`` in the background once the transaction commits."""
+    path = f"{func.__module__}.{func.__qualname__}"
+    backend = get_backend()
+    transaction.on_commit(lambda: backend.submit(path, args))
@@ -0,0 +1,29 @@
+"""
+Keep tests and benchmarks off the shared cache.
+
+``CACHES`` in settings is shared by every process on the machine (or
+cluster). Tests and the benchmark commands create rows that are rolled back
+or deleted, and SQLite hands their ids out again, so anything they cached
+would later be served for real rows. ``isolated_cache`` gives a block (or a
+test class) its own empty in-process cache instead; ``TestCase`` is Django's
+with it applied, for every test module to use.
+"""
+
+from django.test import TestCase as DjangoTestCase, override_settings
+
+
+def isolated_cache(name):
+    """``override_settings`` giving its block a private, empty locmem cache."""
+    return override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": name,
+            }
+        }
+    )
+
+
+@isolated_cache("tests")
+class TestCase(DjangoTestCase):
+    pass
@@ -1,3 +1,186 @@
-from django.test import TestCase
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from .cache import LOCK_SUFFIX, aget_or_compute, get_or_compute, metrics
+from .db import ReplicaRouter, read_replica, use_replica
+from .middleware import QueryProfilerMiddleware
+from .profiling import QueryCollector, registry
+from .ratelimit import TokenBucket
+from .testing import TestCase
+
+
+class QueryProfilerTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.staff = get_user_model().objects.create_user(
+            email="staff@example.com", password="pw", full_name="Staff", is_staff=True
+        )
+
+    def test_collector_counts_repeated_statements(self):
+        with QueryCollector() as collector:
+            with connection.cursor() as cursor:
+                for value in (1, 1, 2):
+                    cursor.execute("SELECT %s", [value])
+        self.assertEqual(collector.count, 3)
+        self.assertEqual(collector.duplicates, 1)
+        self.assertEqual(collector.similar[1], 3)
+
+    def test_server_timing_header_and_registry(self):
+        response = self.client.get("/login/")
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn("login", registry.snapshot())
+
+    @override_settings(PROFILING_REPEAT_THRESHOLD=3)
+    def test_repeated_queries_flagged(self):
+        def view(request):
+            for pk in range(4):
+                get_user_model().objects.filter(pk=pk).first()
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        with self.assertLogs("core.middleware", "WARNING"):
+            response = QueryProfilerMiddleware(view)(request)
+        self.assertIn("4 max repeats", response["Server-Timing"])
+        stats = registry.snapshot()["<unresolved>"]
+        self.assertEqual(stats["requests_with_duplicates"], 1)
+        self.assertEqual(stats["queries"]["count"], 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/_profiling/").status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get("/_profiling/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("endpoints", response.json())
+
+
+class DatabaseProfileTests(TestCase):
+    def test_sqlite_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_router_without_replica_uses_default(self):
+        router = ReplicaRouter()
+        with use_replica():
+            self.assertIsNone(router.db_for_read(None))
+        self.assertEqual(router.db_for_write(None), "default")
+
+    def test_read_views_go_to_replica(self):
+        router = ReplicaRouter()
+
+        @read_replica
+        def view(request):
+            return router.db_for_read(None)
+
+        @read_replica
+        async def async_view(request):
+            return router.db_for_read(None)
+
+        with mock.patch.dict(connections.settings, {"replica": {}}):
+            self.assertEqual(view(None), "replica")
+            self.assertEqual(async_to_sync(async_view)(None), "replica")
+            self.assertIsNone(router.db_for_read(None))
+            self.assertEqual(router.db_for_write(None), "default")
+            self.assertFalse(router.allow_migrate("replica", "lms"))
+            self.assertIsNone(router.allow_migrate("default", "lms"))
+
+
+class GetOrComputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_miss_then_hit(self):
+        self.assertEqual(get_or_compute("test:value:1", self.compute, 60), 1)
+        self.assertEqual(get_or_compute("test:value:1", self.compute, 60), 1)
+        stats = metrics.snapshot()["test:value"]
+        self.assertEqual((stats["misses"], stats["hits"], stats["computes"]), (1, 1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_none_is_not_cached(self):
+        get_or_compute("test:none", lambda: None, 60)
+        self.assertIsNone(cache.get("test:none"))
+
+    def test_early_expiration_recomputes(self):
+        get_or_compute("test:value", self.compute, 60)
+        with mock.patch("core.cache.random.random", return_value=0.5):
+            self.assertEqual(get_or_compute("test:value", self.compute, 60, beta=1e9), 2)
+        self.assertEqual(metrics.snapshot()["test:value"]["early"], 1)
+
+    def test_stale_value_served_while_another_process_computes(self):
+        get_or_compute("test:value", self.compute, 60)
+        cache.add("test:value" + LOCK_SUFFIX, 1)
+        with mock.patch("core.cache.random.random", return_value=0.5):
+            self.assertEqual(get_or_compute("test:value", self.compute, 60, beta=1e9), 1)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(metrics.snapshot()["test:value"]["stale"], 1)
+
+    def test_concurrent_misses_compute_once(self):
+        barrier = threading.Barrier(6)
+        results = []
+
+        def slow():
+            time.sleep(0.2)
+            return self.compute()
+
+        def read():
+            barrier.wait()
+            results.append(get_or_compute("test:hot", slow, 60))
+
+        threads = [threading.Thread(target=read) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1] * 6)
+        self.assertEqual(self.calls, 1)
+
+    def test_async_compute(self):
+        async def compute():
+            return self.compute()
+
+        self.assertEqual(async_to_sync(aget_or_compute)("test:async", compute, 60), 1)
+        self.assertEqual(async_to_sync(aget_or_compute)("test:async", compute, 60), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        get_or_compute("test:value", self.compute, 60)
+        self.assertEqual(self.client.get("/_profiling/cache/").status_code, 302)
+        staff = get_user_model().objects.create_user(
+            email="staff@example.com", password="pw", full_name="Staff", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get("/_profiling/cache/")
+        self.assertEqual(response.json()["caches"]["test:value"]["misses"], 1)
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket("test", capacity=2, rate=0.5)
+        self.assertEqual([bucket.consume(1, now=100) for _ in range(2)], [0, 0])
+        self.assertEqual(bucket.consume(1, now=100), 2.0)
+        self.assertEqual(bucket.consume(2, now=100), 0)
+        self.assertEqual(bucket.consume(1, now=102), 0)
+        self.assertEqual(bucket.consume(1, now=102), 2.0)
+
+    def test_zero_capacity_never_limits(self):
+        bucket = TokenBucket("test", capacity=0, rate=1)
+        self.assertEqual([bucket.consume(1) for _ in range(3)], [0, 0, 0])
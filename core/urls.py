@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("", views.profiling_stats, name="profiling_stats"),
+    path("cache/", views.cache_stats, name="cache_stats"),
+]
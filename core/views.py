@@ -0,0 +1,19 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .cache import metrics
+from .profiling import registry
+
+
+@staff_member_required
+def profiling_stats(request):
+    if request.method == "POST" and request.POST.get("reset"):
+        registry.reset()
+    return JsonResponse({"endpoints": registry.snapshot()})
+
+
+@staff_member_required
+def cache_stats(request):
+    if request.method == "POST" and request.POST.get("reset"):
+        metrics.reset()
+    return JsonResponse({"caches": metrics.snapshot()})
@@ -1,4 +1,10 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import QuestionImportForm
+from .importers import ImportFormatError, detect_format, import_questions
 from .models import (
     StudentProfile,
     Course,
@@ -57,6 +63,45 @@ class QuestionAdmin(admin.ModelAdmin):
     list_display = ('text', 'quiz')
     inlines = [ChoiceInline]
 
+    def get_urls(self):
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="lms_question_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect("admin:lms_question_changelist")
+        form = QuestionImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                fmt = form.cleaned_data["format"] or detect_format(upload.name)
+                result = import_questions(upload.file, fmt, dry_run=form.cleaned_data["dry_run"])
+            except ImportFormatError as exc:
+                form.add_error("file", str(exc))
+            else:
+                for line, message in result.errors[:20]:
+                    self.message_user(request, f"Line {line}: {message}", messages.WARNING)
+                self.message_user(
+                    request,
+                    f"{result.rows} rows read: {result.quizzes} quizzes, {result.questions} "
+                    f"questions and {result.choices} choices created, "
+                    f"{result.error_count} rows rejected.",
+                    messages.SUCCESS if not result.error_count else messages.WARNING,
+                )
+                return redirect("admin:lms_question_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Import questions",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/lms/question/import.html", context)
+
 @admin.register(Attempt)
 class AttemptAdmin(admin.ModelAdmin):
     list_display = ('user', 'quiz', 'score', 'coins_earned', 'attempted_at')
@@ -0,0 +1,106 @@
+# lms/analytics.py
+
+"""
+Pre-aggregated quiz analytics.
+
+``QuizStats`` and ``QuestionStats`` hold running totals (attempts, score sum,
+passes; answers and correct answers per question) so dashboards read one row
+per quiz instead of scanning ``Attempt`` and ``Answer``. ``record_attempt``
+adds one submission to the totals with a fixed number of statements;
+``rebuild`` recomputes every total from the raw rows, for backfills or when
+``settings.LMS_ANALYTICS_ON_SUBMIT`` is off and the totals are refreshed by a
+periodic job instead.
+"""
+
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+from .models import Answer, Attempt, QuestionStats, QuizStats
+
+PASS_MARK = 50
+
+
+def record_attempt(quiz_id, score, marks):
+    """
+    Add one graded attempt to the rollups.
+
+    ``marks`` is the ``(question_id, choice_id, is_correct)`` list from
+    ``grading.mark``. Runs four statements whatever the quiz size, in a short
+    transaction of its own. Call it after the attempt has committed (see
+    ``grading.submit_answers``): inside the attempt's transaction it would
+    hold the quiz's one stats row, or SQLite's write lock, for the whole
+    submission. An increment lost to a crash in between is restored by
+    ``rebuild``.
+    """
+    with transaction.atomic():
+        QuizStats.objects.bulk_create([QuizStats(quiz_id=quiz_id)], ignore_conflicts=True)
+        QuizStats.objects.filter(quiz_id=quiz_id).update(
+            attempts=F("attempts") + 1,
+            score_total=F("score_total") + score,
+            passed=F("passed") + int(score >= PASS_MARK),
+        )
+        if not marks:
+            return
+        question_ids = [question_id for question_id, _, _ in marks]
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id, quiz_id=quiz_id)
+             for question_id in question_ids],
+            ignore_conflicts=True,
+        )
+        right = [question_id for question_id, _, is_correct in marks if is_correct]
+        QuestionStats.objects.filter(question_id__in=question_ids).update(
+            answered=F("answered") + 1,
+            correct=F("correct") + Case(
+                When(question_id__in=right, then=Value(1)), default=Value(0)
+            ),
+        )
+
+
+def rebuild(batch_size=5000):
+    """
+    Recompute every rollup row from ``Attempt`` and ``Answer``.
+
+    The sums are done by ``GROUP BY`` queries in the database and written
+    back in batches. Returns ``(quizzes, questions)`` row counts.
+    """
+    quiz_rows = (
+        Attempt.objects.filter(quiz__isnull=False)
+        .order_by()
+        .values("quiz_id")
+        .annotate(
+            total=Count("id"),
+            score_sum=Sum("score"),
+            passes=Count("id", filter=Q(score__gte=PASS_MARK)),
+        )
+        .values_list("quiz_id", "total", "score_sum", "passes")
+    )
+    question_rows = (
+        Answer.objects.filter(question__quiz__isnull=False)
+        .order_by()
+        .values("question_id", "question__quiz_id")
+        .annotate(total=Count("id"), right=Count("id", filter=Q(is_correct=True)))
+        .values_list("question_id", "question__quiz_id", "total", "right")
+    )
+    quizzes = questions = 0
+    with transaction.atomic():
+        QuizStats.objects.all().delete()
+        QuestionStats.objects.all().delete()
+        rows = quiz_rows.iterator(chunk_size=batch_size)
+        while batch := list(islice(rows, batch_size)):
+            QuizStats.objects.bulk_create(
+                QuizStats(quiz_id=quiz_id, attempts=total, score_total=score_sum or 0,
+                          passed=passes)
+                for quiz_id, total, score_sum, passes in batch
+            )
+            quizzes += len(batch)
+        rows = question_rows.iterator(chunk_size=batch_size)
+        while batch := list(islice(rows, batch_size)):
+            QuestionStats.objects.bulk_create(
+                QuestionStats(question_id=question_id, quiz_id=quiz_id, answered=total,
+                              correct=right)
+                for question_id, quiz_id, total, right in batch
+            )
+            questions += len(batch)
+    return quizzes, questions
@@ -0,0 +1,102 @@
+# lms/async_views.py
+
+"""
+Async versions of the read-heavy LMS pages for ASGI deployments.
+
+They mirror the views in ``lms.views`` but use the async ORM, and issue the
+independent queries of a page together with ``asyncio.gather``. The URLconf
+serves them instead of the sync views when ``settings.LMS_ASYNC_VIEWS`` is
+on. Django 4.2 still runs each ORM query in its shared sync thread, so the
+gain comes from not blocking the event loop rather than from parallel SQL.
+"""
+
+import asyncio
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+from core.db import read_replica
+from core.http import conditional_page
+
+from . import leaderboard as ranking
+from .course_summary import aget_course_summary
+from .models import CourseCard, PDFResource, Quiz, Video
+from .pagination import apaginate
+from .versions import COURSES, PDFS, QUIZZES, VIDEOS, course_stamp, list_stamp
+from .views import course_context, leaderboard_queryset, leaders_version
+
+
+def async_login_required(view):
+    """``login_required`` for coroutine views (Django 4.2 only wraps sync ones)."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@async_login_required
+@read_replica
+@conditional_page(partial(list_stamp, COURSES))
+async def dashboard(request):
+    courses = await apaginate(request, CourseCard.objects.all(), ("pk",))
+    return render(request, "dashboard.html", {"courses": courses})
+
+
+@async_login_required
+@conditional_page(course_stamp)
+async def course_detail(request, course_id):
+    context = course_context(await aget_course_summary(course_id))
+    return render(request, "courses_details.html", context=context)
+
+
+@async_login_required
+@read_replica
+async def leaderboard(request):
+    user_id = request.user.pk
+
+    async def mine():
+        rank, coins = await sync_to_async(ranking.rank_of)(user_id)
+        neighbours = await sync_to_async(ranking.around)(user_id, rank=rank) if rank else []
+        return rank, coins, neighbours
+
+    leaders, (rank, coins, neighbours) = await asyncio.gather(
+        apaginate(
+            request, leaderboard_queryset(), ("-coins", "user_id"), settings.LEADERBOARD_SIZE
+        ),
+        mine(),
+    )
+    context = {
+        "leaders": leaders,
+        "leaders_version": leaders_version(leaders),
+        "my_rank": rank,
+        "my_coins": coins,
+        "neighbours": neighbours,
+    }
+    return render(request, "leaderboard.html", context)
+
+
+@async_login_required
+@read_replica
+@conditional_page(partial(list_stamp, VIDEOS, PDFS))
+async def lectures(request):
+    videos, pdfs = await asyncio.gather(
+        apaginate(request, Video.objects.all(), prefix="video_"),
+        apaginate(request, PDFResource.objects.all(), prefix="pdf_"),
+    )
+    return render(request, "lectures.html", {"videos": videos, "pdfs": pdfs})
+
+
+@async_login_required
+@read_replica
+@conditional_page(partial(list_stamp, QUIZZES))
+async def quiz_list(request):
+    quizzes = await apaginate(request, Quiz.objects.all())
+    return render(request, "quiz_list.html", {"quizzes": quizzes})
@@ -0,0 +1,57 @@
+# lms/auth.py
+
+"""
+Authentication backend that caches the logged-in user between requests.
+
+``AuthenticationMiddleware`` resolves ``request.user`` through the backend's
+``get_user`` on every request. ``CachedModelBackend`` serves it from the
+cache instead, loaded once with its ``student_profile`` so neither costs a
+query on a warm request. The cached copy is primed at login and dropped by
+the signals in ``lms.signals`` when the user or their profile is saved or
+deleted, and by ``credit_coins``. Bulk rewrites that bypass signals (such as
+``rebuild_coins``) leave cached profiles to expire after
+``USER_CACHE_TIMEOUT``.
+"""
+
+from functools import partial
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import get_or_compute, store
+
+from .models import CustomUser
+
+USER_CACHE_TIMEOUT = 15 * 60
+
+
+def user_cache_key(user_id):
+    return f"lms:auth-user:{user_id}"
+
+
+def load_user(user_id):
+    return CustomUser._default_manager.select_related("student_profile").filter(pk=user_id).first()
+
+
+def prime_user(user_id):
+    """Load the user into the cache, e.g. right after login."""
+    user = load_user(user_id)
+    if user is not None:
+        store(user_cache_key(user_id), user, USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(*user_ids):
+    """Drop the cached users now and again once the transaction commits."""
+    keys = [user_cache_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = get_or_compute(
+            user_cache_key(user_id), partial(load_user, user_id), USER_CACHE_TIMEOUT
+        )
+        return user if user is not None and self.user_can_authenticate(user) else None
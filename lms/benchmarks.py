@@ -0,0 +1,332 @@
+# lms/benchmarks.py
+
+"""
+Performance regression benchmarks for the lms views.
+
+``run`` drives every named route in ``lms.urls`` through the Django test
+client, recording the SQL statements each request runs and its median wall
+time. ``check`` compares a run against the query budgets below and against a
+stored baseline, so an N+1 or a slow sort shows up as a failure rather than
+in production.
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+
+from core.profiling import QueryCollector
+
+from .grading import load_answer_key, submit_answers
+from .models import Attempt, Course, CustomUser, Quiz, Submission
+from .urls import urlpatterns
+
+# Most queries each route may run. The session and user come from the cache
+# (cached_db sessions, lms.auth.CachedModelBackend), so they cost nothing
+# here. Budgets are per request and must not grow with the amount of data.
+QUERY_BUDGETS = {
+    "index": 0,
+    "dashboard": 2,
+    "course_detail": 6,
+    "leaderboard": 4,
+    "lectures": 3,
+    "quiz_list": 2,
+    "take_quiz": 3,
+    "take_quiz:submit": 13,
+    "submission_status": 1,
+    "quiz_result": 2,
+    "admin_dashboard": 0,
+    "admin_add_quiz": 0,
+    "admin_upload_video": 1,
+    "admin_upload_pdf": 1,
+    "admin_export_attempts": 1,
+    "admin_analytics": 1,
+    "admin_quiz_analytics": 2,
+    "admin_item_analysis": 5,
+    "student_dashboard": 4,
+    "api_courses": 1,
+    "api_videos": 1,
+    "api_pdfs": 1,
+    "api_quizzes": 1,
+    "api_leaderboard": 1,
+    "search": 1,
+    "api_search": 1,
+    "login": 0,
+    "logout": 2,
+    "signup": 0,
+}
+
+# Wall-time regressions smaller than this are treated as noise.
+NOISE_FLOOR_MS = 5.0
+STAFF_EMAIL = "benchmark-staff@example.com"
+
+
+class Fixtures:
+    """The users and objects the benchmark requests point at."""
+
+    def __init__(self):
+        attempt = Attempt.objects.select_related("quiz").order_by("-id").first()
+        if attempt is None:
+            raise ValueError("The benchmark needs at least one attempt; seed some data first.")
+        self.student = attempt.user
+        self.attempt_id = attempt.pk
+        self.quiz_id = attempt.quiz_id
+        self.course_id = attempt.quiz.course_id or Course.objects.values_list("pk", flat=True).first()
+        self.staff, _ = CustomUser.objects.get_or_create(
+            email=STAFF_EMAIL,
+            defaults={"full_name": "Benchmark Staff", "is_staff": True,
+                      "password": make_password(None)},
+        )
+        self.submission_id = Submission.objects.create(
+            user=self.student, quiz_id=self.quiz_id, answers={}
+        ).pk
+        key = load_answer_key(self.quiz_id)
+        self.answers = {
+            str(question_id): str(min(correct)) for question_id, correct in key.items() if correct
+        }
+
+    def cases(self):
+        """(name, who, method, path, data) for every benchmarked request."""
+        student, staff = "student", "staff"
+        return [
+            ("index", None, "get", reverse("index"), None),
+            ("dashboard", student, "get", reverse("dashboard"), None),
+            ("course_detail", student, "get", reverse("course_detail", args=[self.course_id]), None),
+            ("leaderboard", student, "get", reverse("leaderboard"), None),
+            ("search", student, "get", reverse("search"), {"q": "quiz check"}),
+            ("lectures", student, "get", reverse("lectures"), None),
+            ("quiz_list", student, "get", reverse("quiz_list"), None),
+            ("take_quiz", student, "get", reverse("take_quiz", args=[self.quiz_id]), None),
+            ("take_quiz:submit", student, "post", reverse("take_quiz", args=[self.quiz_id]),
+             self.answers),
+            ("submission_status", student, "get",
+             reverse("submission_status", args=[self.submission_id]), None),
+            ("quiz_result", student, "get", reverse("quiz_result", args=[self.attempt_id]), None),
+            ("admin_dashboard", staff, "get", reverse("admin_dashboard"), None),
+            ("admin_add_quiz", staff, "get", reverse("admin_add_quiz"), None),
+            ("admin_upload_video", staff, "get", reverse("admin_upload_video"), None),
+            ("admin_upload_pdf", staff, "get", reverse("admin_upload_pdf"), None),
+            ("admin_export_attempts", staff, "get", reverse("admin_export_attempts"),
+             {"format": "csv", "quiz": self.quiz_id}),
+            ("admin_analytics", staff, "get", reverse("admin_analytics"), None),
+            ("admin_quiz_analytics", staff, "get",
+             reverse("admin_quiz_analytics", args=[self.quiz_id]), None),
+            ("admin_item_analysis", staff, "get",
+             reverse("admin_item_analysis", args=[self.quiz_id]), None),
+            ("student_dashboard", student, "get", reverse("student_dashboard"), None),
+            ("api_courses", student, "get", reverse("api_courses"), None),
+            ("api_videos", student, "get", reverse("api_videos"), None),
+            ("api_pdfs", student, "get", reverse("api_pdfs"), None),
+            ("api_quizzes", student, "get", reverse("api_quizzes"), None),
+            ("api_leaderboard", student, "get", reverse("api_leaderboard"), None),
+            ("api_search", student, "get", reverse("api_search"), {"q": "lect"}),
+            ("login", None, "get", reverse("login"), None),
+            ("logout", student, "post", reverse("logout"), None),
+            ("signup", None, "get", reverse("signup"), None),
+        ]
+
+
+def uncovered_routes(cases):
+    """Named routes in ``lms.urls`` that no benchmark case exercises."""
+    covered = {name.split(":")[0] for name, *_ in cases}
+    return sorted({pattern.name for pattern in urlpatterns if pattern.name} - covered)
+
+
+def _request(client, method, path, data):
+    response = getattr(client, method)(path, data or {})
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    if response.status_code >= 400:
+        raise AssertionError(f"{method.upper()} {path} returned {response.status_code}")
+
+
+def _run_commit_hooks(start):
+    """
+    Run the ``on_commit`` callbacks queued since ``start``, as the request's
+    commit would. The benchmark's outer transaction is rolled back, so they
+    would otherwise never run and never be counted.
+    """
+    hooks = connection.run_on_commit
+    while len(hooks) > start:
+        _, callback, _ = hooks.pop(start)
+        callback()
+
+
+# Repeated submissions would trip the per-student rate limit.
+@override_settings(LMS_SUBMIT_BURST=0)
+def run(fixtures, repeat=5):
+    """Return ``{name: {"queries", "ms"}}``; queries is the worst of the runs."""
+    clients = {None: Client(), "student": Client(), "staff": Client()}
+    results = {}
+    for name, who, method, path, data in fixtures.cases():
+        queries, timings = 0, []
+        for _ in range(repeat):
+            client = clients[who]
+            if who:
+                # Logging out ends the session, so log in again every time.
+                client.force_login(getattr(fixtures, who))
+            hooks = len(connection.run_on_commit)
+            started = time.perf_counter()
+            with QueryCollector() as collector:
+                _request(client, method, path, data)
+                _run_commit_hooks(hooks)
+            timings.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, collector.count)
+        results[name] = {"queries": queries, "ms": round(statistics.median(timings), 3)}
+    return results
+
+
+def compare_fragments(fixtures, repeat=5):
+    """
+    Median wall time of every route with template fragment caching off and
+    on, as ``{name: {"off", "on", "saved"}}`` (``saved`` in ms). The "on"
+    run starts cold, so its first repetition fills the fragment cache.
+    """
+    with override_settings(LMS_FRAGMENT_CACHE_TIMEOUT=0):
+        off = run(fixtures, repeat)
+    on = run(fixtures, repeat)
+    return {
+        name: {"off": off[name]["ms"], "on": on[name]["ms"],
+               "saved": round(off[name]["ms"] - on[name]["ms"], 3)}
+        for name in on
+    }
+
+
+def check(results, baseline=None, tolerance=1.5):
+    """List the budget breaches and regressions against ``baseline``."""
+    failures = []
+    for name, result in results.items():
+        budget = QUERY_BUDGETS.get(name)
+        if budget is not None and result["queries"] > budget:
+            failures.append(f"{name}: {result['queries']} queries, budget is {budget}")
+        previous = (baseline or {}).get(name)
+        if not previous:
+            continue
+        if result["queries"] > previous["queries"]:
+            failures.append(
+                f"{name}: {result['queries']} queries, baseline was {previous['queries']}"
+            )
+        limit = max(previous["ms"] * tolerance, previous["ms"] + NOISE_FLOOR_MS)
+        if result["ms"] > limit:
+            failures.append(f"{name}: {result['ms']:.1f} ms, baseline was {previous['ms']:.1f} ms")
+    return failures
+
+
+def load_baseline(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)["results"]
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, meta):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def submission_throughput(quiz_id, users, answers, threads=8, per_thread=50):
+    """
+    Grade ``threads × per_thread`` submissions of ``answers`` from concurrent
+    threads, each with its own database connection, and return
+    ``{"submissions", "errors", "seconds", "per_second", "p50_ms", "p95_ms"}``.
+    Failed submissions (e.g. "database is locked") count as errors.
+    """
+    quiz = Quiz.objects.get(pk=quiz_id)
+    start = threading.Barrier(threads)
+    lock = threading.Lock()
+    timings, errors = [], []
+
+    def worker(offset):
+        try:
+            start.wait()
+            for n in range(per_thread):
+                user = users[(offset * per_thread + n) % len(users)]
+                began = time.perf_counter()
+                try:
+                    submit_answers(user, quiz, answers)
+                except DatabaseError as exc:
+                    with lock:
+                        errors.append(exc)
+                    continue
+                with lock:
+                    timings.append((time.perf_counter() - began) * 1000)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+    began = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - began
+    timings.sort()
+    return {
+        "submissions": len(timings),
+        "errors": len(errors),
+        "seconds": round(seconds, 3),
+        "per_second": round(len(timings) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(timings[len(timings) // 2], 2) if timings else None,
+        "p95_ms": round(timings[int(len(timings) * 0.95)], 2) if timings else None,
+    }
+
+
+# (SESSION_ENGINE, authentication backend) pairs compared by auth_overhead.
+AUTH_PROFILES = {
+    "db": ("django.contrib.sessions.backends.db", "django.contrib.auth.backends.ModelBackend"),
+    "cached_db": ("django.contrib.sessions.backends.cached_db",
+                  "django.contrib.auth.backends.ModelBackend"),
+    "cached_db+user_cache": ("django.contrib.sessions.backends.cached_db",
+                             "lms.auth.CachedModelBackend"),
+    "signed_cookies+user_cache": ("django.contrib.sessions.backends.signed_cookies",
+                                  "lms.auth.CachedModelBackend"),
+}
+
+
+def _resolve_user(request):
+    request.user.pk
+    return HttpResponse()
+
+
+def auth_overhead(user, requests=200):
+    """
+    Fixed cost of an authenticated request under every ``AUTH_PROFILES``
+    entry: only the session and authentication middleware run, resolving
+    ``request.user`` for a logged-in ``user``. Returns ``{name: {"queries",
+    "ms"}}`` with the worst query count and the median wall time.
+    """
+    factory = RequestFactory()
+    results = {}
+    for name, (engine, backend) in AUTH_PROFILES.items():
+        with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+            client = Client()
+            client.force_login(user, backend=backend)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+            middleware = SessionMiddleware(AuthenticationMiddleware(_resolve_user))
+            queries, timings = 0, []
+            for _ in range(requests):
+                request = factory.get("/")
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+                started = time.perf_counter()
+                with QueryCollector() as collector:
+                    middleware(request)
+                timings.append((time.perf_counter() - started) * 1000)
+                if not request.user.is_authenticated:
+                    raise AssertionError(f"{name}: the session did not authenticate")
+                queries = max(queries, collector.count)
+        results[name] = {"queries": queries, "ms": round(statistics.median(timings), 4)}
+    return results
@@ -0,0 +1,60 @@
+# lms/coins.py
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import leaderboard
+from .auth import invalidate_user
+from .models import Attempt, StudentProfile
+
+
+def credit_coins(user, amount):
+    """
+    Add ``amount`` coins to the user's profile with a single ``UPDATE``.
+
+    Callers run this in the same transaction as the ``Attempt`` insert so the
+    denormalized total never drifts from the attempt history.
+    """
+    if not amount:
+        return
+    updated = StudentProfile.objects.filter(user=user).update(coins=F("coins") + amount)
+    if not updated:
+        profile, _ = StudentProfile.objects.get_or_create(user=user)
+        StudentProfile.objects.filter(pk=profile.pk).update(coins=F("coins") + amount)
+    leaderboard.record_credit(user.pk, amount)
+    # The cached request.user carries the profile and its coin total.
+    invalidate_user(user.pk)
+
+
+def rebuild_coin_totals(batch_size=1000):
+    """
+    Recompute every ``StudentProfile.coins`` from ``Attempt`` history.
+
+    Profiles are created for users that have attempts but no profile, then
+    all totals are rewritten by one ``UPDATE`` with a correlated ``SUM``
+    subquery, so the work happens in the database rather than in Python.
+    Returns ``(created, updated)`` row counts.
+    """
+    missing = (
+        Attempt.objects.filter(user__isnull=False, user__student_profile__isnull=True)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    totals = (
+        Attempt.objects.filter(user_id=OuterRef("user_id"))
+        .order_by()
+        .values("user_id")
+        .annotate(total=Sum("coins_earned"))
+        .values("total")
+    )
+    with transaction.atomic():
+        created = len(
+            StudentProfile.objects.bulk_create(
+                [StudentProfile(user_id=user_id) for user_id in missing],
+                batch_size=batch_size,
+            )
+        )
+        updated = StudentProfile.objects.update(coins=Coalesce(Subquery(totals), Value(0)))
+    return created, updated
@@ -0,0 +1,106 @@
+# lms/course_cards.py
+
+"""
+The ``CourseCard`` read model behind the dashboard.
+
+One row per course holds the title, faculty display name, credits, semester
+and the unit, video, PDF, quiz and enrolled-student counts, so the dashboard
+is a primary-key range scan of one table with no joins or per-card queries.
+The signals in ``lms.signals`` call ``refresh`` for the courses a change
+touches; ``rebuild`` recomputes every card after bulk writes that skip
+signals (seeding, backfills).
+"""
+
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Course, CourseCard, PDFResource, Quiz, StudentProfile, Unit, Video
+from .versions import COURSES, bump
+
+Enrollment = StudentProfile.enrolled_courses.through
+
+COUNTED = (
+    ("units", Unit),
+    ("videos", Video),
+    ("pdfs", PDFResource),
+    ("quizzes", Quiz),
+    ("students", Enrollment),
+)
+FIELDS = ["title", "faculty_name", "credits", "semester", *(name for name, _ in COUNTED),
+          "updated_at"]
+
+
+def faculty_name(full_name, email):
+    return full_name or email or ""
+
+
+def _count(model):
+    rows = (
+        model.objects.filter(course_id=OuterRef("pk"))
+        .order_by()
+        .values("course_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _cards(courses):
+    """Yield an unsaved ``CourseCard`` per course, counts done by subqueries."""
+    now = timezone.now()
+    rows = courses.order_by("pk").annotate(
+        **{f"{name}_count": _count(model) for name, model in COUNTED}
+    ).values_list(
+        "pk", "title", "faculty__full_name", "faculty__email", "credits", "semester",
+        *(f"{name}_count" for name, _ in COUNTED),
+    )
+    for pk, title, full_name, email, credits, semester, *counts in rows.iterator():
+        yield CourseCard(
+            course_id=pk,
+            title=title or "",
+            faculty_name=faculty_name(full_name, email),
+            credits=credits,
+            semester=semester or "",
+            updated_at=now,
+            **dict(zip((name for name, _ in COUNTED), counts)),
+        )
+
+
+def refresh(*course_ids):
+    """Recompute the cards of ``course_ids`` with one read and one upsert."""
+    course_ids = {course_id for course_id in course_ids if course_id}
+    if not course_ids:
+        return
+    CourseCard.objects.bulk_create(
+        _cards(Course.objects.filter(pk__in=course_ids)),
+        update_conflicts=True,
+        unique_fields=["course"],
+        update_fields=FIELDS,
+    )
+    bump(COURSES)
+
+
+def rename_faculty(user):
+    """Copy a changed display name onto the cards of the user's courses."""
+    updated = CourseCard.objects.filter(course__faculty=user).update(
+        faculty_name=faculty_name(user.full_name, user.email), updated_at=timezone.now()
+    )
+    if updated:
+        bump(COURSES)
+
+
+def rebuild(batch_size=1000):
+    """Recompute every card from scratch; returns the number of cards."""
+    total = 0
+    with transaction.atomic():
+        CourseCard.objects.all().delete()
+        cards = _cards(Course.objects.all())
+        while batch := list(islice(cards, batch_size)):
+            CourseCard.objects.bulk_create(batch)
+            total += len(batch)
+    bump(COURSES)
+    return total
@@ -0,0 +1,86 @@
+# lms/course_summary.py
+
+import asyncio
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import aget_or_compute, get_or_compute
+
+from .models import Course
+
+COURSE_SUMMARY_TIMEOUT = 60 * 60
+
+
+def course_summary_cache_key(course_id):
+    return f"lms:course-summary:{course_id}"
+
+
+SECTIONS = ("units", "videos", "pdfs", "quizzes")
+
+
+def _summary(course, units, videos, pdfs, quizzes):
+    summary = {
+        "course": course,
+        "units": units,
+        "videos": videos,
+        "pdfs": pdfs,
+        "quizzes": quizzes,
+    }
+    summary["counts"] = {name: len(summary[name]) for name in SECTIONS}
+    return summary
+
+
+def build_course_summary(course_id):
+    """Load everything ``course_detail`` renders, or None if there is no such course."""
+    course = Course.objects.filter(pk=course_id).first()
+    if course is None:
+        return None
+    return _summary(course, *(list(getattr(course, name).all()) for name in SECTIONS))
+
+
+async def abuild_course_summary(course_id):
+    """``build_course_summary`` with the four resource queries issued concurrently."""
+    course = await Course.objects.filter(pk=course_id).afirst()
+    if course is None:
+        return None
+
+    async def fetch(name):
+        return [row async for row in getattr(course, name).all()]
+
+    return _summary(course, *await asyncio.gather(*(fetch(name) for name in SECTIONS)))
+
+
+def get_course_summary(course_id):
+    """
+    Return the cached course page payload.
+
+    A warm entry costs no queries; it is dropped by the signals in
+    ``lms.signals`` whenever the course or one of its units, videos, PDFs or
+    quizzes is saved or deleted.
+    """
+    return get_or_compute(
+        course_summary_cache_key(course_id),
+        partial(build_course_summary, course_id),
+        COURSE_SUMMARY_TIMEOUT,
+    )
+
+
+async def aget_course_summary(course_id):
+    return await aget_or_compute(
+        course_summary_cache_key(course_id),
+        partial(abuild_course_summary, course_id),
+        COURSE_SUMMARY_TIMEOUT,
+    )
+
+
+def invalidate_course_summary(course_id):
+    """
+    Drop the cached summary now and again once the current transaction
+    commits, so a summary rebuilt from the old rows before the commit (and
+    carrying the old ``Course.version``) is not kept.
+    """
+    key = course_summary_cache_key(course_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,124 @@
+# lms/exports.py
+
+"""
+Streaming export of ``Attempt`` history.
+
+Rows come from ``QuerySet.iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and are written out one chunk at a time, so memory stays flat
+regardless of how many attempts match.
+"""
+
+import csv
+import datetime
+import json
+from itertools import islice
+
+from django.utils import timezone
+
+from .models import Attempt
+
+COLUMNS = (
+    "id",
+    "user_id",
+    "user_email",
+    "quiz_id",
+    "quiz_title",
+    "course_id",
+    "score",
+    "coins_earned",
+    "attempted_at",
+)
+FIELDS = (
+    "id",
+    "user_id",
+    "user__email",
+    "quiz_id",
+    "quiz__title",
+    "quiz__course_id",
+    "score",
+    "coins_earned",
+    "attempted_at",
+)
+FORMATS = ("csv", "jsonl", "parquet")
+CHUNK_SIZE = 2000
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def attempt_rows(course_id=None, quiz_id=None, since=None, until=None, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over matching attempts as tuples in ``COLUMNS`` order.
+
+    ``since`` and ``until`` are dates; ``until`` is inclusive.
+    """
+    queryset = Attempt.objects.order_by("id").values_list(*FIELDS)
+    if course_id:
+        queryset = queryset.filter(quiz__course_id=course_id)
+    if quiz_id:
+        queryset = queryset.filter(quiz_id=quiz_id)
+    if since:
+        queryset = queryset.filter(attempted_at__gte=_start_of(since))
+    if until:
+        queryset = queryset.filter(attempted_at__lt=_start_of(until + datetime.timedelta(days=1)))
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row[:-1] + (_isoformat(row[-1]),))
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        record = dict(zip(COLUMNS, row))
+        record["attempted_at"] = _isoformat(record["attempted_at"])
+        yield json.dumps(record) + "\n"
+
+
+STREAMS = {"csv": csv_lines, "jsonl": jsonl_lines}
+CONTENT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def write_parquet(rows, path, chunk_size=CHUNK_SIZE):
+    """Write columnar Parquet, one row group per chunk. Needs pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("user_email", pa.string()),
+            ("quiz_id", pa.int64()),
+            ("quiz_title", pa.string()),
+            ("course_id", pa.int64()),
+            ("score", pa.int32()),
+            ("coins_earned", pa.int32()),
+            ("attempted_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        while chunk := list(islice(rows, chunk_size)):
+            arrays = [
+                pa.array(column, type=schema.field(index).type)
+                for index, column in enumerate(zip(*chunk))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(chunk)
+    return count
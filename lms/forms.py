@@ -73,3 +73,25 @@ class QuizForm(forms.ModelForm):
             "max_score": forms.NumberInput(attrs={"class": "form-control"}),
             "coins_reward": forms.NumberInput(attrs={"class": "form-control"}),
         }
+
+
+class QuestionImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV, JSON-lines or XLSX, one question per row.")
+    format = forms.ChoiceField(
+        choices=[
+            ("", "Detect from file name"),
+            ("csv", "CSV"),
+            ("jsonl", "JSON lines"),
+            ("xlsx", "XLSX"),
+        ],
+        required=False,
+    )
+    dry_run = forms.BooleanField(required=False, help_text="Only validate the file.")
+
+
+class AttemptExportForm(forms.Form):
+    format = forms.ChoiceField(choices=[("csv", "CSV"), ("jsonl", "JSON lines")], initial="csv")
+    course = forms.IntegerField(required=False, min_value=1)
+    quiz = forms.IntegerField(required=False, min_value=1)
+    since = forms.DateField(required=False)
+    until = forms.DateField(required=False)
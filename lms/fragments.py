@@ -0,0 +1,63 @@
+# lms/fragments.py
+
+"""
+Template fragment caching keyed on model versions.
+
+``{% load fragment_cache %}{% fragment "name" var1 var2 %}...{% endfragment %}``
+works like Django's ``{% cache %}`` tag, but the timeout comes from
+``settings.LMS_FRAGMENT_CACHE_TIMEOUT`` (0 turns fragment caching off) and
+the ``var`` arguments are expected to be version stamps: ``Course.version``
+for a course card or the unit accordion, the login state for the navbar, or
+``rows_version`` of a page of rows. Entries are never invalidated
+explicitly; a new version simply renders under a new key and the old entry
+expires. Reads go through ``core.cache.get_or_compute``, so an expiring
+fragment is re-rendered once rather than by every concurrent request.
+
+Fragments must not contain per-request data such as CSRF tokens.
+"""
+
+import hashlib
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import Node
+
+from core.cache import get_or_compute
+
+
+def fragment_cache():
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def rows_version(rows, *attrs):
+    """A short digest of ``attrs`` (dotted names allowed) over ``rows``."""
+    getters = [attrgetter(attr) for attr in attrs]
+    digest = hashlib.md5(usedforsecurity=False)
+    for row in rows:
+        digest.update(repr([getter(row) for getter in getters]).encode())
+    return digest.hexdigest()
+
+
+class FragmentNode(Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = settings.LMS_FRAGMENT_CACHE_TIMEOUT
+        if not timeout:
+            return self.nodelist.render(context)
+        key = make_template_fragment_key(self.name, [var.resolve(context) for var in self.vary_on])
+        return get_or_compute(
+            key,
+            lambda: self.nodelist.render(context),
+            timeout,
+            cache=fragment_cache(),
+            name=f"fragment:{self.name}",
+        )
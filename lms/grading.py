@@ -0,0 +1,154 @@
+# lms/grading.py
+
+import logging
+from dataclasses import dataclass
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.cache import get_or_compute
+from core.profiling import QueryCounter
+
+from . import analytics
+from .coins import credit_coins
+from .models import Answer, Attempt, Question
+
+logger = logging.getLogger(__name__)
+
+ANSWER_KEY_TIMEOUT = 60 * 60
+
+
+def answer_key_cache_key(quiz_id):
+    return f"lms:answer-key:v2:{quiz_id}"
+
+
+class AnswerKey(dict):
+    """
+    Maps every question id of a quiz to the frozenset of its correct choice
+    ids. ``choices`` maps every choice id of the quiz to its question id, so
+    submitted choices can be checked without another query.
+    """
+
+    def __init__(self, correct=(), choices=None):
+        super().__init__(correct)
+        self.choices = choices or {}
+
+
+def load_answer_key(quiz_id):
+    """
+    Fetch the answer key for a quiz in a single query.
+
+    Questions without a correct choice map to an empty set so they still
+    count towards the total.
+    """
+    rows = Question.objects.filter(quiz_id=quiz_id).values_list(
+        "id", "choices__id", "choices__is_correct"
+    )
+    key, choices = {}, {}
+    for question_id, choice_id, is_correct in rows:
+        correct = key.setdefault(question_id, set())
+        if choice_id is not None:
+            choices[choice_id] = question_id
+            if is_correct:
+                correct.add(choice_id)
+    return AnswerKey({question_id: frozenset(ids) for question_id, ids in key.items()}, choices)
+
+
+def get_answer_key(quiz_id):
+    return get_or_compute(
+        answer_key_cache_key(quiz_id), partial(load_answer_key, quiz_id), ANSWER_KEY_TIMEOUT
+    )
+
+
+def invalidate_answer_key(quiz_id):
+    """
+    Drop the cached key now and again once the current transaction commits;
+    a submission graded in between would otherwise re-cache the old key.
+    """
+    key = answer_key_cache_key(quiz_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def coins_for_score(score):
+    return 10 if score >= 80 else 5 if score >= 50 else 2
+
+
+def mark(answer_key, data):
+    """
+    Mark submitted answers in memory.
+
+    ``data`` maps question ids (as strings, like ``request.POST``) to the
+    selected choice id. Yields ``(question_id, choice_id, is_correct)`` for
+    every question of the quiz; ``choice_id`` is None when the question was
+    skipped or the submitted value is not one of its choices.
+    """
+    for question_id, correct_ids in answer_key.items():
+        try:
+            selected = int(data.get(str(question_id)))
+        except (TypeError, ValueError):
+            selected = None
+        if answer_key.choices.get(selected) != question_id:
+            selected = None
+        yield question_id, selected, selected in correct_ids
+
+
+@dataclass
+class GradedSubmission:
+    attempt: Attempt
+    correct: int
+    total: int
+    queries: int
+
+    @property
+    def score(self):
+        return self.attempt.score
+
+    @property
+    def coins(self):
+        return self.attempt.coins_earned
+
+
+def submit_answers(user, quiz, data, token=None):
+    """
+    Grade a submission and record the ``Attempt`` and its ``Answer`` rows.
+
+    ``token`` is the form's submission token; a second attempt with the same
+    user, quiz and token violates a unique constraint and raises
+    ``IntegrityError`` with nothing written.
+
+    The answer key comes from the cache (or one query on a miss), grading
+    happens in memory and the attempt, its answers and the coin credit are
+    written in a single transaction, so the number of queries does not
+    depend on the number of questions. The analytics rollups are applied
+    once that transaction commits, so submissions to one quiz do not queue
+    on its stats row while they are being written.
+    """
+    with QueryCounter() as counter:
+        marks = list(mark(get_answer_key(quiz.id), data))
+        correct, total = sum(is_correct for _, _, is_correct in marks), len(marks)
+        score = int((correct / total) * 100) if total else 0
+        with transaction.atomic():
+            attempt = Attempt.objects.create(
+                user=user, quiz=quiz, score=score, coins_earned=coins_for_score(score),
+                submission_token=token,
+            )
+            Answer.objects.bulk_create(
+                Answer(attempt=attempt, question_id=question_id, choice_id=choice_id,
+                       is_correct=is_correct)
+                for question_id, choice_id, is_correct in marks
+            )
+            credit_coins(user, attempt.coins_earned)
+            if settings.LMS_ANALYTICS_ON_SUBMIT:
+                # Best effort: a failed rollup is logged, not raised into a graded
+                # submission; rebuild_analytics restores the totals.
+                transaction.on_commit(
+                    lambda: analytics.record_attempt(quiz.id, score, marks), robust=True
+                )
+    logger.debug(
+        "Graded quiz %s for user %s: %s/%s correct in %s queries",
+        quiz.id, user.pk, correct, total, counter.count,
+    )
+    return GradedSubmission(attempt, correct, total, counter.count)
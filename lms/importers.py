@@ -0,0 +1,261 @@
+# lms/importers.py
+
+"""
+Streaming bulk import of quizzes, questions and choices.
+
+Rows are read lazily from CSV, JSON-lines or XLSX files, validated a batch
+at a time and inserted with ``bulk_create`` in one transaction per batch, so
+memory stays flat however large the question bank is.
+
+Every row describes one question::
+
+    quiz, course_id, description, question, choice_1 ... choice_n, correct
+
+``correct`` is the 1-based number or letter of the right choice, or its
+text. JSON-lines rows use the same keys, with ``choices`` as a list.
+"""
+
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import transaction
+
+from . import course_cards, search
+from .course_summary import invalidate_course_summary
+from .models import Choice, Course, Question, Quiz
+from .signals import quiz_content_changed
+from .versions import QUIZZES, bump, bump_course
+
+FORMATS = ("csv", "jsonl", "xlsx")
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass
+class QuestionRow:
+    line: int
+    quiz: str
+    course_id: int
+    description: str
+    text: str
+    choices: list
+    correct: int
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    quizzes: int = 0
+    questions: int = 0
+    choices: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def detect_format(name):
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    fmt = {"json": "jsonl", "ndjson": "jsonl", "xlsm": "xlsx"}.get(extension, extension)
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Cannot tell the format of {name!r}; use one of {FORMATS}.")
+    return fmt
+
+
+def _text(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def read_csv(stream):
+    for line, row in enumerate(csv.DictReader(_text(stream)), start=2):
+        yield line, row
+
+
+def read_jsonl(stream):
+    for line, raw in enumerate(_text(stream), start=1):
+        if raw.strip():
+            try:
+                yield line, json.loads(raw)
+            except ValueError as exc:
+                yield line, {"__error__": f"invalid JSON: {exc}"}
+
+
+def read_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import needs openpyxl (pip install openpyxl).")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "xlsx": read_xlsx}
+
+
+def read_rows(stream, fmt):
+    return READERS[fmt](stream)
+
+
+def _choices(row):
+    if isinstance(row.get("choices"), list):
+        return [str(choice).strip() for choice in row["choices"] if str(choice).strip()]
+    numbered = sorted(
+        (int(key.split("_", 1)[1]), value)
+        for key, value in row.items()
+        if key and key.startswith("choice_") and key.split("_", 1)[1].isdigit()
+    )
+    return [str(value).strip() for _, value in numbered if value not in (None, "")]
+
+
+def _correct_index(value, choices):
+    value = "" if value is None else str(value).strip()
+    if value.isdigit() and 1 <= int(value) <= len(choices):
+        return int(value) - 1
+    if len(value) == 1 and value.isalpha() and ord(value.upper()) - 65 < len(choices):
+        return ord(value.upper()) - 65
+    if value in choices:
+        return choices.index(value)
+    raise ValueError(f"correct answer {value!r} does not match any choice")
+
+
+def parse_row(line, row):
+    """Validate one raw row into a ``QuestionRow``; raises ValueError."""
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+    quiz = str(row.get("quiz") or "").strip()
+    text = str(row.get("question") or "").strip()
+    if not quiz:
+        raise ValueError("missing quiz title")
+    if not text:
+        raise ValueError("missing question text")
+    if len(text) > Question._meta.get_field("text").max_length:
+        raise ValueError("question text is too long")
+    course_id = row.get("course_id")
+    course_id = int(course_id) if course_id not in (None, "") else None
+    choices = _choices(row)
+    if len(choices) < 2:
+        raise ValueError("a question needs at least two choices")
+    return QuestionRow(
+        line=line,
+        quiz=quiz,
+        course_id=course_id,
+        description=str(row.get("description") or "").strip(),
+        text=text,
+        choices=choices,
+        correct=_correct_index(row.get("correct"), choices),
+    )
+
+
+class QuestionImporter:
+    def __init__(self, batch_size=1000, dry_run=False, progress=None):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.result = ImportResult()
+        self._quiz_ids = {}
+
+    def run(self, rows):
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+            if self.progress:
+                self.progress(self.result)
+        return self.result
+
+    def validate(self, batch):
+        valid = []
+        for line, raw in batch:
+            self.result.rows += 1
+            try:
+                valid.append(parse_row(line, raw))
+            except (TypeError, ValueError) as exc:
+                self.result.add_error(line, str(exc))
+        course_ids = {row.course_id for row in valid if row.course_id}
+        known = set(Course.objects.filter(pk__in=course_ids).values_list("pk", flat=True))
+        checked = []
+        for row in valid:
+            if row.course_id and row.course_id not in known:
+                self.result.add_error(row.line, f"course {row.course_id} does not exist")
+            else:
+                checked.append(row)
+        return checked
+
+    def resolve_quizzes(self, rows):
+        """Map (course_id, title) to quiz ids, creating missing quizzes in bulk."""
+        wanted = {(row.course_id, row.quiz): row for row in rows}
+        missing = [key for key in wanted if key not in self._quiz_ids]
+        if missing:
+            existing = Quiz.objects.filter(title__in={title for _, title in missing})
+            for quiz_id, course_id, title in existing.values_list("id", "course_id", "title"):
+                self._quiz_ids.setdefault((course_id, title), quiz_id)
+            new = [key for key in missing if key not in self._quiz_ids]
+            created = Quiz.objects.bulk_create(
+                [
+                    Quiz(
+                        course_id=course_id,
+                        title=title,
+                        description=wanted[course_id, title].description,
+                    )
+                    for course_id, title in new
+                ]
+            )
+            for key, quiz in zip(new, created):
+                self._quiz_ids[key] = quiz.pk
+                invalidate_course_summary(quiz.course_id)
+                if quiz.course_id:
+                    bump_course(quiz.course_id)
+            if created:
+                bump(QUIZZES)
+                course_cards.refresh(*(quiz.course_id for quiz in created))
+                search.index_objects(created)
+            self.result.quizzes += len(created)
+
+    def import_batch(self, batch):
+        rows = self.validate(batch)
+        if not rows or self.dry_run:
+            return
+        with transaction.atomic():
+            self.resolve_quizzes(rows)
+            questions = Question.objects.bulk_create(
+                [
+                    Question(quiz_id=self._quiz_ids[row.course_id, row.quiz], text=row.text)
+                    for row in rows
+                ]
+            )
+            choices = Choice.objects.bulk_create(
+                [
+                    Choice(question_id=question.pk, text=text, is_correct=index == row.correct)
+                    for row, question in zip(rows, questions)
+                    for index, text in enumerate(row.choices)
+                ]
+            )
+            search.index_objects(questions)
+        # bulk_create sends no signals, so drop the per-quiz caches here.
+        for quiz_id in {question.quiz_id for question in questions}:
+            quiz_content_changed(quiz_id)
+        self.result.questions += len(questions)
+        self.result.choices += len(choices)
+
+
+def import_questions(stream, fmt, batch_size=1000, dry_run=False, progress=None):
+    importer = QuestionImporter(batch_size=batch_size, dry_run=dry_run, progress=progress)
+    return importer.run(read_rows(stream, fmt))
@@ -0,0 +1,210 @@
+# lms/item_analysis.py
+
+"""
+Classical item analysis of quiz questions.
+
+For every question of a quiz this computes
+
+* the difficulty index: the share of attempts that answered it correctly;
+* the discrimination index: the point-biserial correlation between getting
+  the question right and the score on the rest of the quiz;
+* a distractor analysis: for every choice, how often it was picked, the mean
+  score of the students who picked it and the correlation between picking it
+  and the total score (good distractors correlate negatively).
+
+``Answer`` rows are read in chunks ordered by attempt. Each chunk of whole
+attempts becomes an attempts × questions 0/1 matrix, and only running sums
+are kept between chunks, so memory stays flat and the work is done by NumPy
+rather than a Python loop per answer.
+"""
+
+from dataclasses import dataclass, field
+from functools import partial
+
+import numpy as np
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from core.cache import get_or_compute
+
+from .models import Answer, Choice, Question, Quiz
+
+CHUNK_SIZE = 200000
+REPORT_TIMEOUT = 60 * 60 * 24
+# Questions outside these bounds are flagged for review.
+MIN_DIFFICULTY, MAX_DIFFICULTY = 0.2, 0.9
+MIN_DISCRIMINATION = 0.2
+
+
+@dataclass
+class ChoiceItem:
+    choice_id: int
+    text: str
+    is_correct: bool
+    picked: int
+    share: float
+    mean_score: float
+    discrimination: float
+
+    @property
+    def is_weak_distractor(self):
+        """A wrong choice that nobody picks or that strong students pick."""
+        return not self.is_correct and (self.picked == 0 or self.discrimination > 0)
+
+
+@dataclass
+class QuestionItem:
+    question_id: int
+    text: str
+    answered: int
+    difficulty: float
+    discrimination: float
+    choices: list = field(default_factory=list)
+
+    @property
+    def needs_review(self):
+        if not self.answered:
+            return False
+        return (
+            not MIN_DIFFICULTY <= self.difficulty <= MAX_DIFFICULTY
+            or self.discrimination < MIN_DISCRIMINATION
+        )
+
+
+@dataclass
+class ItemReport:
+    quiz_id: int
+    attempts: int
+    answers: int
+    questions: list = field(default_factory=list)
+
+
+def _correlation(n, sx, sy, sxy, sxx, syy):
+    """Vectorized Pearson correlation from running sums; NaN becomes 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+    return np.nan_to_num(r)
+
+
+def _chunks(quiz_id, chunk_size):
+    """Yield ``(attempt, question, correct, choice)`` int64 arrays of whole attempts."""
+    queryset = (
+        Answer.objects.filter(attempt__quiz_id=quiz_id)
+        .order_by("attempt_id")
+        .values_list("attempt_id", "question_id", "is_correct", Coalesce("choice_id", Value(-1)))
+    )
+    # Raw fetchmany skips building a Python object per row. Expressions come
+    # last in the SELECT, so keep the Coalesce at the end of values_list.
+    sql, params = queryset.query.sql_with_params()
+    carry = np.empty((0, 4), dtype=np.int64)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            chunk = np.concatenate([carry, np.array(rows, dtype=np.int64)])
+            # The last attempt may continue in the next chunk.
+            cut = np.searchsorted(chunk[:, 0], chunk[-1, 0])
+            carry = chunk[cut:]
+            if cut:
+                yield chunk[:cut]
+    if len(carry):
+        yield carry
+
+
+def analyse_quiz(quiz_id, chunk_size=CHUNK_SIZE):
+    """Return an ``ItemReport`` for one quiz."""
+    questions = list(
+        Question.objects.filter(quiz_id=quiz_id).order_by("id").values_list("id", "text")
+    )
+    choices = list(
+        Choice.objects.filter(question__quiz_id=quiz_id)
+        .order_by("id")
+        .values_list("id", "question_id", "text", "is_correct")
+    )
+    question_ids = np.array([question_id for question_id, _ in questions], dtype=np.int64)
+    choice_ids = np.array([row[0] for row in choices], dtype=np.int64)
+    nq, nc = len(question_ids), len(choice_ids)
+
+    # Running sums per question (answered, right, total, total², right × total)
+    # and per choice (picked, picked × total).
+    n, sx, st, stt, sxt = (np.zeros(nq) for _ in range(5))
+    picked, picked_t = np.zeros(nc), np.zeros(nc)
+    attempts = answers = 0
+
+    for chunk in _chunks(quiz_id, chunk_size):
+        chunk = chunk[np.isin(chunk[:, 1], question_ids)]
+        if not len(chunk):
+            continue
+        _, row = np.unique(chunk[:, 0], return_inverse=True)
+        col = np.searchsorted(question_ids, chunk[:, 1])
+        right = chunk[:, 2].astype(bool)
+
+        matrix = np.zeros((row.max() + 1, nq), dtype=np.int8)
+        matrix[row[right], col[right]] = 1
+        totals = matrix.sum(axis=1, dtype=np.float64)
+        t = totals[row]
+
+        n += np.bincount(col, minlength=nq)
+        sx += matrix.sum(axis=0)
+        st += np.bincount(col, weights=t, minlength=nq)
+        stt += np.bincount(col, weights=t * t, minlength=nq)
+        sxt += matrix.T @ totals
+
+        known = np.isin(chunk[:, 3], choice_ids)
+        position = np.searchsorted(choice_ids, chunk[known, 3])
+        picked += np.bincount(position, minlength=nc)
+        picked_t += np.bincount(position, weights=t[known], minlength=nc)
+
+        attempts += len(totals)
+        answers += len(chunk)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difficulty = np.nan_to_num(sx / n)
+    # Item-rest correlation: correlate with the score on the other questions,
+    # so the item does not correlate with itself. x² = x for a 0/1 item.
+    rest, rest_x = st - sx, sxt - sx
+    discrimination = _correlation(n, sx, rest, rest_x, sx, stt - 2 * sxt + sx)
+
+    index = {question_id: position for position, question_id in enumerate(question_ids)}
+    question_of = np.array([index[row[1]] for row in choices], dtype=np.int64)
+    nj = n[question_of]
+    choice_r = _correlation(nj, picked, st[question_of], picked_t, picked, stt[question_of])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.nan_to_num(picked / nj)
+        mean_score = np.nan_to_num(100 * picked_t / picked / max(nq, 1))
+
+    items = [
+        QuestionItem(
+            question_id=int(question_id),
+            text=text,
+            answered=int(n[position]),
+            difficulty=float(difficulty[position]),
+            discrimination=float(discrimination[position]),
+        )
+        for position, (question_id, text) in enumerate(questions)
+    ]
+    for position, (choice_id, _, text, is_correct) in enumerate(choices):
+        items[question_of[position]].choices.append(
+            ChoiceItem(
+                choice_id=choice_id,
+                text=text,
+                is_correct=bool(is_correct),
+                picked=int(picked[position]),
+                share=float(share[position]),
+                mean_score=float(mean_score[position]),
+                discrimination=float(choice_r[position]),
+            )
+        )
+    return ItemReport(quiz_id=quiz_id, attempts=attempts, answers=answers, questions=items)
+
+
+def get_report(quiz_id):
+    """
+    Cached ``analyse_quiz``. The key includes the attempt count from
+    ``QuizStats`` and the quiz's ``content_version``, so a new submission or
+    an edited question or choice makes the next request recompute.
+    """
+    row = Quiz.objects.filter(pk=quiz_id).values_list("content_version", "stats__attempts").first()
+    version, attempts = row or (0, 0)
+    key = f"lms:item-analysis:{quiz_id}:{version}:{attempts or 0}"
+    return get_or_compute(key, partial(analyse_quiz, quiz_id), REPORT_TIMEOUT)
@@ -0,0 +1,418 @@
+# lms/leaderboard.py
+
+"""
+Leaderboard of students by coins.
+
+``settings.LEADERBOARD_URL`` picks the backend:
+
+* empty (the default): ranks are read straight from ``StudentProfile.coins``,
+  so every worker sees every committed credit, but a rank lookup counts the
+  students ahead and costs O(rank);
+* ``redis://...``: a Redis sorted set shared by all workers, with O(log n)
+  rank lookups; use it in production once the cohort is large;
+* ``memory://``: an in-process sorted list, only correct with a single
+  process (``runserver``, one-worker deployments).
+
+The sorted sets are seeded from ``StudentProfile.coins`` on first use and
+then kept up to date by ``record_credit`` after every committed ``Attempt``.
+A Redis set is only seeded when its key is missing, by the one worker that
+takes the seed lock; ``rebuild`` (``manage.py rebuild_coins``) reloads it by
+building a new set under a temporary key and renaming it into place, so
+readers never see it empty.
+
+The leaderboard table itself is a keyset-paginated ``StudentProfile`` query
+(any page, not only the top one); the board answers "my rank" and the rows
+around it, so both order ties the same way, by user id.
+"""
+
+import threading
+import uuid
+from bisect import bisect_left, insort
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Func, OuterRef, Q, Subquery
+
+from .models import StudentProfile
+
+
+class InMemoryLeaderboard:
+    """
+    Sorted-set stand-in kept in process memory.
+
+    Entries are ``(-score, member)`` tuples in a sorted list, so rank lookups
+    are a binary search and ties go to the lower user id, the same order as
+    the leaderboard table's ``("-coins", "user_id")``. Only suitable for a
+    single process.
+    """
+
+    seeded = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scores = {}
+        self._entries = []
+
+    def _discard(self, member):
+        score = self._scores.pop(member, None)
+        if score is not None:
+            del self._entries[bisect_left(self._entries, (-score, member))]
+        return score
+
+    def set(self, member, score):
+        with self._lock:
+            self._discard(member)
+            self._scores[member] = score
+            insort(self._entries, (-score, member))
+
+    def set_many(self, mapping):
+        with self._lock:
+            for member in mapping:
+                self._discard(member)
+            self._scores.update(mapping)
+            # Appending a sorted run keeps the re-sort a linear merge.
+            self._entries.extend(sorted((-score, member) for member, score in mapping.items()))
+            self._entries.sort()
+
+    def load(self, batches):
+        """Replace the contents with the ``{member: score}`` batches."""
+        scores = {}
+        for batch in batches:
+            scores.update(batch)
+        entries = sorted((-score, member) for member, score in scores.items())
+        with self._lock:
+            self._scores, self._entries = scores, entries
+
+    def seed(self, batches):
+        self.load(batches)
+        return True
+
+    def incr(self, member, amount):
+        with self._lock:
+            score = (self._discard(member) or 0) + amount
+            self._scores[member] = score
+            insort(self._entries, (-score, member))
+            return score
+
+    def remove(self, member):
+        with self._lock:
+            self._discard(member)
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def rank(self, member):
+        """Zero-based rank of ``member`` (highest score first), or None."""
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return bisect_left(self._entries, (-score, member))
+
+    def position(self, member):
+        """``(rank, score)`` of ``member``, or None."""
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return bisect_left(self._entries, (-score, member)), score
+
+    def range(self, start, stop):
+        """Members ranked ``start`` to ``stop`` inclusive, as (member, score)."""
+        with self._lock:
+            return [(member, -score) for score, member in self._entries[start:stop + 1]]
+
+    def count(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+            self._entries.clear()
+
+
+class RedisLeaderboard:
+    """
+    The same interface on top of a Redis sorted set.
+
+    Scores are stored negated and members zero-padded, so the ascending
+    ``ZRANK``/``ZRANGE`` order (ties by member) is coins descending, then
+    user id ascending, like the in-memory board and the leaderboard table.
+    """
+
+    seeded = True
+    SEED_LOCK_TIMEOUT = 5 * 60
+
+    # A missing set is being seeded from the profiles, which already hold the
+    # credit; incrementing it would create a set with only this member.
+    INCR_IF_EXISTS = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        return redis.call('ZINCRBY', KEYS[1], ARGV[1], ARGV[2])
+    end
+    return false
+    """
+
+    def __init__(self, url, key="lms:leaderboard"):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.key = key
+        self._incr = self.redis.register_script(self.INCR_IF_EXISTS)
+
+    @staticmethod
+    def _member(member):
+        return f"{member:020d}"
+
+    def _add(self, key, mapping):
+        if mapping:
+            self.redis.zadd(key, {self._member(m): -score for m, score in mapping.items()})
+
+    def set(self, member, score):
+        self.redis.zadd(self.key, {self._member(member): -score})
+
+    def set_many(self, mapping):
+        self._add(self.key, mapping)
+
+    def incr(self, member, amount):
+        score = self._incr(keys=[self.key], args=[-amount, self._member(member)])
+        return None if score is None else -int(float(score))
+
+    def remove(self, member):
+        self.redis.zrem(self.key, self._member(member))
+
+    def score(self, member):
+        score = self.redis.zscore(self.key, self._member(member))
+        return None if score is None else -int(score)
+
+    def rank(self, member):
+        return self.redis.zrank(self.key, self._member(member))
+
+    def position(self, member):
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrank(self.key, self._member(member))
+        pipe.zscore(self.key, self._member(member))
+        rank, score = pipe.execute()
+        return None if rank is None else (rank, -int(score))
+
+    def range(self, start, stop):
+        return [
+            (int(member), -int(score))
+            for member, score in self.redis.zrange(self.key, start, stop, withscores=True)
+        ]
+
+    def count(self):
+        return self.redis.zcard(self.key)
+
+    def load(self, batches):
+        """Build the set under a temporary key and ``RENAME`` it over the live one."""
+        building = f"{self.key}:build:{uuid.uuid4().hex}"
+        try:
+            for batch in batches:
+                self._add(building, batch)
+            if self.redis.exists(building):
+                self.redis.rename(building, self.key)
+            else:
+                self.redis.delete(self.key)
+        finally:
+            self.redis.delete(building)
+
+    def seed(self, batches):
+        """Load the set unless it exists or another worker is loading it."""
+        if self.redis.exists(self.key):
+            return False
+        lock = f"{self.key}:seed-lock"
+        if not self.redis.set(lock, 1, nx=True, ex=self.SEED_LOCK_TIMEOUT):
+            return False
+        try:
+            if self.redis.exists(self.key):
+                return False
+            self.load(batches)
+            return True
+        finally:
+            self.redis.delete(lock)
+
+    def clear(self):
+        self.redis.delete(self.key)
+
+
+class DatabaseLeaderboard:
+    """
+    The same interface read from ``StudentProfile`` on every call.
+
+    There is no copy to seed or update, so the writes are no-ops. Each read
+    is one query, but ``position`` (and so ``rank_of``) counts every profile
+    ranked ahead of the user: O(rank) index entries, the whole table for the
+    last student. ``range`` seeks to an OFFSET and is O(start). Fine for a
+    small cohort; ``RedisLeaderboard`` is the O(log n) option.
+    """
+
+    seeded = False
+
+    def _profiles(self):
+        return StudentProfile.objects.filter(user__isnull=False, coins__isnull=False)
+
+    def set(self, member, score):
+        pass
+
+    def set_many(self, mapping):
+        pass
+
+    def incr(self, member, amount):
+        return self.score(member)
+
+    def remove(self, member):
+        pass
+
+    def score(self, member):
+        return self._profiles().filter(user_id=member).values_list("coins", flat=True).first()
+
+    def rank(self, member):
+        position = self.position(member)
+        return None if position is None else position[0]
+
+    def position(self, member):
+        ahead = (
+            self._profiles()
+            .filter(
+                Q(coins__gt=OuterRef("coins"))
+                | Q(coins=OuterRef("coins"), user_id__lt=OuterRef("user_id"))
+            )
+            .order_by()
+            .annotate(count=Func("pk", function="COUNT"))
+            .values("count")
+        )
+        return (
+            self._profiles()
+            .filter(user_id=member)
+            .annotate(ahead=Subquery(ahead))
+            .values_list("ahead", "coins")
+            .first()
+        )
+
+    def range(self, start, stop):
+        return list(
+            self._profiles()
+            .order_by("-coins", "user_id")
+            .values_list("user_id", "coins")[start:stop + 1]
+        )
+
+    def count(self):
+        return self._profiles().count()
+
+    def load(self, batches):
+        pass
+
+    def seed(self, batches):
+        return False
+
+    def clear(self):
+        pass
+
+
+_board = None
+_loaded = False
+_board_lock = threading.RLock()
+
+
+def get_board():
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                url = settings.LEADERBOARD_URL
+                scheme = url.partition("://")[0]
+                if scheme in ("redis", "rediss"):
+                    _board = RedisLeaderboard(url)
+                elif scheme == "memory":
+                    _board = InMemoryLeaderboard()
+                else:
+                    _board = DatabaseLeaderboard()
+    return _board
+
+
+def _profile_batches(batch_size):
+    rows = (
+        StudentProfile.objects.filter(user__isnull=False, coins__isnull=False)
+        .values_list("user_id", "coins")
+        .iterator(chunk_size=batch_size)
+    )
+    while batch := dict(islice(rows, batch_size)):
+        yield batch
+
+
+def rebuild(batch_size=5000):
+    """Reload the sorted set from ``StudentProfile.coins``, replacing it whole."""
+    global _loaded
+    get_board().load(_profile_batches(batch_size))
+    _loaded = True
+
+
+def ensure_loaded():
+    """Seed the board on first use. Returns True if this call seeded it."""
+    global _loaded
+    if _loaded:
+        return False
+    with _board_lock:
+        if _loaded:
+            return False
+        seeded = get_board().seed(_profile_batches(5000))
+        _loaded = True
+    return seeded
+
+
+def reset():
+    """Forget the loaded state so the next access reseeds (used by tests)."""
+    global _loaded
+    _loaded = False
+    get_board().clear()
+
+
+def record_credit(user_id, amount):
+    """Add ``amount`` to the user's score once the current transaction commits."""
+    if not get_board().seeded:
+        return
+
+    def apply():
+        # A fresh load already reads the committed total.
+        if not ensure_loaded():
+            get_board().incr(user_id, amount)
+
+    transaction.on_commit(apply)
+
+
+def _rows(entries, start):
+    profiles = StudentProfile.objects.select_related("user").in_bulk(
+        [member for member, _ in entries], field_name="user_id"
+    )
+    return [
+        {"rank": start + offset + 1, "user": profiles[member].user, "coins": score}
+        for offset, (member, score) in enumerate(entries)
+        if member in profiles
+    ]
+
+
+def rank_of(user_id):
+    """One-based rank and score of a user, or ``(None, None)``."""
+    ensure_loaded()
+    position = get_board().position(user_id)
+    if position is None:
+        return None, None
+    rank, score = position
+    return rank + 1, score
+
+
+def around(user_id, radius=2, rank=None):
+    """
+    The user's row plus ``radius`` neighbours on each side. Pass the user's
+    one-based ``rank`` from ``rank_of`` to save looking it up again.
+    """
+    ensure_loaded()
+    if rank is None:
+        rank = get_board().rank(user_id)
+        if rank is None:
+            return []
+    else:
+        rank -= 1
+    start = max(rank - radius, 0)
+    return _rows(get_board().range(start, rank + radius), start)
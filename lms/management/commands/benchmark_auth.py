@@ -0,0 +1,38 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.testing import isolated_cache
+from lms import benchmarks
+from lms.models import CustomUser, StudentProfile
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the fixed per-request cost of authentication (session load and "
+        "request.user) for each session engine and auth backend pairing in "
+        "lms.benchmarks.AUTH_PROFILES. Everything is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+
+    @isolated_cache("benchmark")
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create(
+                    email="benchmark-auth@example.com", full_name="Benchmark Auth",
+                    password=make_password(None),
+                )
+                StudentProfile.objects.create(user=user)
+                results = benchmarks.auth_overhead(user, options["requests"])
+                raise Rollback
+        except Rollback:
+            pass
+        for name, result in results.items():
+            self.stdout.write(f"{name:<28} {result['queries']:>3} queries  {result['ms']:>8.4f} ms")
@@ -0,0 +1,112 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.testing import isolated_cache
+from lms.models import Attempt, Choice, CourseCard, Question, StudentProfile, Unit
+from lms.pagination import PER_PAGE
+from lms.seeding import seed
+from lms.views import leaderboard_queryset
+
+
+class Rollback(Exception):
+    pass
+
+
+def hot_queries(sample):
+    """The queries behind each view, keyed by a short label."""
+    user_id, quiz_id, course_id = sample
+    # First keyset pages, as lms.pagination.paginate fetches them (one extra row).
+    return {
+        "dashboard": lambda: CourseCard.objects.order_by("pk")[:PER_PAGE + 1],
+        "leaderboard": lambda: leaderboard_queryset().order_by("-coins", "user_id")[
+            :settings.LEADERBOARD_SIZE + 1
+        ],
+        "course_detail units": lambda: Unit.objects.filter(course_id=course_id).order_by("order"),
+        "attempt history": lambda: Attempt.objects.filter(user_id=user_id, quiz_id=quiz_id)[:20],
+        "recent attempts": lambda: Attempt.objects.all()[:50],
+        "answer key": lambda: Question.objects.filter(quiz_id=quiz_id).values_list(
+            "id", "choices__id", "choices__is_correct"
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large dataset inside a transaction, then print query plans and "
+        "timings for the hot view queries with and without the lms indexes. "
+        "Everything is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=20000)
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument("--attempts", type=int, default=200000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    @isolated_cache("benchmark")
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        started = time.perf_counter()
+        counts = seed(
+            students=options["students"], courses=options["courses"],
+            attempts=options["attempts"],
+        )
+        self.stdout.write(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+        sample = (
+            Attempt.objects.values_list("user_id", "quiz_id", "quiz__course_id").first()
+        )
+        if sample is None:
+            raise CommandError("The hot queries need a sample attempt; use --attempts > 0.")
+        queries = hot_queries(sample)
+        indexed_models = [StudentProfile, Unit, Choice, Attempt]
+
+        self.toggle_indexes(indexed_models, "remove_sql")
+        self.analyze()
+        before = self.measure(queries, options["repeat"])
+
+        self.toggle_indexes(indexed_models, "create_sql")
+        self.analyze()
+        after = self.measure(queries, options["repeat"])
+
+        for label in queries:
+            (plan_before, ms_before), (plan_after, ms_after) = before[label], after[label]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}"))
+            self.stdout.write(f"  without indexes: {ms_before:8.3f} ms\n    {plan_before}")
+            self.stdout.write(f"  with indexes:    {ms_after:8.3f} ms\n    {plan_after}")
+
+    def toggle_indexes(self, models, method):
+        # Plain DDL statements: SQLite's schema editor refuses to run inside
+        # the enclosing transaction, but the statements themselves roll back.
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in models:
+                for index in model._meta.indexes:
+                    cursor.execute(str(getattr(index, method)(model, editor)))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def measure(self, queries, repeat):
+        results = {}
+        for label, build in queries.items():
+            plan = build().explain().replace("\n", "\n    ")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(build())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = (plan, statistics.median(timings))
+        return results
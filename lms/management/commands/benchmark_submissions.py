@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import override_settings
+
+from core.testing import isolated_cache
+from lms import benchmarks
+from lms.grading import load_answer_key
+from lms.models import Choice, CustomUser, Question, Quiz
+
+EMAIL = "benchmark-submit-{}@example.com"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent quiz-submission throughput against the configured "
+        "database: many threads grade submissions at once, each on its own "
+        "connection. On SQLite every journal mode in --journal-modes is run in "
+        "turn. The benchmark quiz, users and attempts are deleted afterwards, "
+        "but it does write to the database; point SQLITE_PATH at a copy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-thread", type=int, default=50)
+        parser.add_argument("--students", type=int, default=50)
+        parser.add_argument("--questions", type=int, default=10)
+        parser.add_argument("--journal-modes", default="delete,wal",
+                            help="SQLite only: comma-separated journal modes to compare.")
+
+    @isolated_cache("benchmark")
+    def handle(self, *args, **options):
+        quiz, users = self.setup(options["students"], options["questions"])
+        try:
+            key = load_answer_key(quiz.pk)
+            answers = {str(question_id): str(min(correct)) for question_id, correct in key.items()}
+            for label, overrides in self.profiles(options):
+                connections.close_all()
+                with override_settings(**overrides):
+                    result = benchmarks.submission_throughput(
+                        quiz.pk, users, answers, options["threads"], options["per_thread"]
+                    )
+                self.stdout.write(
+                    f"{label:<32} {result['per_second']:>8.1f}/s  "
+                    f"{result['submissions']:>5} ok  {result['errors']:>4} errors  "
+                    f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms"
+                )
+        finally:
+            connections.close_all()
+            quiz.delete()
+            CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def profiles(self, options):
+        """``(label, settings overrides)`` for every configuration to measure."""
+        database = settings.DATABASES["default"]
+        if connection.vendor != "sqlite":
+            pool = database.get("OPTIONS", {}).get("pool")
+            label = f"{connection.vendor} " + (
+                f"pool max {pool['max_size']}" if pool else f"conn_max_age {database.get('CONN_MAX_AGE', 0)}"
+            )
+            yield label, {}
+            return
+        for mode in options["journal_modes"].split(","):
+            pragmas = {**settings.SQLITE_PRAGMAS, "journal_mode": mode.strip().upper()}
+            yield f"sqlite journal_mode={pragmas['journal_mode']}", {"SQLITE_PRAGMAS": pragmas}
+
+    def setup(self, students, questions):
+        emails = [EMAIL.format(n) for n in range(students)]
+        CustomUser.objects.filter(email__in=emails).delete()
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(email=email, password=make_password(None)) for email in emails]
+        )
+        quiz = Quiz.objects.create(title="Submission benchmark")
+        for n in range(questions):
+            question = Question.objects.create(quiz=quiz, text=f"Question {n + 1}")
+            Choice.objects.bulk_create([
+                Choice(question=question, text="Right", is_correct=True),
+                Choice(question=question, text="Wrong", is_correct=False),
+            ])
+        return quiz, users
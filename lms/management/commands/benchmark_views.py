@@ -0,0 +1,95 @@
+import platform
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.testing import isolated_cache
+from lms import benchmarks
+from lms.seeding import seed
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a realistic dataset inside a transaction, request every lms route "
+        "through the test client and compare query counts and median wall times "
+        "with the budgets in lms.benchmarks and a stored baseline. Fails on any "
+        "regression, or when there is no baseline to compare with. Everything is "
+        "rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=100000)
+        parser.add_argument("--courses", type=int, default=1000)
+        parser.add_argument("--quizzes-per-course", type=int, default=10)
+        parser.add_argument("--attempts", type=int, default=1000000)
+        parser.add_argument("--scale", type=float, default=1.0,
+                            help="Multiply the volumes above, e.g. 0.01 for a quick run.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--baseline", default=str(settings.BASE_DIR / "benchmarks" / "lms_views.json"))
+        parser.add_argument("--tolerance", type=float, default=1.5,
+                            help="Fail when a median is this many times the baseline.")
+        parser.add_argument("--update-baseline", action="store_true",
+                            help="Write this run as the new baseline instead of comparing.")
+        parser.add_argument("--fragments", action="store_true",
+                            help="Also report the time saved by template fragment caching.")
+
+    @isolated_cache("benchmark")
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                failures = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+        if failures:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("All routes within budget."))
+
+    def run(self, options):
+        scale = options["scale"]
+        started = time.perf_counter()
+        counts = seed(
+            students=int(options["students"] * scale),
+            courses=max(int(options["courses"] * scale), 1),
+            quizzes_per_course=options["quizzes_per_course"],
+            attempts=int(options["attempts"] * scale),
+        )
+        self.stdout.write(f"Seeded {counts} in {time.perf_counter() - started:.1f}s")
+
+        fixtures = benchmarks.Fixtures()
+        cases = fixtures.cases()
+        missing = benchmarks.uncovered_routes(cases)
+        if missing:
+            raise CommandError(f"No benchmark case for: {', '.join(missing)}")
+        results = benchmarks.run(fixtures, repeat=options["repeat"])
+        for name, result in results.items():
+            self.stdout.write(f"{name:<24} {result['queries']:>3} queries  {result['ms']:>9.2f} ms")
+        if options["fragments"]:
+            self.report_fragments(fixtures, options["repeat"])
+
+        if options["update_baseline"]:
+            meta = {"counts": counts, "vendor": connection.vendor, "python": platform.python_version()}
+            benchmarks.save_baseline(options["baseline"], results, meta)
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+            return benchmarks.check(results)
+        baseline = benchmarks.load_baseline(options["baseline"])
+        if baseline is None:
+            raise CommandError(
+                f"No baseline at {options['baseline']}; record one with --update-baseline."
+            )
+        return benchmarks.check(results, baseline, options["tolerance"])
+
+    def report_fragments(self, fixtures, repeat):
+        self.stdout.write("Fragment caching (median ms, off -> on):")
+        for name, row in benchmarks.compare_fragments(fixtures, repeat).items():
+            share = 100 * row["saved"] / row["off"] if row["off"] else 0
+            self.stdout.write(
+                f"{name:<24} {row['off']:>9.2f} -> {row['on']:>9.2f}  saved {row['saved']:>7.2f} ms"
+                f" ({share:.0f}%)"
+            )
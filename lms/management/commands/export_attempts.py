@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from lms.exports import CHUNK_SIZE, FORMATS, STREAMS, attempt_rows, write_parquet
+
+
+def date_argument(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+class Command(BaseCommand):
+    help = "Stream Attempt history to CSV, JSON lines or Parquet with flat memory use."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument(
+            "--output", "-o", help="Output file (required for parquet, stdout otherwise)."
+        )
+        parser.add_argument("--course", type=int)
+        parser.add_argument("--quiz", type=int)
+        parser.add_argument("--since", type=date_argument, help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--until", type=date_argument, help="YYYY-MM-DD, inclusive.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        fmt, output = options["format"], options["output"]
+        rows = attempt_rows(
+            course_id=options["course"],
+            quiz_id=options["quiz"],
+            since=options["since"],
+            until=options["until"],
+            chunk_size=options["chunk_size"],
+        )
+        if fmt == "parquet":
+            if not output:
+                raise CommandError("Parquet output needs --output.")
+            try:
+                count = write_parquet(rows, output, options["chunk_size"])
+            except ImportError:
+                raise CommandError("Parquet export needs pyarrow (pip install pyarrow).")
+            self.stderr.write(f"Wrote {count} attempts to {output}")
+            return
+
+        if not output:
+            for line in STREAMS[fmt](rows):
+                self.stdout.write(line, ending="")
+            return
+        with open(output, "w", newline="") as stream:
+            stream.writelines(STREAMS[fmt](rows))
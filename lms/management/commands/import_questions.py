@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms.importers import FORMATS, ImportFormatError, detect_format, import_questions
+
+
+class Command(BaseCommand):
+    help = "Stream-import quizzes, questions and choices from a CSV, JSON-lines or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Validate the file without writing anything."
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        try:
+            fmt = options["format"] or detect_format(options["path"])
+            with open(options["path"], "rb") as stream:
+                result = import_questions(
+                    stream, fmt,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                    progress=self.report_progress,
+                )
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(exc)
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more errors")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.rows} rows read: {result.quizzes} quizzes, {result.questions} questions, "
+                f"{result.choices} choices created, {result.error_count} rows rejected."
+            )
+        )
+
+    def report_progress(self, result):
+        if self.verbosity >= 1:
+            self.stdout.write(
+                f"  {result.rows} rows processed, {result.questions} questions imported", ending="\r"
+            )
+            self.stdout.flush()
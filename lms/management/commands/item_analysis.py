@@ -0,0 +1,54 @@
+import json
+import time
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lms.item_analysis import analyse_quiz
+from lms.models import Quiz
+
+
+class Command(BaseCommand):
+    help = (
+        "Print difficulty, discrimination and distractor statistics for the "
+        "questions of one quiz, or of every quiz in a course."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quiz", type=int)
+        parser.add_argument("--course", type=int)
+        parser.add_argument("--format", choices=("table", "json"), default="table")
+        parser.add_argument("--chunk-size", type=int, default=200000)
+
+    def handle(self, *args, **options):
+        if options["quiz"]:
+            quiz_ids = [options["quiz"]]
+        elif options["course"]:
+            quiz_ids = list(
+                Quiz.objects.filter(course_id=options["course"]).order_by("id").values_list("id", flat=True)
+            )
+        else:
+            raise CommandError("Pass --quiz or --course.")
+        for quiz_id in quiz_ids:
+            started = time.perf_counter()
+            report = analyse_quiz(quiz_id, chunk_size=options["chunk_size"])
+            elapsed = time.perf_counter() - started
+            if options["format"] == "json":
+                self.stdout.write(json.dumps(asdict(report)))
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"Quiz {quiz_id}: {report.attempts} attempts, {report.answers} answers "
+                f"in {elapsed:.2f}s"
+            ))
+            for item in report.questions:
+                flag = "  REVIEW" if item.needs_review else ""
+                self.stdout.write(
+                    f"  Q{item.question_id:<8} p={item.difficulty:.2f}  "
+                    f"r_pb={item.discrimination:+.2f}  n={item.answered}{flag}"
+                )
+                for choice in item.choices:
+                    mark = "*" if choice.is_correct else "!" if choice.is_weak_distractor else " "
+                    self.stdout.write(
+                        f"    {mark} {(choice.text or '')[:30]:<30} {choice.share:6.1%}  "
+                        f"r={choice.discrimination:+.2f}"
+                    )
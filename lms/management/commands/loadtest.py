@@ -0,0 +1,113 @@
+import asyncio
+import json
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ["/dashboard/", "/lectures/", "//quizzes/", "/leaderboard/"]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running studybun server with concurrent logged-in students and "
+        "report throughput and latency percentiles per path. Run it once against "
+        "the WSGI server (gunicorn studybun.wsgi) and once against the ASGI server "
+        "(LMS_ASYNC_VIEWS=1 uvicorn studybun.asgi:application) to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="e.g. http://127.0.0.1:8000 (no trailing slash)")
+        parser.add_argument("--email", required=True, help="Student account to log in as.")
+        parser.add_argument("--password", required=True)
+        parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds.")
+        parser.add_argument("--label", default="", help="Name of this run in the report.")
+        parser.add_argument("--output", help="Append the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            import httpx
+        except ImportError:
+            raise CommandError("The load test needs httpx (pip install httpx).")
+        report = asyncio.run(self.run(httpx, options))
+        for path, stats in report["paths"].items():
+            self.stdout.write(
+                f"{path:<20} {stats['requests']:>7} req  {stats['rps']:>8.1f} req/s  "
+                f"p50 {stats['p50_ms']:>7.1f} ms  p99 {stats['p99_ms']:>7.1f} ms  "
+                f"errors {stats['errors']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Total: {report['rps']:.1f} req/s"))
+        if options["output"]:
+            with open(options["output"], "a") as fh:
+                fh.write(json.dumps(report) + "\n")
+
+    async def login(self, client, options):
+        login_url = options["base_url"] + "/login/"
+        page = await client.get(login_url)
+        token = client.cookies.get("csrftoken") or re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"', page.text
+        ).group(1)
+        response = await client.post(
+            login_url,
+            data={
+                "username": options["email"],
+                "password": options["password"],
+                "csrfmiddlewaretoken": token,
+            },
+            headers={"Referer": login_url},
+        )
+        if "sessionid" not in client.cookies:
+            raise CommandError(f"Login failed with HTTP {response.status_code}.")
+
+    async def run(self, httpx, options):
+        latencies = {path: [] for path in options["paths"]}
+        errors = {path: 0 for path in options["paths"]}
+        deadline = time.perf_counter() + options["duration"]
+
+        async def student(number):
+            # Absolute URLs: the quiz list lives at "//quizzes/", which httpx
+            # would otherwise read as a host name.
+            async with httpx.AsyncClient(timeout=30) as client:
+                await self.login(client, options)
+                index = number
+                while time.perf_counter() < deadline:
+                    path = options["paths"][index % len(options["paths"])]
+                    index += 1
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(options["base_url"] + path)
+                        failed = response.status_code != 200
+                    except httpx.HTTPError:
+                        failed = True
+                    latencies[path].append((time.perf_counter() - started) * 1000)
+                    errors[path] += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(student(n) for n in range(options["concurrency"])))
+        elapsed = time.perf_counter() - started
+        return {
+            "label": options["label"],
+            "base_url": options["base_url"],
+            "concurrency": options["concurrency"],
+            "rps": sum(len(values) for values in latencies.values()) / elapsed,
+            "paths": {
+                path: {
+                    "requests": len(values),
+                    "errors": errors[path],
+                    "rps": len(values) / elapsed,
+                    "p50_ms": statistics.median(values) if values else 0.0,
+                    "p99_ms": percentile(values, 0.99),
+                }
+                for path, values in latencies.items()
+            },
+        }
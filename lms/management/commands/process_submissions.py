@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lms.tasks import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Grade pending quiz submissions. This is the worker for "
+        "TASK_BACKEND=database, and recovers submissions whose background task "
+        "was lost (for example when a thread-pool process restarted)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=0,
+                            help="Only submissions pending for at least this many seconds.")
+        parser.add_argument("--limit", type=int)
+        parser.add_argument("--loop", action="store_true", help="Keep polling.")
+        parser.add_argument("--interval", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        while True:
+            graded = drain(limit=options["limit"], older_than=options["older_than"])
+            if graded or not options["loop"]:
+                self.stdout.write(f"Graded {graded} submissions.")
+            if not options["loop"]:
+                return
+            if not graded:
+                time.sleep(options["interval"])
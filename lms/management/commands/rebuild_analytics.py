@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from lms import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the quiz and question analytics rollups from Attempt and Answer "
+        "rows. Run it after a backfill, or periodically when "
+        "LMS_ANALYTICS_ON_SUBMIT is off."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        quizzes, questions = analytics.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt stats for {quizzes} quizzes and {questions} questions.")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from lms import leaderboard
+from lms.coins import rebuild_coin_totals
+
+
+class Command(BaseCommand):
+    help = "Rebuild StudentProfile.coins from Attempt history with set-based SQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Batch size used when creating missing profiles.",
+        )
+
+    def handle(self, *args, **options):
+        created, updated = rebuild_coin_totals(batch_size=options["batch_size"])
+        leaderboard.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} profiles, rebuilt {updated} coin totals.")
+        )
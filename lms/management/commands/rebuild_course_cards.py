@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from lms import course_cards
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard CourseCard rows from courses, their content and "
+        "enrollments. Run it after bulk writes that bypass the model signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = course_cards.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} course cards."))
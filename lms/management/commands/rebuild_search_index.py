@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from lms import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Reload the full-text search index from courses, units, videos, PDFs, "
+        "quizzes and questions. Run it after bulk writes that bypass the model "
+        "signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = search.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {total} documents ({search.backend_name()} backend).")
+        )
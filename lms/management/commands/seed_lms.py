@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lms import analytics, leaderboard
+from lms.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic dataset (users, courses, units, videos, "
+        "PDFs, quizzes, questions, choices, enrollments and attempts) with bulk "
+        "inserts. The same --seed always produces the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=100000)
+        parser.add_argument("--courses", type=int, default=1000)
+        parser.add_argument("--units-per-course", type=int, default=8)
+        parser.add_argument("--quizzes-per-course", type=int, default=10)
+        parser.add_argument("--questions-per-quiz", type=int, default=10)
+        parser.add_argument("--videos-per-course", type=int, default=6)
+        parser.add_argument("--pdfs-per-course", type=int, default=4)
+        parser.add_argument("--enrollments-per-student", type=int, default=4,
+                            help="Average number of courses per student.")
+        parser.add_argument("--attempts", type=int, default=1000000)
+        parser.add_argument("--skew", type=float, default=1.1,
+                            help="Zipf exponent of course popularity; 0 is uniform.")
+        parser.add_argument("--days", type=int, default=180,
+                            help="Spread attempts over this many past days.")
+        parser.add_argument("--answers", action="store_true",
+                            help="Also create an Answer row per question of every attempt.")
+        parser.add_argument("--password", help="Shared password for every generated account.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            counts = seed(
+                students=options["students"],
+                courses=options["courses"],
+                units_per_course=options["units_per_course"],
+                quizzes_per_course=options["quizzes_per_course"],
+                questions_per_quiz=options["questions_per_quiz"],
+                videos_per_course=options["videos_per_course"],
+                pdfs_per_course=options["pdfs_per_course"],
+                enrollments_per_student=options["enrollments_per_student"],
+                attempts=options["attempts"],
+                skew=options["skew"],
+                days=options["days"],
+                password=options["password"],
+                answers=options["answers"],
+                batch_size=options["batch_size"],
+                seed=options["seed"],
+            )
+            # bulk_create bypasses submit_answers, so rebuild what it maintains.
+            analytics.rebuild()
+        leaderboard.rebuild()
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {elapsed:.1f}s."))
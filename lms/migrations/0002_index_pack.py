@@ -0,0 +1,49 @@
+# Generated by Django 4.2.9 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attempt",
+            index=models.Index(fields=["-attempted_at"], name="lms_attempt_recent_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="attempt",
+            index=models.Index(
+                fields=["user", "quiz", "-attempted_at"], name="lms_attempt_history_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="choice",
+            index=models.Index(
+                fields=["question", "is_correct"], name="lms_choice_correct_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentprofile",
+            index=models.Index(
+                condition=models.Q(("coins__isnull", False), ("user__isnull", False)),
+                fields=["-coins", "user"],
+                name="lms_profile_coins_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="unit",
+            index=models.Index(
+                fields=["course", "order"], name="lms_unit_course_order_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="attempt",
+            constraint=models.CheckConstraint(
+                check=models.Q(("score__lte", 100)), name="lms_attempt_score_lte_100"
+            ),
+        ),
+    ]
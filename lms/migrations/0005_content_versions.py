@@ -0,0 +1,55 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0004_submission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentVersion",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="pdfresource",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="quiz",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="unit",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="video",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_cards(apps, schema_editor):
+    """Backfill one card per existing course (lms.course_cards.rebuild, frozen)."""
+    Course = apps.get_model("lms", "Course")
+    CourseCard = apps.get_model("lms", "CourseCard")
+    Enrollment = apps.get_model("lms", "StudentProfile").enrolled_courses.through
+    counted = {
+        "units": apps.get_model("lms", "Unit"),
+        "videos": apps.get_model("lms", "Video"),
+        "pdfs": apps.get_model("lms", "PDFResource"),
+        "quizzes": apps.get_model("lms", "Quiz"),
+        "students": Enrollment,
+    }
+    counts = {
+        name: dict(
+            model.objects.filter(course__isnull=False)
+            .order_by()
+            .values("course_id")
+            .annotate(total=models.Count("*"))
+            .values_list("course_id", "total")
+        )
+        for name, model in counted.items()
+    }
+    rows = Course.objects.values_list(
+        "pk", "title", "faculty__full_name", "faculty__email", "credits", "semester"
+    )
+    CourseCard.objects.bulk_create(
+        (
+            CourseCard(
+                course_id=pk,
+                title=title or "",
+                faculty_name=full_name or email or "",
+                credits=credits,
+                semester=semester or "",
+                **{name: counts[name].get(pk, 0) for name in counted},
+            )
+            for pk, title, full_name, email, credits, semester in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0005_content_versions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseCard",
+            fields=[
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="lms.course",
+                    ),
+                ),
+                ("title", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "faculty_name",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("credits", models.PositiveIntegerField(blank=True, null=True)),
+                ("semester", models.CharField(blank=True, default="", max_length=20)),
+                ("units", models.PositiveIntegerField(default=0)),
+                ("videos", models.PositiveIntegerField(default=0)),
+                ("pdfs", models.PositiveIntegerField(default=0)),
+                ("quizzes", models.PositiveIntegerField(default=0)),
+                ("students", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(fill_cards, migrations.RunPython.noop),
+    ]
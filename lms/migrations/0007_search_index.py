@@ -0,0 +1,72 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Mirrors lms.search.KINDS: (table, code, kind, target, title, body columns).
+SOURCES = [
+    ("lms_course", 1, "course", "id", "title", []),
+    ("lms_unit", 2, "unit", "course_id", "title", ["description"]),
+    ("lms_video", 3, "video", "course_id", "title", []),
+    ("lms_pdfresource", 4, "pdf", "course_id", "title", []),
+    ("lms_quiz", 5, "quiz", "id", "title", ["description"]),
+    ("lms_question", 6, "question", "quiz_id", "text", []),
+]
+
+SQLITE_TABLE = (
+    "CREATE VIRTUAL TABLE lms_search USING fts5("
+    "kind UNINDEXED, target_id UNINDEXED, title, body, tokenize='porter unicode61')"
+)
+POSTGRES_TABLE = [
+    "CREATE TABLE lms_search ("
+    "doc_id bigint PRIMARY KEY, kind varchar(16) NOT NULL, target_id bigint NULL, "
+    "title text NOT NULL, body text NOT NULL, "
+    "document tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || "
+    "setweight(to_tsvector('english', body), 'B')) STORED)",
+    "CREATE INDEX lms_search_document_idx ON lms_search USING GIN (document)",
+]
+
+
+def backfill_sql(key_column):
+    for table, code, kind, target, title, body in SOURCES:
+        body_sql = " || ' ' || ".join(f"COALESCE({column}, '')" for column in body) or "''"
+        yield (
+            f"INSERT INTO lms_search ({key_column}, kind, target_id, title, body) "
+            f"SELECT (id << 3) | {code}, '{kind}', {target}, COALESCE({title}, ''), {body_sql} "
+            f"FROM {table}"
+        )
+
+
+def create_index(apps, schema_editor):
+    """Create the full-text table the database supports; otherwise search stays in memory."""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "sqlite":
+            try:
+                cursor.execute(SQLITE_TABLE)
+            except OperationalError:  # SQLite built without FTS5.
+                return
+            statements = backfill_sql("rowid")
+        elif vendor == "postgresql":
+            for statement in POSTGRES_TABLE:
+                cursor.execute(statement)
+            statements = backfill_sql("doc_id")
+        else:
+            return
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS lms_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0006_course_cards"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
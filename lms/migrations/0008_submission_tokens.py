@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0007_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attempt",
+            name="submission_token",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="submission_token",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="attempt",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("submission_token__isnull", False)),
+                fields=("user", "quiz", "submission_token"),
+                name="lms_attempt_once_per_token",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="submission",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("submission_token__isnull", False)),
+                fields=("user", "quiz", "submission_token"),
+                name="lms_submission_once_per_token",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lms", "0008_submission_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="content_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.contrib.auth import get_user_model
 
@@ -66,6 +67,16 @@ class StudentProfile(models.Model):
         "Course", blank=True, related_name="students"
     )
 
+    class Meta:
+        indexes = [
+            # Leaderboard ordering; partial so it matches the ranked rows only.
+            models.Index(
+                fields=["-coins", "user"],
+                name="lms_profile_coins_idx",
+                condition=models.Q(user__isnull=False, coins__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.full_name or self.user.email} Profile"
 
@@ -84,6 +95,10 @@ class Course(models.Model):
     )
     credits = models.PositiveIntegerField(default=3, null=True, blank=True)
     semester = models.CharField(max_length=20, blank=True, null=True)
+    # Bumped by lms.versions whenever the course or one of its units, videos,
+    # PDFs or quizzes changes; drives the course page ETag.
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return self.title or "Untitled Course"
@@ -97,9 +112,13 @@ class Unit(models.Model):
     title = models.CharField(max_length=255, null=True, blank=True)
     description = models.TextField(blank=True, null=True)
     order = models.PositiveIntegerField(default=1, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     class Meta:
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["course", "order"], name="lms_unit_course_order_idx"),
+        ]
 
     def __str__(self):
         return f"{self.course.title if self.course else 'No Course'} - {self.title}"
@@ -115,6 +134,7 @@ class Video(models.Model):
     )
     title = models.CharField(max_length=255, null=True, blank=True)
     url = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     def __str__(self):
         return self.title or "Untitled Video"
@@ -127,6 +147,7 @@ class PDFResource(models.Model):
     )
     title = models.CharField(max_length=255, null=True, blank=True)
     url = models.URLField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
 
     def __str__(self):
         return self.title or "Untitled PDF"
@@ -142,6 +163,10 @@ class Quiz(models.Model):
     )
     title = models.CharField(max_length=200, null=True, blank=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+    # Bumped by lms.versions whenever a question or choice of the quiz
+    # changes; keys the cached item analysis report.
+    content_version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return f"{self.course.title if self.course else 'No Course'} - {self.title}"
@@ -166,6 +191,11 @@ class Choice(models.Model):
     text = models.CharField(max_length=300, null=True, blank=True)
     is_correct = models.BooleanField(default=False, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["question", "is_correct"], name="lms_choice_correct_idx"),
+        ]
+
     def __str__(self):
         return f"{self.text or 'Choice'} ({'✔' if self.is_correct else '✖'})"
 
@@ -189,9 +219,180 @@ class Attempt(models.Model):
     score = models.PositiveIntegerField(default=0, null=True, blank=True)
     coins_earned = models.PositiveIntegerField(default=0, null=True, blank=True)
     attempted_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    # The take_quiz form token (lms.submission_guard); unique per user and quiz.
+    submission_token = models.CharField(max_length=64, null=True, blank=True)
 
     def __str__(self):
         return f"{self.user.email if self.user else 'No User'} - {self.quiz.title if self.quiz else 'No Quiz'} ({self.score}%)"
 
     class Meta:
         ordering = ['-attempted_at']
+        indexes = [
+            models.Index(fields=["-attempted_at"], name="lms_attempt_recent_idx"),
+            models.Index(
+                fields=["user", "quiz", "-attempted_at"], name="lms_attempt_history_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(score__lte=100), name="lms_attempt_score_lte_100"
+            ),
+            models.UniqueConstraint(
+                fields=["user", "quiz", "submission_token"],
+                name="lms_attempt_once_per_token",
+                condition=models.Q(submission_token__isnull=False),
+            ),
+        ]
+
+
+class Answer(models.Model):
+    """The choice a student picked for one question of an attempt."""
+
+    attempt = models.ForeignKey(Attempt, related_name="answers", on_delete=models.CASCADE)
+    question = models.ForeignKey(Question, related_name="answers", on_delete=models.CASCADE)
+    choice = models.ForeignKey(
+        Choice, related_name="answers", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    is_correct = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["question", "choice"], name="lms_answer_choice_idx"),
+        ]
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id} - Question {self.question_id}"
+
+
+class Submission(models.Model):
+    """
+    A quiz submission accepted for background grading.
+
+    The raw answers are stored as posted; grading turns the row into an
+    ``Attempt`` exactly once, so pending rows double as a work queue.
+    """
+
+    PENDING = "pending"
+    GRADED = "graded"
+    STATUS_CHOICES = [(PENDING, "Pending"), (GRADED, "Graded")]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="submissions", on_delete=models.CASCADE
+    )
+    quiz = models.ForeignKey(Quiz, related_name="submissions", on_delete=models.CASCADE)
+    answers = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempt = models.OneToOneField(
+        Attempt, related_name="submission", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    submission_token = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="lms_submission_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "quiz", "submission_token"],
+                name="lms_submission_once_per_token",
+                condition=models.Q(submission_token__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Submission {self.pk} ({self.status})"
+
+
+# -----------------------------
+# Analytics Rollups
+# -----------------------------
+class QuizStats(models.Model):
+    """Running totals per quiz, maintained by ``lms.analytics``."""
+
+    quiz = models.OneToOneField(
+        Quiz, related_name="stats", on_delete=models.CASCADE, primary_key=True
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveBigIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_score(self):
+        return self.score_total / self.attempts if self.attempts else 0
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.attempts if self.attempts else 0
+
+    def __str__(self):
+        return f"Stats for quiz {self.quiz_id}"
+
+
+class QuestionStats(models.Model):
+    """Running totals per question, maintained by ``lms.analytics``."""
+
+    question = models.OneToOneField(
+        Question, related_name="stats", on_delete=models.CASCADE, primary_key=True
+    )
+    quiz = models.ForeignKey(Quiz, related_name="question_stats", on_delete=models.CASCADE)
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    @property
+    def difficulty(self):
+        """Share of students who got it right (the classical p-value)."""
+        return self.correct / self.answered if self.answered else 0
+
+    def __str__(self):
+        return f"Stats for question {self.question_id}"
+
+
+# -----------------------------
+# Content Versions
+# -----------------------------
+class ContentVersion(models.Model):
+    """
+    A counter per kind of listed content ("courses", "videos", "pdfs",
+    "quizzes"), bumped by lms.versions on every change; drives the list page
+    ETags.
+    """
+
+    key = models.CharField(max_length=32, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+# -----------------------------
+# Read Models
+# -----------------------------
+class CourseCard(models.Model):
+    """
+    Everything a dashboard card shows for one course, denormalized so the
+    dashboard reads a single table. Maintained by ``lms.course_cards``.
+    """
+
+    course = models.OneToOneField(
+        Course, related_name="card", on_delete=models.CASCADE, primary_key=True
+    )
+    title = models.CharField(max_length=255, blank=True, default="")
+    faculty_name = models.CharField(max_length=255, blank=True, default="")
+    credits = models.PositiveIntegerField(null=True, blank=True)
+    semester = models.CharField(max_length=20, blank=True, default="")
+    units = models.PositiveIntegerField(default=0)
+    videos = models.PositiveIntegerField(default=0)
+    pdfs = models.PositiveIntegerField(default=0)
+    quizzes = models.PositiveIntegerField(default=0)
+    students = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Card for course {self.course_id}"
@@ -0,0 +1,214 @@
+# lms/pagination.py
+
+"""
+Keyset (seek) pagination with an offset fallback.
+
+``paginate`` pages a queryset on an ordering that ends in a unique column.
+By default it seeks past the last row of the previous page using an opaque
+``after`` cursor, so page N costs the same index range scan as page 1. A
+``page`` number in the query string switches to classic offset pagination
+for clients that need to jump to an arbitrary page.
+"""
+
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+
+PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def encode_cursor(values, position):
+    data = json.dumps({"v": values, "n": position}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """Return ``(values, position)`` or ``None`` for a missing or bad cursor."""
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values, position = data["v"], int(data["n"])
+    except (ValueError, TypeError, KeyError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values, position
+
+
+def seek_filter(ordering, values):
+    """
+    Build the row-value comparison ``(a, b) > (x, y)`` for an ordering such
+    as ``("-coins", "id")`` as an OR of prefix-equal terms.
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        term = Q(**{f"{name}__{lookup}": values[index]})
+        for previous, value in zip(ordering[:index], values):
+            term &= Q(**{previous.lstrip("-"): value})
+        condition |= term
+    return condition
+
+
+def _value(row, field):
+    name = field.lstrip("-")
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+class Page:
+    def __init__(self, request, object_list, prefix, start_index, next_cursor=None,
+                 number=None, num_pages=None):
+        self.object_list = object_list
+        self.start_index = start_index
+        self.next_cursor = next_cursor
+        self.number = number
+        self.num_pages = num_pages
+        self._request = request
+        self._prefix = prefix
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def is_keyset(self):
+        return self.number is None
+
+    @property
+    def has_next(self):
+        if self.is_keyset:
+            return self.next_cursor is not None
+        return self.number < self.num_pages
+
+    @property
+    def has_previous(self):
+        return self.start_index > 0
+
+    def _query(self, **params):
+        query = self._request.GET.copy()
+        for name in ("after", "page"):
+            query.pop(self._prefix + name, None)
+        for name, value in params.items():
+            if value is not None:
+                query[self._prefix + name] = value
+        return query.urlencode()
+
+    @property
+    def next_query(self):
+        if self.is_keyset:
+            return self._query(after=self.next_cursor)
+        return self._query(page=self.number + 1)
+
+    @property
+    def previous_query(self):
+        if self.is_keyset:
+            return self._query()
+        return self._query(page=self.number - 1)
+
+
+def _per_page(request, default):
+    try:
+        return min(max(int(request.GET.get("per_page", default)), 1), MAX_PER_PAGE)
+    except ValueError:
+        return default
+
+
+def _offset_page(request, queryset, per_page, prefix):
+    paginator = Paginator(queryset, per_page)
+    try:
+        page = paginator.page(request.GET[prefix + "page"])
+    except InvalidPage:
+        page = paginator.page(1)
+    return Page(
+        request, list(page.object_list), prefix, max(page.start_index() - 1, 0),
+        number=page.number, num_pages=paginator.num_pages,
+    )
+
+
+def _keyset_query(request, queryset, ordering, per_page, prefix):
+    cursor = decode_cursor(request.GET.get(prefix + "after"), len(ordering))
+    position = 0
+    if cursor:
+        values, position = cursor
+        queryset = queryset.filter(seek_filter(ordering, values))
+    return queryset[:per_page + 1], position
+
+
+def _keyset_page(request, rows, ordering, per_page, prefix, position):
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [_value(last, field) for field in ordering], position + per_page
+        )
+    return Page(request, rows, prefix, position, next_cursor=next_cursor)
+
+
+def _wants_offset(request, prefix):
+    return request.GET.get(prefix + "page") and not request.GET.get(prefix + "after")
+
+
+def paginate(request, queryset, ordering=("id",), per_page=PER_PAGE, prefix=""):
+    """
+    Page ``queryset`` ordered by ``ordering``, whose last field must be unique
+    and whose values must be JSON serializable (ids, counters, short strings).
+
+    Reads ``<prefix>after`` (keyset cursor), ``<prefix>page`` (offset
+    fallback) and ``per_page`` from the query string.
+    """
+    ordering = tuple(ordering)
+    per_page = _per_page(request, per_page)
+    queryset = queryset.order_by(*ordering)
+    if _wants_offset(request, prefix):
+        return _offset_page(request, queryset, per_page, prefix)
+    queryset, position = _keyset_query(request, queryset, ordering, per_page, prefix)
+    return _keyset_page(request, list(queryset), ordering, per_page, prefix, position)
+
+
+async def apaginate(request, queryset, ordering=("id",), per_page=PER_PAGE, prefix=""):
+    """``paginate`` for async views, using the async ORM for keyset pages."""
+    ordering = tuple(ordering)
+    per_page = _per_page(request, per_page)
+    queryset = queryset.order_by(*ordering)
+    if _wants_offset(request, prefix):
+        return await sync_to_async(_offset_page)(request, queryset, per_page, prefix)
+    queryset, position = _keyset_query(request, queryset, ordering, per_page, prefix)
+    rows = [row async for row in queryset]
+    return _keyset_page(request, rows, ordering, per_page, prefix, position)
+
+
+def paginate_ranked(request, fetch, per_page=PER_PAGE, prefix=""):
+    """
+    Page results that have a rank but no stable sort key, such as search hits.
+    ``fetch(limit, offset)`` returns a list; the ``after`` cursor carries the
+    offset of the next page.
+    """
+    per_page = _per_page(request, per_page)
+    cursor = decode_cursor(request.GET.get(prefix + "after"), 1)
+    position = cursor[1] if cursor else 0
+    rows = fetch(per_page + 1, position)
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([position + per_page], position + per_page)
+    return Page(request, rows, prefix, position, next_cursor=next_cursor)
+
+
+def page_payload(page, serialize):
+    """JSON body shared by the list API endpoints."""
+    return {
+        "results": [serialize(row) for row in page],
+        "start_index": page.start_index,
+        "next": page.next_cursor if page.is_keyset else None,
+        "page": page.number,
+        "num_pages": page.num_pages,
+    }
@@ -0,0 +1,45 @@
+# lms/papers.py
+
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+
+from core.cache import get_or_compute
+
+from .models import Choice, Question
+
+PAPER_TIMEOUT = 60 * 60
+
+
+def paper_cache_key(quiz_id):
+    return f"lms:quiz-paper:{quiz_id}"
+
+
+def load_questions(quiz_id):
+    """Load a quiz's questions with their choices in two queries."""
+    return list(
+        Question.objects.filter(quiz_id=quiz_id)
+        .order_by("id")
+        .prefetch_related(Prefetch("choices", queryset=Choice.objects.order_by("id")))
+    )
+
+
+def render_quiz_paper(quiz_id):
+    return render_to_string(
+        "partials/quiz_paper.html", {"questions": load_questions(quiz_id)}
+    )
+
+
+def get_quiz_paper(quiz_id):
+    """Return the rendered question paper for a quiz, cached per quiz."""
+    return get_or_compute(paper_cache_key(quiz_id), partial(render_quiz_paper, quiz_id), PAPER_TIMEOUT)
+
+
+def invalidate_quiz_paper(quiz_id):
+    """Drop the cached paper now and again once the current transaction commits."""
+    key = paper_cache_key(quiz_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
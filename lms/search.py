@@ -0,0 +1,447 @@
+# lms/search.py
+
+"""
+Full-text search over courses, units, videos, PDFs, quizzes and questions.
+
+Every searchable row becomes a document ``(doc_id, kind, target_id, title,
+body)``: ``doc_id`` packs the kind into the primary key, ``target_id`` is the
+course or quiz a hit links to. Documents live in one of three backends,
+picked by ``settings.LMS_SEARCH_BACKEND`` (empty means the best available):
+
+* ``"sqlite"``: an FTS5 table ranked by bm25;
+* ``"postgres"``: a table with a weighted, GIN-indexed tsvector column,
+  ranked by ts_rank;
+* ``"memory"``: an inverted index with BM25 scoring in process memory, loaded
+  from the database on first use. Only suitable for a single process.
+
+The two database tables are created by migration 0007. The signals in
+``lms.signals`` keep the index current row by row; ``rebuild`` (the
+``rebuild_search_index`` command) reloads it after bulk writes.
+
+The query is split into words that must all match; the last word also
+matches as a prefix, so partial input finds results as the user types.
+"""
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Course, PDFResource, Question, Quiz, Unit, Video
+
+TABLE = "lms_search"
+MAX_TERMS = 10
+# Title matches count this many times a body match.
+TITLE_WEIGHT = 4.0
+# Marks around matched words in snippets, replaced by <mark> after escaping.
+START, STOP = "\x02", "\x03"
+SNIPPET_WORDS = 16
+WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class Kind:
+    name: str
+    code: int
+    model: type
+    title: str
+    body: tuple
+    target: str
+
+
+KINDS = (
+    Kind("course", 1, Course, "title", (), "pk"),
+    Kind("unit", 2, Unit, "title", ("description",), "course_id"),
+    Kind("video", 3, Video, "title", (), "course_id"),
+    Kind("pdf", 4, PDFResource, "title", (), "course_id"),
+    Kind("quiz", 5, Quiz, "title", ("description",), "pk"),
+    Kind("question", 6, Question, "text", (), "quiz_id"),
+)
+KIND_OF = {kind.model: kind for kind in KINDS}
+# Kind codes fit in the low three bits of doc_id.
+CODE_BITS = 3
+
+
+def doc_id(kind, pk):
+    return (pk << CODE_BITS) | kind.code
+
+
+def document(instance):
+    """The ``(doc_id, kind, target_id, title, body)`` tuple for a model instance."""
+    kind = KIND_OF[type(instance)]
+    return (
+        doc_id(kind, instance.pk),
+        kind.name,
+        getattr(instance, kind.target),
+        getattr(instance, kind.title) or "",
+        " ".join(getattr(instance, field) or "" for field in kind.body),
+    )
+
+
+def documents(kind, queryset=None, batch_size=2000):
+    """Yield the documents of every row of ``kind`` without building instances."""
+    queryset = kind.model.objects.all() if queryset is None else queryset
+    fields = ["pk", kind.target, kind.title, *kind.body]
+    for pk, target, title, *body in queryset.order_by().values_list(*fields).iterator(
+        chunk_size=batch_size
+    ):
+        yield doc_id(kind, pk), kind.name, target, title or "", " ".join(b or "" for b in body)
+
+
+def terms(text):
+    return WORD_RE.findall(text.lower())
+
+
+def parse_query(query):
+    """The words of ``query``, deduplicated in order and capped at MAX_TERMS."""
+    return list(dict.fromkeys(terms(query or "")))[:MAX_TERMS]
+
+
+def highlight(snippet):
+    """Escape a marked snippet and turn the marks into ``<mark>`` tags."""
+    return mark_safe(escape(snippet).replace(START, "<mark>").replace(STOP, "</mark>"))
+
+
+@dataclass
+class Hit:
+    kind: str
+    target_id: int
+    title: str
+    snippet: str
+    score: float
+
+    @property
+    def url(self):
+        if self.kind in ("quiz", "question"):
+            return reverse("take_quiz", args=[self.target_id]) if self.target_id else reverse("quiz_list")
+        if self.target_id is None:
+            return reverse("lectures") if self.kind in ("video", "pdf") else reverse("dashboard")
+        anchor = {"unit": "#units", "video": "#videos", "pdf": "#pdfs"}.get(self.kind, "")
+        return reverse("course_detail", args=[self.target_id]) + anchor
+
+
+# -----------------------------
+# SQLite FTS5
+# -----------------------------
+class SqliteBackend:
+    """FTS5 table ``lms_search``; its rowid is the doc_id."""
+
+    transactional = True
+
+    def index(self, docs):
+        docs = list(docs)
+        if not docs:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {TABLE} WHERE rowid = %s", [(doc[0],) for doc in docs]
+            )
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, kind, target_id, title, body) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                docs,
+            )
+
+    def remove(self, doc_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(pk,) for pk in doc_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+
+    def search(self, words, limit, offset):
+        # Quoted words are literals to FTS5; the last one matches as a prefix.
+        match = " ".join(f'"{word}"' for word in words) + "*"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT kind, target_id, title, "
+                f"snippet({TABLE}, -1, %s, %s, '…', {SNIPPET_WORDS}), "
+                f"bm25({TABLE}, 0, 0, {TITLE_WEIGHT}, 1.0) AS score "
+                f"FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY score, rowid LIMIT %s OFFSET %s",
+                [START, STOP, match, limit, offset],
+            )
+            return [
+                Hit(kind, target_id, title, highlight(snippet), -score)
+                for kind, target_id, title, snippet, score in cursor.fetchall()
+            ]
+
+
+# -----------------------------
+# Postgres tsvector
+# -----------------------------
+class PostgresBackend:
+    """Table ``lms_search`` with a generated, GIN-indexed ``document`` tsvector."""
+
+    transactional = True
+
+    def index(self, docs):
+        docs = list(docs)
+        if not docs:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (doc_id, kind, target_id, title, body) "
+                f"VALUES (%s, %s, %s, %s, %s) ON CONFLICT (doc_id) DO UPDATE SET "
+                f"kind = EXCLUDED.kind, target_id = EXCLUDED.target_id, "
+                f"title = EXCLUDED.title, body = EXCLUDED.body",
+                docs,
+            )
+
+    def remove(self, doc_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE doc_id = ANY(%s)", [list(doc_ids)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {TABLE}")
+
+    def search(self, words, limit, offset):
+        # \w+ words need no tsquery escaping; the last one matches as a prefix.
+        tsquery = " & ".join(words[:-1] + [f"{words[-1]}:*"])
+        options = f"StartSel={START}, StopSel={STOP}, MaxWords={SNIPPET_WORDS}, MinWords=4"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT kind, target_id, title, "
+                f"ts_headline('english', title || ' ' || body, query, %s), "
+                f"ts_rank(document, query) AS score "
+                f"FROM {TABLE}, to_tsquery('english', %s) query WHERE document @@ query "
+                f"ORDER BY score DESC, doc_id LIMIT %s OFFSET %s",
+                [options, tsquery, limit, offset],
+            )
+            return [
+                Hit(kind, target_id, title, highlight(snippet), score)
+                for kind, target_id, title, snippet, score in cursor.fetchall()
+            ]
+
+
+# -----------------------------
+# In-process inverted index
+# -----------------------------
+class InMemoryIndex:
+    """
+    Postings ``term -> {doc_id: weighted term frequency}`` plus a sorted
+    vocabulary for prefix lookups, scored with BM25.
+    """
+
+    transactional = False
+    k1, b = 1.2, 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._docs = {}
+            self._lengths = {}
+            self._total_length = 0.0
+            self._postings = defaultdict(dict)
+            self._vocabulary = []
+
+    def _discard(self, pk):
+        doc = self._docs.pop(pk, None)
+        if doc is None:
+            return
+        self._total_length -= self._lengths.pop(pk)
+        for term in set(terms(doc[2])) | set(terms(doc[3])):
+            postings = self._postings[term]
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def index(self, docs):
+        with self._lock:
+            for pk, kind, target_id, title, body in docs:
+                self._discard(pk)
+                weights = Counter()
+                for term in terms(title):
+                    weights[term] += TITLE_WEIGHT
+                for term in terms(body):
+                    weights[term] += 1
+                self._docs[pk] = (kind, target_id, title, body)
+                self._lengths[pk] = sum(weights.values())
+                self._total_length += self._lengths[pk]
+                for term, weight in weights.items():
+                    if term not in self._postings:
+                        insort(self._vocabulary, term)
+                    self._postings[term][pk] = weight
+
+    def remove(self, doc_ids):
+        with self._lock:
+            for pk in doc_ids:
+                self._discard(pk)
+
+    def _expand(self, prefix):
+        start = bisect_left(self._vocabulary, prefix)
+        for term in islice(self._vocabulary, start, None):
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def _matches(self, word, prefix):
+        """``{doc_id: weight}`` for one query word; prefix matches keep the best weight."""
+        if not prefix:
+            return self._postings.get(word, {})
+        matches = {}
+        for term in self._expand(word):
+            for pk, weight in self._postings[term].items():
+                if weight > matches.get(pk, 0):
+                    matches[pk] = weight
+        return matches
+
+    def search(self, words, limit, offset):
+        with self._lock:
+            postings = [
+                self._matches(word, prefix=position == len(words) - 1)
+                for position, word in enumerate(words)
+            ]
+            if not all(postings):
+                return []
+            n = len(self._docs)
+            average = self._total_length / n
+            candidates = set(min(postings, key=len))
+            scores = {}
+            for pk in candidates:
+                if not all(pk in matches for matches in postings):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[pk] / average)
+                scores[pk] = sum(
+                    math.log(1 + (n - len(matches) + 0.5) / (len(matches) + 0.5))
+                    * matches[pk] * (self.k1 + 1) / (matches[pk] + norm)
+                    for matches in postings
+                )
+            best = heapq.nsmallest(offset + limit, scores, key=lambda pk: (-scores[pk], pk))
+            return [
+                Hit(*self._docs[pk][:3], self._snippet(pk, words), scores[pk])
+                for pk in best[offset:]
+            ]
+
+    def _snippet(self, pk, words):
+        _, _, title, body = self._docs[pk]
+        tokens = f"{title} {body}".split()
+        exact, last = set(words[:-1]), words[-1]
+
+        def matches(word):
+            word = word.lower()
+            return word in exact or word.startswith(last)
+
+        def mark(match):
+            return f"{START}{match.group()}{STOP}" if matches(match.group()) else match.group()
+
+        first = next(
+            (i for i, token in enumerate(tokens) if any(map(matches, WORD_RE.findall(token)))), 0
+        )
+        start = max(first - SNIPPET_WORDS // 4, 0)
+        window = " ".join(WORD_RE.sub(mark, token) for token in tokens[start:start + SNIPPET_WORDS])
+        before = "… " if start else ""
+        after = " …" if start + SNIPPET_WORDS < len(tokens) else ""
+        return highlight(before + window + after)
+
+
+# -----------------------------
+# Backend selection
+# -----------------------------
+BACKENDS = {"sqlite": SqliteBackend, "postgres": PostgresBackend, "memory": InMemoryIndex}
+VENDOR_BACKENDS = {"sqlite": "sqlite", "postgresql": "postgres"}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_name():
+    name = getattr(settings, "LMS_SEARCH_BACKEND", "")
+    if name:
+        return name
+    vendor = VENDOR_BACKENDS.get(connection.vendor)
+    if vendor and TABLE in connection.introspection.table_names():
+        return vendor
+    return "memory"
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = BACKENDS[backend_name()]()
+    return _backend
+
+
+def reset():
+    """Forget the chosen backend (used by tests and after settings changes)."""
+    global _backend
+    _backend = None
+
+
+def _loaded(backend):
+    """The backend, with the in-memory index filled on first use."""
+    if not backend.transactional and not backend.loaded:
+        with backend._lock:
+            if not backend.loaded:
+                _fill(backend)
+                backend.loaded = True
+    return backend
+
+
+def _fill(backend, batch_size=2000):
+    total = 0
+    for kind in KINDS:
+        docs = documents(kind, batch_size=batch_size)
+        while batch := list(islice(docs, batch_size)):
+            backend.index(batch)
+            total += len(batch)
+    return total
+
+
+def _write(apply):
+    """Write now inside the transaction, or after commit for the memory index."""
+    backend = get_backend()
+    if backend.transactional:
+        apply(backend)
+    elif backend.loaded:
+        # An unloaded index reads committed rows when it is first used.
+        transaction.on_commit(lambda: apply(backend))
+
+
+def index_objects(objs):
+    """Add or replace the documents of model instances (any searchable kinds)."""
+    docs = [document(obj) for obj in objs]
+    if docs:
+        _write(lambda backend: backend.index(docs))
+
+
+def remove_objects(objs):
+    doc_ids = [doc_id(KIND_OF[type(obj)], obj.pk) for obj in objs]
+    if doc_ids:
+        _write(lambda backend: backend.remove(doc_ids))
+
+
+def rebuild(batch_size=2000):
+    """Reload every document from the database; returns the number indexed."""
+    backend = get_backend()
+    with transaction.atomic():
+        backend.clear()
+        total = _fill(backend, batch_size)
+    backend.loaded = True
+    return total
+
+
+def search(query, limit=20, offset=0):
+    """Ranked ``Hit`` list for ``query``; empty when it has no words."""
+    words = parse_query(query)
+    if not words:
+        return []
+    return _loaded(get_backend()).search(words, limit, offset)
@@ -0,0 +1,314 @@
+# lms/seeding.py
+
+"""
+Bulk seeding of LMS data for benchmarks and load tests.
+
+Everything is inserted with ``bulk_create`` in batches so large volumes can
+be produced without per-row round trips. The output depends only on the
+arguments and ``seed``, and is skewed the way real usage is: course
+popularity follows a Zipf curve (a few hot courses, a long tail), students
+differ in how active and how able they are, questions differ in how hard
+they are, and attempts are spread over the last ``days`` days.
+"""
+
+import datetime
+import math
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from . import course_cards, search
+from .grading import coins_for_score
+from .models import (
+    Answer,
+    Attempt,
+    Choice,
+    Course,
+    CustomUser,
+    PDFResource,
+    Question,
+    Quiz,
+    StudentProfile,
+    Unit,
+    Video,
+)
+from .versions import COURSES, PDFS, QUIZZES, VIDEOS, bump
+
+SEMESTERS = ("Fall", "Spring", "Summer")
+
+
+def _bulk(model, objs, batch_size):
+    """``bulk_create`` from an iterator one batch at a time, in flat memory."""
+    objs = iter(objs)
+    while batch := list(islice(objs, batch_size)):
+        model.objects.bulk_create(batch, batch_size=batch_size)
+
+
+def _ids(model, start_pk):
+    return list(model.objects.filter(pk__gt=start_pk).order_by("pk").values_list("pk", flat=True))
+
+
+def _last_pk(model):
+    return model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def _zipf_weights(count, exponent):
+    """Cumulative weights where item ``n`` is ``1 / (n + 1) ** exponent`` as likely."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+@contextmanager
+def _explicit_timestamps(model, field_name):
+    """Let ``bulk_create`` keep the value given for an ``auto_now_add`` field."""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed(students=1000, courses=50, units_per_course=5, quizzes_per_course=5,
+         questions_per_quiz=10, attempts=10000, batch_size=2000, seed=0, teachers=None,
+         videos_per_course=4, pdfs_per_course=3, enrollments_per_student=4, skew=1.1,
+         days=180, password=None, answers=False):
+    """
+    Insert a synthetic dataset and return the number of rows per model.
+
+    ``password`` is hashed once and shared by every generated account, so
+    load tests can log in as any of them; by default the accounts cannot log
+    in at all. With ``answers`` every attempt also gets its ``Answer`` rows,
+    which multiplies the row count by ``questions_per_quiz``.
+    """
+    rng = random.Random(seed)
+    password = make_password(password)
+    counts = {}
+
+    teachers = max(courses // 10, 1) if teachers is None else teachers
+    start = _last_pk(CustomUser)
+    _bulk(
+        CustomUser,
+        (
+            CustomUser(email=f"faculty{start + n}@example.com", full_name=f"Professor {start + n}",
+                       is_student=False, is_teacher=True, password=password)
+            for n in range(teachers)
+        ),
+        batch_size,
+    )
+    teacher_ids = _ids(CustomUser, start)
+    counts["teachers"] = len(teacher_ids)
+
+    start = _last_pk(CustomUser)
+    _bulk(
+        CustomUser,
+        (
+            CustomUser(email=f"seed{start + n}@example.com", full_name=f"Student {start + n}",
+                       password=password)
+            for n in range(students)
+        ),
+        batch_size,
+    )
+    user_ids = _ids(CustomUser, start)
+    counts["users"] = len(user_ids)
+
+    start = _last_pk(Course)
+    _bulk(
+        Course,
+        (
+            Course(
+                title=f"Course {start + n}",
+                faculty_id=rng.choice(teacher_ids) if teacher_ids else None,
+                credits=rng.randint(1, 5),
+                semester=f"{rng.choice(SEMESTERS)} {rng.randint(2022, 2025)}",
+            )
+            for n in range(courses)
+        ),
+        batch_size,
+    )
+    course_ids = _ids(Course, start)
+    counts["courses"] = len(course_ids)
+
+    _bulk(
+        Unit,
+        (
+            Unit(course_id=course_id, title=f"Unit {order}", order=order,
+                 description=f"Week {order} of course {course_id}")
+            for course_id in course_ids
+            for order in range(1, units_per_course + 1)
+        ),
+        batch_size,
+    )
+    _bulk(
+        Video,
+        (
+            Video(course_id=course_id, title=f"Lecture {n + 1}",
+                  url=f"https://videos.example.com/{course_id}/{n + 1}")
+            for course_id in course_ids
+            for n in range(videos_per_course)
+        ),
+        batch_size,
+    )
+    _bulk(
+        PDFResource,
+        (
+            PDFResource(course_id=course_id, title=f"Handout {n + 1}",
+                        url=f"https://files.example.com/{course_id}/{n + 1}.pdf")
+            for course_id in course_ids
+            for n in range(pdfs_per_course)
+        ),
+        batch_size,
+    )
+    counts["videos"] = len(course_ids) * videos_per_course
+    counts["pdfs"] = len(course_ids) * pdfs_per_course
+
+    start = _last_pk(Quiz)
+    _bulk(
+        Quiz,
+        (
+            Quiz(course_id=course_id, title=f"Quiz {n + 1}",
+                 description=f"Checkpoint {n + 1} for course {course_id}")
+            for course_id in course_ids
+            for n in range(quizzes_per_course)
+        ),
+        batch_size,
+    )
+    quizzes_by_course = defaultdict(list)
+    for quiz_id, course_id in (
+        Quiz.objects.filter(pk__gt=start).order_by("pk").values_list("pk", "course_id")
+    ):
+        quizzes_by_course[course_id].append(quiz_id)
+    counts["quizzes"] = sum(len(ids) for ids in quizzes_by_course.values())
+
+    start = _last_pk(Question)
+    _bulk(
+        Question,
+        (
+            Question(quiz_id=quiz_id, text=f"Question {n + 1}")
+            for quiz_ids in quizzes_by_course.values()
+            for quiz_id in quiz_ids
+            for n in range(questions_per_quiz)
+        ),
+        batch_size,
+    )
+    questions_by_quiz = defaultdict(list)
+    for question_id, quiz_id in (
+        Question.objects.filter(pk__gt=start).order_by("pk").values_list("pk", "quiz_id")
+    ):
+        questions_by_quiz[quiz_id].append(question_id)
+    question_ids = [qid for ids in questions_by_quiz.values() for qid in ids]
+    start = _last_pk(Choice)
+    _bulk(
+        Choice,
+        (
+            Choice(question_id=question_id, text=f"Choice {n + 1}", is_correct=n == 0)
+            for question_id in question_ids
+            for n in range(4)
+        ),
+        batch_size,
+    )
+    counts["questions"] = len(question_ids)
+
+    # Item model: P(right) = logistic(ability - difficulty). The first choice
+    # is correct; wrong answers favour the second choice over the others.
+    choices_by_question = defaultdict(list)
+    for choice_id, question_id in (
+        Choice.objects.filter(pk__gt=start).order_by("pk").values_list("pk", "question_id")
+    ):
+        choices_by_question[question_id].append(choice_id)
+    items = {
+        quiz_id: [
+            (question_id, rng.uniform(-2.0, 1.5), choices_by_question[question_id])
+            for question_id in ids
+        ]
+        for quiz_id, ids in questions_by_quiz.items()
+    }
+
+    # Course popularity: course_ids[0] is the hottest, the tail is long.
+    popularity = _zipf_weights(len(course_ids), skew)
+    enrolled = {}
+    for user_id in user_ids:
+        wanted = min(rng.randint(1, 2 * enrollments_per_student - 1), len(course_ids))
+        picked = set()
+        while len(picked) < wanted:
+            picked.update(rng.choices(course_ids, cum_weights=popularity, k=wanted - len(picked)))
+        enrolled[user_id] = sorted(picked)
+
+    # Activity is skewed too: a minority of students make most attempts.
+    activity = _zipf_weights(len(user_ids), 0.8)
+    ability = {user_id: rng.gauss(0.8, 1.0) for user_id in user_ids}
+    earned = defaultdict(int)
+    now = timezone.now()
+    span = datetime.timedelta(days=days).total_seconds()
+
+    def attempt():
+        user_id = rng.choices(user_ids, cum_weights=activity)[0]
+        quiz_id = rng.choice(quizzes_by_course[rng.choice(enrolled[user_id])])
+        marks = []
+        for question_id, difficulty, choice_ids in items[quiz_id]:
+            right = rng.random() < 1 / (1 + math.exp(difficulty - ability[user_id]))
+            if right:
+                choice_id = choice_ids[0]
+            else:
+                choice_id = rng.choices(choice_ids[1:], weights=(3, 1, 1))[0]
+            marks.append((question_id, choice_id, right))
+        correct = sum(right for _, _, right in marks)
+        score = round(100 * correct / len(marks)) if marks else 0
+        coins = coins_for_score(score)
+        earned[user_id] += coins
+        return Attempt(
+            user_id=user_id, quiz_id=quiz_id, score=score, coins_earned=coins,
+            attempted_at=now - datetime.timedelta(seconds=rng.random() * span),
+        ), marks
+
+    if user_ids and counts["quizzes"] and questions_per_quiz:
+        generated = (attempt() for _ in range(attempts))
+        with _explicit_timestamps(Attempt, "attempted_at"):
+            while batch := list(islice(generated, batch_size)):
+                created = Attempt.objects.bulk_create([row for row, _ in batch])
+                if answers:
+                    # bulk_create sets primary keys on PostgreSQL and SQLite.
+                    _bulk(
+                        Answer,
+                        (
+                            Answer(attempt_id=row.pk, question_id=question_id,
+                                   choice_id=choice_id, is_correct=right)
+                            for row, (_, marks) in zip(created, batch)
+                            for question_id, choice_id, right in marks
+                        ),
+                        batch_size * questions_per_quiz,
+                    )
+        counts["attempts"] = attempts
+        if answers:
+            counts["answers"] = attempts * questions_per_quiz
+
+    # Profiles last, so their coins match the attempts just generated.
+    start = _last_pk(StudentProfile)
+    _bulk(
+        StudentProfile,
+        (StudentProfile(user_id=user_id, coins=earned[user_id]) for user_id in user_ids),
+        batch_size,
+    )
+    profile_ids = dict(
+        StudentProfile.objects.filter(pk__gt=start).values_list("user_id", "pk")
+    )
+    Enrollment = StudentProfile.enrolled_courses.through
+    _bulk(
+        Enrollment,
+        (
+            Enrollment(studentprofile_id=profile_ids[user_id], course_id=course_id)
+            for user_id, picked in enrolled.items()
+            for course_id in picked
+        ),
+        batch_size,
+    )
+    counts["enrollments"] = sum(len(ids) for ids in enrolled.values())
+    # bulk_create sends no signals, so move the list page ETags on and rebuild
+    # the dashboard cards and the search index here.
+    bump(COURSES, VIDEOS, PDFS, QUIZZES)
+    course_cards.rebuild(batch_size)
+    search.rebuild(batch_size)
+    return counts
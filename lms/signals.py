@@ -0,0 +1,190 @@
+# lms/signals.py
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import course_cards, search
+from .auth import invalidate_user, prime_user
+from .course_summary import invalidate_course_summary
+from .grading import invalidate_answer_key
+from .models import (
+    Attempt,
+    Choice,
+    Course,
+    CustomUser,
+    PDFResource,
+    Question,
+    Quiz,
+    StudentProfile,
+    Unit,
+    Video,
+)
+from .papers import invalidate_quiz_paper
+from .student_summary import invalidate_student_summary
+from .versions import COURSES, PDFS, QUIZZES, VIDEOS, bump, bump_course, bump_quiz_content
+
+
+def quiz_content_changed(quiz_id):
+    invalidate_answer_key(quiz_id)
+    invalidate_quiz_paper(quiz_id)
+    bump_quiz_content(quiz_id)
+
+
+@receiver(pre_save, sender=Question)
+def remember_quiz(sender, instance, **kwargs):
+    """Note the stored quiz of an edited question, in case it moves."""
+    if not instance._state.adding:
+        instance._stored_quiz_id = (
+            Question.objects.filter(pk=instance.pk).values_list("quiz_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    for quiz_id in {instance.quiz_id, getattr(instance, "_stored_quiz_id", None)} - {None}:
+        quiz_content_changed(quiz_id)
+
+
+@receiver(pre_save, sender=Choice)
+def remember_question(sender, instance, **kwargs):
+    """Note the stored question of an edited choice, in case it moves."""
+    if not instance._state.adding:
+        instance._stored_question_id = (
+            Choice.objects.filter(pk=instance.pk).values_list("question_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    question_ids = {instance.question_id, getattr(instance, "_stored_question_id", None)} - {None}
+    quiz_ids = Question.objects.filter(pk__in=question_ids).values_list("quiz_id", flat=True)
+    for quiz_id in set(quiz_ids) - {None}:
+        quiz_content_changed(quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Course)
+def course_changed(sender, instance, **kwargs):
+    # The summary (and the fragments keyed on its Course.version) is dropped
+    # again on commit; see invalidate_course_summary.
+    if kwargs["signal"] is post_save:
+        bump_course(instance.pk)
+        course_cards.refresh(instance.pk)
+    else:
+        bump(COURSES)
+    invalidate_course_summary(instance.pk)
+
+
+LISTED_AS = {Video: VIDEOS, PDFResource: PDFS, Quiz: QUIZZES}
+
+
+@receiver(pre_save, sender=Unit)
+@receiver(pre_save, sender=Video)
+@receiver(pre_save, sender=PDFResource)
+@receiver(pre_save, sender=Quiz)
+def remember_course(sender, instance, **kwargs):
+    """Note the stored course of an edited resource, in case it moves."""
+    if not instance._state.adding:
+        instance._stored_course_id = (
+            sender.objects.filter(pk=instance.pk).values_list("course_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Unit)
+@receiver([post_save, post_delete], sender=Video)
+@receiver([post_save, post_delete], sender=PDFResource)
+@receiver([post_save, post_delete], sender=Quiz)
+def course_resource_changed(sender, instance, **kwargs):
+    course_ids = {instance.course_id, getattr(instance, "_stored_course_id", None)} - {None}
+    for course_id in course_ids:
+        bump_course(course_id)
+        invalidate_course_summary(course_id)
+    course_cards.refresh(*course_ids)
+    if sender in LISTED_AS:
+        bump(LISTED_AS[sender])
+
+
+@receiver(m2m_changed, sender=StudentProfile.enrolled_courses.through)
+def enrollment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Forward (profile.enrolled_courses) the instance is a profile and pk_set
+    # holds courses; reverse (course.students) it is the other way round.
+    related = instance.students if reverse else instance.enrolled_courses
+    if action == "pre_clear":
+        instance._cleared_ids = set(related.values_list("pk", flat=True))
+        return
+    if not action.startswith("post_"):
+        return
+    other_ids = instance._cleared_ids if action == "post_clear" else pk_set
+    if reverse:
+        course_cards.refresh(instance.pk)
+        invalidate_student_summary(
+            *StudentProfile.objects.filter(pk__in=other_ids).values_list("user_id", flat=True)
+        )
+    else:
+        course_cards.refresh(*other_ids)
+        invalidate_student_summary(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Attempt)
+def attempt_changed(sender, instance, **kwargs):
+    invalidate_student_summary(instance.user_id)
+
+
+@receiver(pre_delete, sender=StudentProfile)
+def remember_enrollments(sender, instance, **kwargs):
+    # The enrollment rows go with the profile without an m2m_changed signal.
+    instance._enrolled_course_ids = list(instance.enrolled_courses.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=StudentProfile)
+def profile_deleted(sender, instance, **kwargs):
+    course_cards.refresh(*instance._enrolled_course_ids)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_changed(sender, instance, created, update_fields, **kwargs):
+    # Logins save last_login only; a new user teaches nothing yet.
+    if created or (update_fields and not {"full_name", "email"} & set(update_fields)):
+        return
+    course_cards.rename_faculty(instance)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def cached_user_changed(sender, instance, **kwargs):
+    # A stale last_login on the cached copy is harmless; keep it warm.
+    if kwargs.get("update_fields") != frozenset({"last_login"}):
+        invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+def cached_profile_changed(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(user_logged_in)
+def cache_logged_in_user(sender, user, **kwargs):
+    prime_user(user.pk)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def remember_taught_courses(sender, instance, **kwargs):
+    # Course.faculty is SET_NULL by a queryset update, which sends no signals.
+    instance._taught_course_ids = list(instance.courses_taught.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    course_cards.refresh(*instance._taught_course_ids)
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Unit)
+@receiver([post_save, post_delete], sender=Video)
+@receiver([post_save, post_delete], sender=PDFResource)
+@receiver([post_save, post_delete], sender=Quiz)
+@receiver([post_save, post_delete], sender=Question)
+def search_document_changed(sender, instance, **kwargs):
+    if kwargs["signal"] is post_save:
+        search.index_objects([instance])
+    else:
+        search.remove_objects([instance])
@@ -0,0 +1,87 @@
+# lms/student_summary.py
+
+"""
+The per-student dashboard payload.
+
+``build_student_summary`` loads the student's enrolled courses (with their
+``CourseCard``) and most recent attempts through ``Prefetch`` objects on the
+profile, so it runs three queries however many courses or attempts there
+are, plus the student's coins and rank from ``lms.leaderboard`` (one more
+query, O(rank), on the default database board). The result is cached per
+user and dropped by the signals in ``lms.signals`` when the student's
+attempts or enrollments change, so their own coins and rank are current
+after each quiz. Course titles and counts, and a rank moved by other
+students' credits, may lag by up to ``STUDENT_SUMMARY_TIMEOUT``.
+"""
+
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from core.cache import get_or_compute
+
+from . import leaderboard
+from .models import Attempt, Course, StudentProfile
+
+RECENT_ATTEMPTS = 10
+STUDENT_SUMMARY_TIMEOUT = 10 * 60
+
+
+def student_summary_cache_key(user_id):
+    return f"lms:student-summary:{user_id}"
+
+
+def _recent_attempts():
+    return Attempt.objects.select_related("quiz__course").order_by("-attempted_at", "-id")
+
+
+def build_student_summary(user_id):
+    rank, coins = leaderboard.rank_of(user_id)
+    standing = {"rank": rank, "coins": coins or 0}
+    profile = (
+        StudentProfile.objects.filter(user_id=user_id)
+        .prefetch_related(
+            Prefetch(
+                "enrolled_courses",
+                queryset=Course.objects.select_related("card").order_by("title", "id"),
+                to_attr="courses",
+            ),
+            Prefetch(
+                "user__attempts",
+                queryset=_recent_attempts()[:RECENT_ATTEMPTS],
+                to_attr="recent_attempts",
+            ),
+        )
+        .select_related("user")
+        .first()
+    )
+    if profile is None:
+        # No profile yet (nothing earned, nothing enrolled); attempts may exist.
+        return {
+            **standing,
+            "courses": [],
+            "attempts": list(_recent_attempts().filter(user_id=user_id)[:RECENT_ATTEMPTS]),
+        }
+    return {**standing, "courses": profile.courses, "attempts": profile.user.recent_attempts}
+
+
+def get_student_summary(user_id):
+    """Cached ``build_student_summary``; a warm entry costs no queries."""
+    return get_or_compute(
+        student_summary_cache_key(user_id),
+        partial(build_student_summary, user_id),
+        STUDENT_SUMMARY_TIMEOUT,
+    )
+
+
+def invalidate_student_summary(*user_ids):
+    """
+    Drop the cached summaries now and again once the current transaction
+    commits, so a summary rebuilt before the commit was visible is not kept.
+    """
+    keys = [student_summary_cache_key(user_id) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,91 @@
+# lms/submission_guard.py
+
+"""
+Protection for quiz submissions against double clicks, refresh re-posts and
+students hammering the submit button.
+
+Every render of ``take_quiz.html`` carries a fresh random token. The first
+POST with a token claims it in the cache with ``cache.add``; once graded (or
+queued) the token maps to the URL of the result page, so a repeat of the
+same form is answered from that one cache entry with a redirect, without a
+grading pass or an insert. A repeat arriving while the first is still being
+graded is sent to the student dashboard. Forms without a valid token (old
+pages, scripted clients) are graded as before.
+
+The cache claim is only exclusive when ``cache.add`` is atomic (Redis,
+Memcached, the database cache); the default file cache checks then writes.
+The guarantee of grading a form once is therefore the database's: the token
+is stored on the ``Attempt`` (or queued ``Submission``) under a unique
+constraint per user and quiz, so a duplicate that slips past the cache fails
+its insert and is sent to the first one's result with ``result_url``.
+
+``submit_rate_limit`` is a per-user token bucket on top, sized by
+``LMS_SUBMIT_BURST`` and ``LMS_SUBMIT_PER_MINUTE``.
+"""
+
+import re
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from core.ratelimit import TokenBucket
+
+from .models import Attempt, Submission
+
+TOKEN_FIELD = "submission_token"
+TOKEN_RE = re.compile(r"[A-Za-z0-9_-]{16,64}")
+TOKEN_TIMEOUT = 6 * 60 * 60
+PENDING = "pending"
+
+
+def new_token():
+    return secrets.token_urlsafe(16)
+
+
+def request_token(request):
+    """The form's token, or None if it is missing or malformed."""
+    token = request.POST.get(TOKEN_FIELD, "")
+    return token if TOKEN_RE.fullmatch(token) else None
+
+
+def token_cache_key(user_id, quiz_id, token):
+    return f"lms:submission-token:{user_id}:{quiz_id}:{token}"
+
+
+def outcome(user_id, quiz_id, token):
+    """None for an unused token, ``PENDING``, or the URL of the result page."""
+    return cache.get(token_cache_key(user_id, quiz_id, token))
+
+
+def claim(user_id, quiz_id, token):
+    """Mark the token as in use; False if another request got there first."""
+    return cache.add(token_cache_key(user_id, quiz_id, token), PENDING, TOKEN_TIMEOUT)
+
+
+def record(user_id, quiz_id, token, url):
+    cache.set(token_cache_key(user_id, quiz_id, token), url, TOKEN_TIMEOUT)
+
+
+def result_url(user_id, quiz_id, token):
+    """The result page of the attempt or submission already made with ``token``."""
+    rows = {"user_id": user_id, "quiz_id": quiz_id, "submission_token": token}
+    submission_id = Submission.objects.filter(**rows).values_list("pk", flat=True).first()
+    if submission_id:
+        return reverse("submission_status", args=[submission_id])
+    attempt_id = Attempt.objects.filter(**rows).values_list("pk", flat=True).first()
+    return reverse("quiz_result", args=[attempt_id]) if attempt_id else None
+
+
+def release(user_id, quiz_id, token):
+    """Forget a claim whose submission failed, so the form can be sent again."""
+    cache.delete(token_cache_key(user_id, quiz_id, token))
+
+
+def submit_rate_limit(user_id):
+    """Seconds the user must wait before submitting again; 0 to go ahead."""
+    bucket = TokenBucket(
+        "quiz-submit", settings.LMS_SUBMIT_BURST, settings.LMS_SUBMIT_PER_MINUTE / 60
+    )
+    return bucket.consume(user_id)
@@ -0,0 +1,79 @@
+# lms/tasks.py
+
+"""
+Background grading.
+
+With ``settings.LMS_BACKGROUND_GRADING`` on, ``take_quiz`` only stores a
+``Submission`` (one INSERT) and queues ``grade_submission`` on the
+``core.tasks`` backend. Grading, the coin credit, the leaderboard update and
+the analytics rollups then happen in the worker through ``submit_answers``.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.tasks import enqueue
+
+from .grading import submit_answers
+from .models import Submission
+
+logger = logging.getLogger(__name__)
+
+
+def accept_submission(user, quiz, data, token=None):
+    """
+    Persist the raw answers and queue them for grading. A repeated
+    ``token`` raises ``IntegrityError``, as in ``submit_answers``.
+    """
+    answers = {key: value for key, value in data.items() if key.isdigit()}
+    # A savepoint, so a duplicate token leaves an outer transaction usable.
+    with transaction.atomic():
+        submission = Submission.objects.create(
+            user=user, quiz=quiz, answers=answers, submission_token=token
+        )
+    enqueue(grade_submission, submission.pk)
+    return submission
+
+
+def grade_submission(submission_id):
+    """
+    Grade a pending submission into an ``Attempt``.
+
+    Idempotent: the status flips from pending to graded in the same
+    transaction that writes the attempt, so a second run (a retried task or
+    the drain command) finds nothing to do, and a failed run rolls back to
+    pending to be picked up again.
+    """
+    with transaction.atomic():
+        claimed = Submission.objects.filter(
+            pk=submission_id, status=Submission.PENDING
+        ).update(status=Submission.GRADED)
+        if not claimed:
+            return None
+        submission = Submission.objects.select_related("user", "quiz").get(pk=submission_id)
+        result = submit_answers(
+            submission.user, submission.quiz, submission.answers, submission.submission_token
+        )
+        submission.attempt = result.attempt
+        submission.save(update_fields=["attempt"])
+    return result
+
+
+def pending_submissions(older_than=0):
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return Submission.objects.filter(status=Submission.PENDING, created_at__lte=cutoff)
+
+
+def drain(limit=None, older_than=0):
+    """Grade pending submissions in order; returns how many were graded."""
+    ids = pending_submissions(older_than).order_by("created_at").values_list("pk", flat=True)
+    graded = 0
+    for submission_id in ids[:limit] if limit else ids:
+        try:
+            graded += grade_submission(submission_id) is not None
+        except Exception:
+            logger.exception("Grading submission %s failed", submission_id)
+    return graded
@@ -0,0 +1,21 @@
+from django import template
+
+from lms.fragments import FragmentNode
+
+register = template.Library()
+
+
+@register.tag("fragment")
+def do_fragment(parser, token):
+    """
+    Cache a template fragment under a name and version stamps::
+
+        {% fragment "course_card" course.id course.version %}...{% endfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    name = bits[1].strip("\"'")
+    return FragmentNode(nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]])
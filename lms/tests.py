@@ -1,3 +1,1184 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+from contextlib import nullcontext
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.db.models import Count
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import TestCase
+
+from . import analytics, async_views, benchmarks, course_cards, leaderboard, search
+from . import submission_guard
+from .auth import CachedModelBackend
+from .coins import credit_coins
+from .grading import answer_key_cache_key, get_answer_key, submit_answers
+from .course_summary import course_summary_cache_key, get_course_summary
+from .exports import attempt_rows
+from .importers import import_questions
+from .item_analysis import analyse_quiz, get_report
+from .models import (
+    Answer,
+    Attempt,
+    Choice,
+    Course,
+    CourseCard,
+    CustomUser,
+    PDFResource,
+    Question,
+    QuestionStats,
+    Quiz,
+    QuizStats,
+    StudentProfile,
+    Submission,
+    Unit,
+    Video,
+)
+from .papers import get_quiz_paper, paper_cache_key
+from .seeding import seed
+from .tasks import accept_submission, grade_submission
+
+
+def make_quiz(num_questions, course=None, title="Quiz"):
+    quiz = Quiz.objects.create(course=course, title=title)
+    for n in range(num_questions):
+        question = Question.objects.create(quiz=quiz, text=f"Question {n}")
+        Choice.objects.create(question=question, text="Right", is_correct=True)
+        Choice.objects.create(question=question, text="Wrong", is_correct=False)
+    return quiz
+
+
+def correct_answers(quiz):
+    return {
+        str(question_id): str(choice_id)
+        for question_id, choice_id in Choice.objects.filter(
+            question__quiz=quiz, is_correct=True
+        ).values_list("question_id", "id")
+    }
+
+
+class GradingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user)
+        self.course = Course.objects.create(title="Algebra")
+
+    def test_answer_key_is_one_query(self):
+        quiz = make_quiz(5, self.course)
+        with self.assertNumQueries(1):
+            key = get_answer_key(quiz.id)
+        with self.assertNumQueries(0):
+            get_answer_key(quiz.id)
+        self.assertEqual(len(key), 5)
+        self.assertTrue(all(len(ids) == 1 for ids in key.values()))
+
+    def test_grading_queries_do_not_grow_with_quiz_size(self):
+        counts = []
+        for size in (1, 25):
+            quiz = make_quiz(size, self.course)
+            result = submit_answers(self.user, quiz, correct_answers(quiz))
+            self.assertEqual((result.correct, result.total, result.score), (size, size, 100))
+            counts.append(result.queries)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_partial_and_invalid_answers(self):
+        quiz = make_quiz(4, self.course)
+        answers = correct_answers(quiz)
+        question_ids = sorted(answers)
+        answers[question_ids[0]] = "not-a-number"
+        del answers[question_ids[1]]
+        result = submit_answers(self.user, quiz, answers)
+        self.assertEqual(result.score, 50)
+        self.assertEqual(result.coins, 5)
+
+    def test_key_cached_before_commit_is_dropped(self):
+        quiz = make_quiz(1, self.course)
+        question = quiz.questions.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.create(question=question, text="Also right", is_correct=True)
+            # A submission graded before the edit commits caches the key again.
+            get_answer_key(quiz.id)
+            self.assertIsNotNone(cache.get(answer_key_cache_key(quiz.id)))
+        self.assertIsNone(cache.get(answer_key_cache_key(quiz.id)))
+        self.assertEqual(len(get_answer_key(quiz.id)[question.id]), 2)
+
+    def test_admin_edit_invalidates_answer_key(self):
+        quiz = make_quiz(2, self.course)
+        get_answer_key(quiz.id)
+        question = quiz.questions.first()
+        Choice.objects.create(question=question, text="Also right", is_correct=True)
+        self.assertEqual(len(get_answer_key(quiz.id)[question.id]), 2)
+
+    def test_moving_a_question_invalidates_both_quizzes(self):
+        old, new = make_quiz(2, self.course), make_quiz(1, self.course)
+        get_answer_key(old.id), get_answer_key(new.id)
+        get_quiz_paper(old.id)
+        question = old.questions.first()
+        question.quiz = new
+        question.save()
+        self.assertNotIn(question.id, get_answer_key(old.id))
+        self.assertIn(question.id, get_answer_key(new.id))
+        self.assertIsNone(cache.get(paper_cache_key(old.id)))
+
+    def test_take_quiz_post(self):
+        quiz = make_quiz(3, self.course)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("take_quiz", args=[quiz.id]), correct_answers(quiz))
+        attempt = Attempt.objects.get()
+        self.assertRedirects(response, reverse("quiz_result", args=[attempt.id]))
+        self.assertEqual((attempt.score, attempt.coins_earned), (100, 10))
+
+
+@override_settings(LMS_BACKGROUND_GRADING=True, TASK_BACKEND="database")
+class BackgroundGradingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user)
+        self.quiz = make_quiz(3)
+        self.client.force_login(self.user)
+
+    def test_submission_is_queued_then_drained(self):
+        response = self.client.post(reverse("take_quiz", args=[self.quiz.id]), correct_answers(self.quiz))
+        submission = Submission.objects.get()
+        self.assertRedirects(response, reverse("submission_status", args=[submission.id]))
+        self.assertFalse(Attempt.objects.exists())
+        self.assertContains(self.client.get(response.url), "Grading your answers")
+
+        call_command("process_submissions", stdout=StringIO())
+        attempt = Attempt.objects.get()
+        self.assertEqual(attempt.score, 100)
+        self.assertRedirects(
+            self.client.get(response.url), reverse("quiz_result", args=[attempt.id])
+        )
+
+    def test_grading_is_idempotent(self):
+        submission = accept_submission(self.user, self.quiz, correct_answers(self.quiz))
+        self.assertIsNotNone(grade_submission(submission.id))
+        self.assertIsNone(grade_submission(submission.id))
+        self.assertEqual(Attempt.objects.count(), 1)
+        self.assertEqual(StudentProfile.objects.get(user=self.user).coins, 10)
+
+    @override_settings(TASK_BACKEND="immediate")
+    def test_immediate_backend_grades_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("take_quiz", args=[self.quiz.id]), correct_answers(self.quiz)
+            )
+        self.assertEqual(Submission.objects.get().status, Submission.GRADED)
+        response = self.client.get(response.url, follow=True)
+        self.assertContains(response, "Score: 100%")
+
+
+class SubmissionGuardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user)
+        self.quiz = make_quiz(3)
+        self.url = reverse("take_quiz", args=[self.quiz.id])
+        self.client.force_login(self.user)
+
+    def form(self):
+        token = self.client.get(self.url).context["submission_token"]
+        return {**correct_answers(self.quiz), submission_guard.TOKEN_FIELD: token}
+
+    def test_resubmitted_form_is_graded_once(self):
+        data = self.form()
+        first = self.client.post(self.url, data)
+        attempt = Attempt.objects.get()
+        self.assertRedirects(first, reverse("quiz_result", args=[attempt.id]))
+        # Answered from the token's cache entry: no grading, no insert.
+        with self.assertNumQueries(0):
+            second = self.client.post(self.url, data)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Attempt.objects.count(), 1)
+        self.assertEqual(StudentProfile.objects.get(user=self.user).coins, 10)
+        # A fresh form is a new submission.
+        self.client.post(self.url, self.form())
+        self.assertEqual(Attempt.objects.count(), 2)
+
+    @override_settings(LMS_BACKGROUND_GRADING=True, TASK_BACKEND="database")
+    def test_resubmitted_form_is_queued_once(self):
+        data = self.form()
+        first = self.client.post(self.url, data)
+        self.assertEqual(self.client.post(self.url, data).url, first.url)
+        self.assertEqual(Submission.objects.count(), 1)
+
+    def test_database_grades_once_when_cache_claims_race(self):
+        # Both workers miss the cache entry and both claims succeed, as can
+        # happen on a cache whose add() is not atomic.
+        data = self.form()
+        with mock.patch.object(submission_guard, "outcome", return_value=None), \
+                mock.patch.object(submission_guard, "claim", return_value=True):
+            first = self.client.post(self.url, data)
+            second = self.client.post(self.url, data)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Attempt.objects.count(), 1)
+        self.assertEqual(StudentProfile.objects.get(user=self.user).coins, 10)
+
+    @override_settings(LMS_BACKGROUND_GRADING=True, TASK_BACKEND="database")
+    def test_database_queues_once_when_cache_claims_race(self):
+        data = self.form()
+        with mock.patch.object(submission_guard, "outcome", return_value=None), \
+                mock.patch.object(submission_guard, "claim", return_value=True):
+            first = self.client.post(self.url, data)
+            second = self.client.post(self.url, data)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(Submission.objects.count(), 1)
+
+    def test_submission_in_progress(self):
+        data = self.form()
+        submission_guard.claim(self.user.pk, self.quiz.id, data[submission_guard.TOKEN_FIELD])
+        response = self.client.post(self.url, data)
+        self.assertRedirects(response, reverse("student_dashboard"))
+        self.assertFalse(Attempt.objects.exists())
+
+    def test_failed_submission_can_be_retried(self):
+        data = self.form()
+        with mock.patch("lms.views.submit_answers", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.url, data)
+        self.client.post(self.url, data)
+        self.assertEqual(Attempt.objects.count(), 1)
+
+    @override_settings(LMS_SUBMIT_BURST=2, LMS_SUBMIT_PER_MINUTE=1)
+    def test_rate_limited(self):
+        answers = correct_answers(self.quiz)
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, answers).status_code, 302)
+        response = self.client.post(self.url, answers)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual(Attempt.objects.count(), 2)
+
+
+class QuizPaperTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+
+    def test_paper_queries_are_bounded(self):
+        for size in (1, 20):
+            quiz = make_quiz(size, title=f"Quiz {size}")
+            with self.assertNumQueries(2):
+                paper = get_quiz_paper(quiz.id)
+            self.assertEqual(paper.count("question-card"), size)
+            with self.assertNumQueries(0):
+                get_quiz_paper(quiz.id)
+
+    def test_choice_edit_drops_cached_paper(self):
+        quiz = make_quiz(1)
+        get_quiz_paper(quiz.id)
+        choice = Choice.objects.filter(question__quiz=quiz).first()
+        choice.text = "Edited in admin"
+        choice.save()
+        self.assertIn("Edited in admin", get_quiz_paper(quiz.id))
+        choice.delete()
+        self.assertNotIn("Edited in admin", get_quiz_paper(quiz.id))
+
+    def test_paper_rendered_before_commit_is_dropped(self):
+        quiz = make_quiz(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(quiz=quiz, text="Added in admin")
+            # A student opening the quiz before the edit commits.
+            get_quiz_paper(quiz.id)
+        self.assertIsNone(cache.get(paper_cache_key(quiz.id)))
+
+    def test_take_quiz_get_renders_paper(self):
+        quiz = make_quiz(2)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("take_quiz", args=[quiz.id]))
+        self.assertContains(response, 'class="form-check-input"', count=4)
+
+
+class CoinLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.quiz = make_quiz(2)
+
+    def test_attempt_credits_profile(self):
+        StudentProfile.objects.create(user=self.user, coins=3)
+        submit_answers(self.user, self.quiz, correct_answers(self.quiz))
+        submit_answers(self.user, self.quiz, {})
+        self.assertEqual(StudentProfile.objects.get(user=self.user).coins, 3 + 10 + 2)
+
+    def test_attempt_creates_missing_profile(self):
+        submit_answers(self.user, self.quiz, correct_answers(self.quiz))
+        self.assertEqual(StudentProfile.objects.get(user=self.user).coins, 10)
+
+    def test_rebuild_coins_command(self):
+        other = CustomUser.objects.create_user(email="other@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user, coins=999)
+        StudentProfile.objects.create(user=other, coins=5)
+        late = CustomUser.objects.create_user(email="late@example.com", password="pw")
+        Attempt.objects.create(user=self.user, quiz=self.quiz, score=100, coins_earned=10)
+        Attempt.objects.create(user=self.user, quiz=self.quiz, score=50, coins_earned=5)
+        Attempt.objects.create(user=late, quiz=self.quiz, score=0, coins_earned=2)
+        call_command("rebuild_coins", stdout=StringIO())
+        coins = dict(StudentProfile.objects.values_list("user__email", "coins"))
+        self.assertEqual(
+            coins,
+            {"student@example.com": 15, "other@example.com": 0, "late@example.com": 2},
+        )
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.users = []
+        for n, coins in enumerate([50, 10, 30, 40, 20]):
+            user = CustomUser.objects.create_user(email=f"s{n}@example.com", password="pw")
+            StudentProfile.objects.create(user=user, coins=coins)
+            self.users.append(user)
+
+    def test_in_memory_sorted_set(self):
+        board = leaderboard.InMemoryLeaderboard()
+        board.set_many({1: 5, 2: 9, 3: 7})
+        board.incr(1, 10)
+        self.assertEqual(board.range(0, 2), [(1, 15), (2, 9), (3, 7)])
+        self.assertEqual(board.rank(3), 2)
+        board.remove(2)
+        self.assertEqual((board.rank(3), board.count()), (1, 2))
+
+    def test_redis_board_seeds_only_a_missing_set(self):
+        board = leaderboard.RedisLeaderboard.__new__(leaderboard.RedisLeaderboard)
+        board.key, board.redis = "lms:leaderboard", mock.Mock()
+        board.redis.exists.return_value = 1
+        self.assertFalse(board.seed([{1: 5}]))
+        board.redis.exists.return_value = 0
+        board.redis.set.return_value = None
+        self.assertFalse(board.seed([{1: 5}]))
+        board.redis.zadd.assert_not_called()
+        board.redis.delete.assert_not_called()
+        board.redis.set.return_value = True
+        board.redis.exists.side_effect = [0, 0, 1]
+        self.assertTrue(board.seed([{1: 5}]))
+        building = board.redis.zadd.call_args.args[0]
+        board.redis.rename.assert_called_once_with(building, "lms:leaderboard")
+        self.assertNotIn(mock.call("lms:leaderboard"), board.redis.delete.call_args_list)
+
+    def test_rank_and_neighbours(self):
+        for board in (leaderboard.DatabaseLeaderboard(), leaderboard.InMemoryLeaderboard()):
+            with self.subTest(board=type(board).__name__):
+                with mock.patch.object(leaderboard, "_board", board):
+                    leaderboard.rebuild()
+                    self.assertEqual(leaderboard.rank_of(self.users[2].pk), (3, 30))
+                    around = leaderboard.around(self.users[2].pk, radius=1)
+                    self.assertEqual([row["rank"] for row in around], [2, 3, 4])
+                    self.assertEqual(leaderboard.rank_of(0), (None, None))
+
+    def test_attempt_updates_board_on_commit(self):
+        with mock.patch.object(leaderboard, "_board", leaderboard.InMemoryLeaderboard()):
+            leaderboard.rebuild()
+            quiz = make_quiz(1)
+            with self.captureOnCommitCallbacks(execute=True):
+                submit_answers(self.users[1], quiz, correct_answers(quiz))
+            self.assertEqual(leaderboard.rank_of(self.users[1].pk), (4, 20))
+
+    def test_database_board_sees_credits_made_elsewhere(self):
+        self.assertIsInstance(leaderboard.get_board(), leaderboard.DatabaseLeaderboard)
+        self.assertEqual(leaderboard.rank_of(self.users[1].pk), (5, 10))
+        # Another worker's credit: nothing in this process hears about it.
+        StudentProfile.objects.filter(user=self.users[1]).update(coins=45)
+        self.assertEqual(leaderboard.rank_of(self.users[1].pk), (2, 45))
+
+    def test_leaderboard_view(self):
+        self.client.force_login(self.users[3])
+        response = self.client.get(reverse("leaderboard"))
+        self.assertEqual(response.context["my_rank"], 2)
+        self.assertEqual(len(response.context["leaders"]), 5)
+
+    def test_ties_rank_as_in_the_table(self):
+        StudentProfile.objects.filter(user__in=self.users[1:]).update(coins=20)
+        leaderboard.reset()
+        self.client.force_login(self.users[3])
+        response = self.client.get(reverse("leaderboard"))
+        table = [profile.user_id for profile in response.context["leaders"]]
+        self.assertEqual(table, [self.users[0].pk] + sorted(u.pk for u in self.users[1:]))
+        self.assertEqual(response.context["my_rank"], table.index(self.users[3].pk) + 1)
+        neighbours = [row["user"].pk for row in response.context["neighbours"]]
+        self.assertEqual(neighbours, table[1:])
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.client.force_login(self.user)
+        Course.objects.bulk_create([Course(title=f"Course {n}") for n in range(45)])
+        course_cards.rebuild()
+
+    def test_keyset_pages_cover_every_row_once(self):
+        seen, query = [], {}
+        while True:
+            response = self.client.get(reverse("api_courses"), query)
+            data = response.json()
+            seen.extend(row["id"] for row in data["results"])
+            if not data["next"]:
+                break
+            query = {"after": data["next"]}
+        self.assertEqual(seen, list(Course.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_keyset_query_cost_does_not_depend_on_page(self):
+        first = self.client.get(reverse("api_courses")).json()
+        second = self.client.get(reverse("api_courses"), {"after": first["next"]}).json()
+        self.assertEqual(second["start_index"], 20)
+        with self.assertNumQueries(1):
+            self.client.get(reverse("api_courses"), {"after": second["next"]})
+
+    def test_list_pages_render(self):
+        for name in ("dashboard", "lectures", "quiz_list", "leaderboard"):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+        response = self.client.get(reverse("dashboard"))
+        self.assertEqual(len(response.context["courses"]), 20)
+        self.assertContains(response, "Next")
+
+    def test_offset_fallback(self):
+        response = self.client.get(reverse("dashboard"), {"page": 3})
+        courses = response.context["courses"]
+        self.assertEqual((courses.number, courses.num_pages, len(courses)), (3, 3, 5))
+
+    def test_leaderboard_pages_descending_coins(self):
+        for n in range(5):
+            user = CustomUser.objects.create_user(email=f"s{n}@example.com", password="pw")
+            StudentProfile.objects.create(user=user, coins=n * 10)
+        data = self.client.get(reverse("api_leaderboard"), {"per_page": 3}).json()
+        self.assertEqual([row["coins"] for row in data["results"]], [40, 30, 20])
+        data = self.client.get(reverse("api_leaderboard"), {"per_page": 3, "after": data["next"]}).json()
+        self.assertEqual([row["coins"] for row in data["results"]], [10, 0])
+        self.assertIsNone(data["next"])
+
+
+class CourseSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.course = Course.objects.create(title="Physics")
+        Unit.objects.create(course=self.course, title="Motion", order=1)
+        Video.objects.create(course=self.course, title="Lecture 1")
+        PDFResource.objects.create(course=self.course, title="Notes")
+        Quiz.objects.create(course=self.course, title="Quiz 1")
+        self.url = reverse("course_detail", args=[self.course.id])
+
+    def test_cached_course_page_skips_content_queries(self):
+        self.client.get(self.url)
+        # Session and user come from the cache; only the version stamp remains.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response.context["counts"], {"units": 1, "videos": 1, "pdfs": 1, "quizzes": 1}
+        )
+
+    def test_resource_changes_invalidate_summary(self):
+        self.client.get(self.url)
+        Video.objects.create(course=self.course, title="Lecture 2")
+        Unit.objects.filter(course=self.course).first().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["counts"]["videos"], 2)
+        self.assertEqual(response.context["counts"]["units"], 0)
+        self.assertContains(response, "Lecture 2")
+
+    def test_summary_rebuilt_before_commit_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Video.objects.create(course=self.course, title="Lecture 2")
+            # A concurrent request rebuilding before the commit is visible.
+            get_course_summary(self.course.id)
+            self.assertIsNotNone(cache.get(course_summary_cache_key(self.course.id)))
+        self.assertIsNone(cache.get(course_summary_cache_key(self.course.id)))
+
+    def test_missing_course_is_404(self):
+        self.assertEqual(self.client.get(reverse("course_detail", args=[999])).status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.course = Course.objects.create(title="Physics")
+        self.unit = Unit.objects.create(course=self.course, title="Motion", order=1)
+        Video.objects.create(course=self.course, title="Lecture 1")
+        Quiz.objects.create(course=self.course, title="Quiz 1")
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_304(self):
+        for name, args in [
+            ("dashboard", []),
+            ("lectures", []),
+            ("quiz_list", []),
+            ("course_detail", [self.course.id]),
+        ]:
+            url = reverse(name, args=args)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header("Last-Modified"))
+            # One version stamp (session and user are cached); nothing is rendered.
+            with self.assertNumQueries(1):
+                response = self.revalidate(url, response["ETag"])
+            self.assertEqual(response.status_code, 304, name)
+
+    def test_content_changes_change_etag(self):
+        url = reverse("lectures")
+        etag = self.client.get(url)["ETag"]
+        Video.objects.create(course=self.course, title="Lecture 2")
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Lecture 2")
+
+        url = reverse("course_detail", args=[self.course.id])
+        etag = self.client.get(url)["ETag"]
+        self.unit.title = "Forces"
+        self.unit.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_unrelated_changes_keep_etag(self):
+        url = reverse("quiz_list")
+        etag = self.client.get(url)["ETag"]
+        Video.objects.create(course=self.course, title="Lecture 2")
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+    def test_etag_is_per_user(self):
+        url = reverse("dashboard")
+        etag = self.client.get(url)["ETag"]
+        other = CustomUser.objects.create_user(email="other@example.com", password="pw")
+        self.client.force_login(other)
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_undecorated_pages_have_no_etag(self):
+        quiz = Quiz.objects.get()
+        url = reverse("take_quiz", args=[quiz.id])
+        self.assertFalse(self.client.get(url).has_header("ETag"))
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user, coins=5)
+        self.client.force_login(self.user)
+        self.course = Course.objects.create(title="Physics", faculty=self.user)
+        self.unit = Unit.objects.create(course=self.course, title="Motion", order=1)
+
+    def test_course_card_is_reused_until_the_course_changes(self):
+        self.assertContains(self.client.get(reverse("dashboard")), "Physics")
+        # Same card version, different content: the cached fragment is served.
+        CourseCard.objects.filter(pk=self.course.pk).update(title="Chemistry")
+        self.assertContains(self.client.get(reverse("dashboard")), "Physics")
+        self.course.title = "Biology"
+        self.course.save()
+        self.assertContains(self.client.get(reverse("dashboard")), "Biology")
+
+    def test_unit_accordion_follows_course_version(self):
+        url = reverse("course_detail", args=[self.course.id])
+        self.assertContains(self.client.get(url), "Motion")
+        self.unit.title = "Forces"
+        self.unit.save()
+        response = self.client.get(url)
+        self.assertContains(response, "Forces")
+        self.assertNotContains(response, "Motion")
+
+    def test_leaderboard_rows_follow_coins(self):
+        self.assertContains(self.client.get(reverse("leaderboard")), "<td>5</td>")
+        StudentProfile.objects.filter(user=self.user).update(coins=9)
+        self.assertContains(self.client.get(reverse("leaderboard")), "<td>9</td>")
+
+    @override_settings(LMS_FRAGMENT_CACHE_TIMEOUT=0)
+    def test_zero_timeout_disables_fragments(self):
+        self.client.get(reverse("dashboard"))
+        CourseCard.objects.filter(pk=self.course.pk).update(title="Chemistry")
+        self.assertContains(self.client.get(reverse("dashboard")), "Chemistry")
+
+
+class CourseCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = CustomUser.objects.create_user(
+            email="teacher@example.com", password="pw", full_name="Dr. Ada"
+        )
+        self.course = Course.objects.create(
+            title="Physics", faculty=self.teacher, credits=4, semester="Fall"
+        )
+
+    def card(self, course=None):
+        return CourseCard.objects.get(pk=(course or self.course).pk)
+
+    def test_card_follows_course_and_content(self):
+        card = self.card()
+        self.assertEqual(
+            (card.title, card.faculty_name, card.credits, card.semester), ("Physics", "Dr. Ada", 4, "Fall")
+        )
+        Unit.objects.create(course=self.course, title="Motion")
+        Video.objects.create(course=self.course, title="Lecture 1")
+        PDFResource.objects.create(course=self.course, title="Notes")
+        quiz = Quiz.objects.create(course=self.course, title="Quiz 1")
+        card = self.card()
+        self.assertEqual((card.units, card.videos, card.pdfs, card.quizzes), (1, 1, 1, 1))
+        quiz.delete()
+        self.assertEqual(self.card().quizzes, 0)
+
+    def test_moved_resource_updates_both_cards(self):
+        other = Course.objects.create(title="Chemistry")
+        video = Video.objects.create(course=self.course, title="Lecture 1")
+        video.course = other
+        video.save()
+        self.assertEqual((self.card().videos, self.card(other).videos), (0, 1))
+
+    def test_enrollments_from_either_side(self):
+        profile = StudentProfile.objects.create(
+            user=CustomUser.objects.create_user(email="student@example.com", password="pw")
+        )
+        profile.enrolled_courses.add(self.course)
+        self.assertEqual(self.card().students, 1)
+        profile.enrolled_courses.clear()
+        self.assertEqual(self.card().students, 0)
+        self.course.students.add(profile)
+        self.assertEqual(self.card().students, 1)
+        profile.delete()
+        self.assertEqual(self.card().students, 0)
+
+    def test_faculty_changes(self):
+        self.teacher.full_name = "Prof. Ada"
+        self.teacher.save()
+        self.assertEqual(self.card().faculty_name, "Prof. Ada")
+        self.teacher.delete()
+        self.assertEqual(self.card().faculty_name, "")
+
+    def test_rebuild_matches_signals(self):
+        Unit.objects.create(course=self.course, title="Motion")
+        expected = list(CourseCard.objects.values_list("pk", "title", "faculty_name", "units"))
+        CourseCard.objects.all().delete()
+        self.assertEqual(course_cards.rebuild(), 1)
+        self.assertEqual(
+            list(CourseCard.objects.values_list("pk", "title", "faculty_name", "units")), expected
+        )
+
+    def test_dashboard_reads_only_cards(self):
+        Course.objects.create(title="Chemistry", faculty=self.teacher)
+        self.client.force_login(self.teacher)
+        # Version stamp and one scan of the card table.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("dashboard"))
+        self.assertContains(response, "Dr. Ada", count=2)
+
+
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.profile = StudentProfile.objects.create(user=self.user, coins=0)
+        self.client.force_login(self.user)
+        self.url = reverse("student_dashboard")
+
+    def add_activity(self, courses, attempts):
+        for n in range(courses):
+            course = Course.objects.create(title=f"Course {n}")
+            self.profile.enrolled_courses.add(course)
+        quiz = make_quiz(1, course, title="Quiz")
+        for _ in range(attempts):
+            submit_answers(self.user, quiz, correct_answers(quiz))
+        cache.clear()
+        leaderboard.rebuild()
+
+    def test_shows_enrollments_attempts_coins_and_rank(self):
+        self.add_activity(courses=2, attempts=1)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Course 0")
+        self.assertContains(response, "Course 1")
+        self.assertContains(response, "100%")
+        self.assertContains(response, "Rank #1")
+        self.assertEqual(len(response.context["attempts"]), 1)
+
+    def test_query_count_does_not_grow_with_activity(self):
+        for courses, attempts in [(1, 1), (6, 15)]:
+            self.add_activity(courses, attempts)
+            # Cache cleared: session, user, then rank, profile, courses and attempts.
+            with self.assertNumQueries(6):
+                response = self.client.get(self.url)
+            self.assertLessEqual(len(response.context["attempts"]), 10)
+            # Everything cached, including the session and user.
+            with self.assertNumQueries(0):
+                self.client.get(self.url)
+
+    def test_new_attempt_and_enrollment_invalidate(self):
+        self.add_activity(courses=1, attempts=0)
+        self.client.get(self.url)
+        course = Course.objects.create(title="Late Course")
+        self.profile.enrolled_courses.add(course)
+        self.assertContains(self.client.get(self.url), "Late Course")
+        quiz = make_quiz(1, course, title="Late Quiz")
+        submit_answers(self.user, quiz, correct_answers(quiz))
+        self.assertContains(self.client.get(self.url), "Late Quiz")
+
+    def test_user_without_profile(self):
+        self.profile.delete()
+        response = self.client.get(self.url)
+        self.assertContains(response, "not enrolled")
+        self.assertContains(response, "No attempts yet")
+
+
+class SearchTests(TestCase):
+    backend = "sqlite"
+
+    def setUp(self):
+        cache.clear()
+        search.reset()
+        self.addCleanup(search.reset)
+        settings = override_settings(LMS_SEARCH_BACKEND=self.backend)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.client.force_login(self.user)
+        # Load the index before the writes below, as a running server would.
+        search.search("warmup")
+        with self.change():
+            self.course = Course.objects.create(title="Thermodynamics")
+            Unit.objects.create(course=self.course, title="Heat engines",
+                                description="Carnot cycle and entropy")
+            self.quiz = make_quiz(1, self.course, title="Entropy check")
+
+    def change(self):
+        """Writes reach the in-memory index on commit; the FTS table at once."""
+        return nullcontext() if search.get_backend().transactional else (
+            self.captureOnCommitCallbacks(execute=True)
+        )
+
+    def kinds(self, query):
+        return [hit.kind for hit in search.search(query)]
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.kinds("entropy"), ["quiz", "unit"])
+
+    def test_all_words_must_match_and_last_is_a_prefix(self):
+        self.assertEqual(self.kinds("carnot entr"), ["unit"])
+        self.assertEqual(self.kinds("thermo"), ["course"])
+        self.assertEqual(self.kinds("carnot thermodynamics"), [])
+        self.assertEqual(search.search("  ?! "), [])
+
+    def test_signals_keep_index_current(self):
+        with self.change():
+            self.quiz.title = "Final exam"
+            self.quiz.save()
+        self.assertEqual(self.kinds("exam"), ["quiz"])
+        self.assertEqual(self.kinds("entropy"), ["unit"])
+        with self.change():
+            self.course.delete()
+        self.assertEqual(self.kinds("entropy"), [])
+        self.assertEqual(self.kinds("question"), [])
+
+    def test_rebuild_indexes_bulk_writes(self):
+        Video.objects.bulk_create([Video(course=self.course, title="Adiabatic walkthrough")])
+        self.assertEqual(self.kinds("adiabatic"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.kinds("adiabatic"), ["video"])
+
+    def test_results_link_to_content(self):
+        urls = {hit.kind: hit.url for hit in search.search("entropy")}
+        self.assertEqual(urls["quiz"], reverse("take_quiz", args=[self.quiz.id]))
+        self.assertEqual(urls["unit"], reverse("course_detail", args=[self.course.id]) + "#units")
+
+    def test_snippets_are_escaped(self):
+        with self.change():
+            Video.objects.create(course=self.course, title="<script>entropy</script>")
+        response = self.client.get(reverse("search"), {"q": "entropy"})
+        self.assertContains(response, "&lt;script&gt;<mark>entropy</mark>")
+        self.assertNotContains(response, "<script>entropy")
+
+    def test_pages_of_ranked_results(self):
+        with self.change():
+            for n in range(25):
+                Video.objects.create(course=self.course, title=f"Lecture {n}")
+        first = self.client.get(reverse("api_search"), {"q": "lecture"}).json()
+        second = self.client.get(reverse("api_search"), {"q": "lecture", "after": first["next"]}).json()
+        self.assertEqual((len(first["results"]), len(second["results"])), (20, 5))
+        self.assertIsNone(second["next"])
+        titles = [row["title"] for row in first["results"] + second["results"]]
+        self.assertEqual(len(set(titles)), 25)
+        # For a database backend, the search itself; session and user are cached.
+        with self.assertNumQueries(1 if search.get_backend().transactional else 0):
+            self.client.get(reverse("search"), {"q": "lecture", "after": first["next"]})
+
+
+class InMemorySearchTests(SearchTests):
+    backend = "memory"
+
+
+class AuthCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="ada@example.com", password="pw", full_name="Ada"
+        )
+        StudentProfile.objects.create(user=self.user, coins=5)
+        self.client.force_login(self.user)
+        self.backend = CachedModelBackend()
+
+    def test_logged_in_user_and_profile_cost_no_queries(self):
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertEqual(user.student_profile.coins, 5)
+
+    def test_saves_and_credits_invalidate(self):
+        credit_coins(self.user, 10)
+        self.assertEqual(self.backend.get_user(self.user.pk).student_profile.coins, 15)
+        self.user.full_name = "Ada L."
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).full_name, "Ada L.")
+
+    def test_deactivated_user_is_logged_out(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 302)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.user = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        StudentProfile.objects.create(user=self.user, coins=7)
+        self.course = Course.objects.create(title="Chemistry", faculty=self.user)
+        Video.objects.create(course=self.course, title="Atoms")
+        make_quiz(1, self.course, title="Bonds")
+
+    def get(self, view, *args, user=None):
+        request = RequestFactory().get("/")
+        request.user = user or self.user
+        request.session = {}
+        return async_to_sync(view)(request, *args)
+
+    def test_read_views_render(self):
+        for view, text in [
+            (async_views.dashboard, "Chemistry"),
+            (async_views.lectures, "Atoms"),
+            (async_views.quiz_list, "Bonds"),
+            (async_views.leaderboard, "Your rank: #1"),
+        ]:
+            self.assertContains(self.get(view), text)
+        self.assertContains(self.get(async_views.course_detail, self.course.id), "Atoms")
+
+    def test_anonymous_is_redirected(self):
+        response = self.get(async_views.dashboard, user=AnonymousUser())
+        self.assertEqual(response.status_code, 302)
+
+
+class QuestionImportTests(TestCase):
+    CSV = (
+        "quiz,course_id,description,question,choice_1,choice_2,choice_3,correct\n"
+        "Algebra 1,{course},Basics,2 + 2?,3,4,5,B\n"
+        "Algebra 1,{course},Basics,3 * 3?,9,6,,1\n"
+        "Algebra 1,{course},Basics,Bad row,only one,,,A\n"
+        "Algebra 2,999,,Unknown course,a,b,,a\n"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(title="Maths")
+
+    def test_csv_import_in_batches(self):
+        progress = []
+        result = import_questions(
+            BytesIO(self.CSV.format(course=self.course.id).encode()), "csv",
+            batch_size=2, progress=lambda r: progress.append(r.rows),
+        )
+        self.assertEqual((result.quizzes, result.questions, result.choices), (1, 2, 5))
+        self.assertEqual([line for line, _ in result.errors], [4, 5])
+        self.assertEqual(progress, [2, 4])
+        quiz = Quiz.objects.get(title="Algebra 1")
+        self.assertEqual((quiz.course, quiz.description), (self.course, "Basics"))
+        self.assertEqual(
+            sorted(Choice.objects.filter(is_correct=True).values_list("text", flat=True)),
+            ["4", "9"],
+        )
+
+    def test_jsonl_import_reuses_quiz_and_drops_caches(self):
+        quiz = make_quiz(1, self.course, title="Existing")
+        get_answer_key(quiz.id)
+        lines = [
+            {"quiz": "Existing", "course_id": self.course.id, "question": "New?",
+             "choices": ["yes", "no"], "correct": "yes"},
+            "not json",
+        ]
+        data = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+        result = import_questions(BytesIO(data.encode()), "jsonl")
+        self.assertEqual((result.quizzes, result.questions, result.error_count), (0, 1, 1))
+        self.assertEqual(len(get_answer_key(quiz.id)), 2)
+
+    def test_dry_run_writes_nothing(self):
+        data = self.CSV.format(course=self.course.id).encode()
+        result = import_questions(BytesIO(data), "csv", dry_run=True)
+        self.assertEqual((result.rows, result.error_count), (4, 2))
+        self.assertFalse(Question.objects.exists())
+
+    def test_import_command(self):
+        path = self.tmp_path("bank.csv")
+        with open(path, "w") as fh:
+            fh.write(self.CSV.format(course=self.course.id))
+        out, err = StringIO(), StringIO()
+        call_command("import_questions", path, "--batch-size", "2", stdout=out, stderr=err)
+        self.assertIn("2 rows processed", out.getvalue())
+        self.assertIn("2 questions", out.getvalue())
+        self.assertIn("line 4:", err.getvalue())
+        self.assertEqual(Question.objects.count(), 2)
+
+    def tmp_path(self, name):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, name)
+
+    def test_admin_import_view(self):
+        admin = CustomUser.objects.create_superuser(email="admin@example.com", password="pw")
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile("bank.csv", self.CSV.format(course=self.course.id).encode())
+        response = self.client.post(reverse("admin:lms_question_import"), {"file": upload})
+        self.assertRedirects(response, reverse("admin:lms_question_changelist"))
+        self.assertEqual(Question.objects.count(), 2)
+        self.assertContains(self.client.get(reverse("admin:lms_question_changelist")), "Import questions")
+
+
+class AttemptExportTests(TestCase):
+    def setUp(self):
+        self.staff = CustomUser.objects.create_user(email="staff@example.com", password="pw", is_staff=True)
+        self.course = Course.objects.create(title="Biology")
+        self.quiz = make_quiz(1, self.course, title="Cells")
+        other = make_quiz(1, title="Elsewhere")
+        for score in (20, 60, 90):
+            Attempt.objects.create(user=self.staff, quiz=self.quiz, score=score, coins_earned=2)
+        Attempt.objects.create(user=self.staff, quiz=other, score=10, coins_earned=2)
+
+    def test_filters(self):
+        self.assertEqual(len(list(attempt_rows(course_id=self.course.id))), 3)
+        today = timezone.localdate()
+        self.assertEqual(len(list(attempt_rows(since=today, until=today))), 4)
+        self.assertEqual(len(list(attempt_rows(since=today + datetime.timedelta(days=1)))), 0)
+
+    def test_streaming_csv_endpoint(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("admin_export_attempts"), {"format": "csv", "quiz": self.quiz.id}
+        )
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "user_id", "user_email"])
+        self.assertEqual(len(lines), 4)
+
+    def test_jsonl_command(self):
+        out = StringIO()
+        call_command("export_attempts", "--format", "jsonl", "--course", str(self.course.id), stdout=out)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(sorted(record["score"] for record in records), [20, 60, 90])
+        self.assertEqual(records[0]["quiz_title"], "Cells")
+
+    def test_export_is_staff_only(self):
+        student = CustomUser.objects.create_user(email="student@example.com", password="pw")
+        self.client.force_login(student)
+        self.assertEqual(self.client.get(reverse("admin_export_attempts")).status_code, 302)
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        self.quiz = make_quiz(4, Course.objects.create(title="Physics"))
+        self.students = [
+            CustomUser.objects.create_user(email=f"s{n}@example.com", password="pw") for n in range(2)
+        ]
+        self.staff = CustomUser.objects.create_user(
+            email="staff@example.com", password="pw", is_staff=True
+        )
+
+    def submit(self, user, right):
+        answers = correct_answers(self.quiz)
+        question_ids = sorted(answers, key=int)
+        wrong = Choice.objects.filter(question__quiz=self.quiz, is_correct=False)
+        wrong = dict(wrong.values_list("question_id", "id"))
+        for question_id in question_ids[right:]:
+            answers[question_id] = str(wrong[int(question_id)])
+        with self.captureOnCommitCallbacks(execute=True):
+            return submit_answers(user, self.quiz, answers)
+
+    def test_rollups_wait_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            submit_answers(self.students[0], self.quiz, correct_answers(self.quiz))
+        self.assertFalse(QuizStats.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(QuizStats.objects.get(quiz=self.quiz).attempts, 1)
+
+    def test_failed_rollup_does_not_fail_the_submission(self):
+        with mock.patch.object(analytics, "record_attempt", side_effect=DatabaseError("locked")):
+            with self.assertLogs(level="ERROR"):
+                result = self.submit(self.students[0], 4)
+        self.assertEqual(result.correct, 4)
+        self.assertFalse(QuizStats.objects.exists())
+
+    def test_answers_and_rollups_are_recorded(self):
+        self.submit(self.students[0], 4)
+        self.submit(self.students[1], 1)
+        self.assertEqual(Answer.objects.count(), 8)
+        stats = QuizStats.objects.get(quiz=self.quiz)
+        self.assertEqual((stats.attempts, stats.passed, stats.average_score), (2, 1, 62.5))
+        first = self.quiz.questions.order_by("id").first()
+        self.assertEqual(QuestionStats.objects.get(question=first).difficulty, 1.0)
+        self.assertEqual(
+            sorted(QuestionStats.objects.values_list("correct", flat=True)), [1, 1, 1, 2]
+        )
+
+    def test_foreign_choice_is_not_stored(self):
+        other = make_quiz(1, title="Other")
+        answers = correct_answers(self.quiz)
+        question_id = sorted(answers, key=int)[0]
+        answers[question_id] = str(other.questions.get().choices.first().id)
+        result = submit_answers(self.students[0], self.quiz, answers)
+        self.assertEqual(result.correct, 3)
+        self.assertIsNone(Answer.objects.get(question_id=question_id).choice_id)
+
+    def test_rebuild_matches_incremental_totals(self):
+        self.submit(self.students[0], 3)
+        self.submit(self.students[1], 2)
+        before = list(QuestionStats.objects.order_by("pk").values_list("answered", "correct"))
+        call_command("rebuild_analytics", stdout=StringIO())
+        after = list(QuestionStats.objects.order_by("pk").values_list("answered", "correct"))
+        self.assertEqual(before, after)
+        self.assertEqual(QuizStats.objects.get().score_total, 125)
+
+    def test_staff_pages(self):
+        self.submit(self.students[0], 2)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("admin_analytics"))
+        self.assertContains(response, "50.0%")
+        response = self.client.get(reverse("admin_quiz_analytics", args=[self.quiz.id]))
+        self.assertContains(response, "Question 0")
+
+
+class ItemAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        seed(students=40, courses=1, quizzes_per_course=1, questions_per_quiz=5, attempts=200,
+             answers=True)
+        self.quiz = Quiz.objects.get()
+
+    def matrix(self):
+        rows = {}
+        for attempt_id, question_id, is_correct in Answer.objects.values_list(
+            "attempt_id", "question_id", "is_correct"
+        ):
+            rows.setdefault(attempt_id, {})[question_id] = int(is_correct)
+        question_ids = sorted(self.quiz.questions.values_list("id", flat=True))
+        return np.array([[row[q] for q in question_ids] for row in rows.values()])
+
+    def test_matches_direct_computation(self):
+        matrix = self.matrix()
+        report = analyse_quiz(self.quiz.id)
+        self.assertEqual((report.attempts, report.answers), (200, 1000))
+        for index, item in enumerate(report.questions):
+            rest = matrix.sum(axis=1) - matrix[:, index]
+            self.assertAlmostEqual(item.difficulty, matrix[:, index].mean())
+            self.assertAlmostEqual(item.discrimination, np.corrcoef(matrix[:, index], rest)[0, 1])
+            self.assertAlmostEqual(sum(choice.share for choice in item.choices), 1.0)
+
+    def test_chunking_does_not_change_results(self):
+        self.assertEqual(analyse_quiz(self.quiz.id, chunk_size=7), analyse_quiz(self.quiz.id))
+
+    def test_cached_report_follows_content_edits(self):
+        question = self.quiz.questions.order_by("id").first()
+        get_report(self.quiz.id)
+        wrong = question.choices.filter(is_correct=False).first()
+        wrong.is_correct = True
+        wrong.save()
+        item = get_report(self.quiz.id).questions[0]
+        self.assertTrue(next(c for c in item.choices if c.choice_id == wrong.pk).is_correct)
+
+    def test_staff_view_and_command(self):
+        staff = CustomUser.objects.create_user(email="staff@example.com", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("admin_item_analysis", args=[self.quiz.id]))
+        self.assertContains(response, "200 attempts")
+        out = StringIO()
+        call_command("item_analysis", "--quiz", str(self.quiz.id), "--format", "json", stdout=out)
+        self.assertEqual(len(json.loads(out.getvalue())["questions"]), 5)
+
+
+class SeedingTests(TestCase):
+    def test_seed_is_deterministic_and_skewed(self):
+        counts = seed(students=50, courses=10, quizzes_per_course=2, attempts=300, seed=7)
+        self.assertEqual(counts["enrollments"], StudentProfile.enrolled_courses.through.objects.count())
+        first = list(Attempt.objects.order_by("id").values_list("score", "quiz__title")[:20])
+        popular = list(
+            Course.objects.order_by("id").annotate(n=Count("students")).values_list("n", flat=True)
+        )
+        self.assertGreater(popular[0], popular[-1])
+        self.assertEqual(
+            sum(Attempt.objects.values_list("coins_earned", flat=True)),
+            sum(StudentProfile.objects.values_list("coins", flat=True)),
+        )
+        self.assertGreater(
+            timezone.now() - Attempt.objects.order_by("attempted_at").first().attempted_at,
+            datetime.timedelta(days=1),
+        )
+
+        Attempt.objects.all().delete()
+        seed(students=50, courses=10, quizzes_per_course=2, attempts=300, seed=7)
+        again = list(Attempt.objects.order_by("id").values_list("score", "quiz__title")[:20])
+        self.assertEqual(first, again)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("seed_lms", "--students", "20", "--courses", "3", "--attempts", "50", stdout=out)
+        self.assertIn("50 attempts", out.getvalue())
+        self.assertEqual(Attempt.objects.count(), 50)
+
+
+class ViewBenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        leaderboard.reset()
+        seed(students=30, courses=3, quizzes_per_course=2, attempts=100)
+        self.fixtures = benchmarks.Fixtures()
+
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual(benchmarks.uncovered_routes(self.fixtures.cases()), [])
+
+    def test_routes_stay_within_query_budgets(self):
+        results = benchmarks.run(self.fixtures, repeat=2)
+        self.assertEqual(benchmarks.check(results), [])
+
+    def test_auth_overhead(self):
+        results = benchmarks.auth_overhead(self.fixtures.student, requests=3)
+        self.assertEqual(results["db"]["queries"], 2)
+        self.assertEqual(results["cached_db+user_cache"]["queries"], 0)
+        self.assertEqual(results["signed_cookies+user_cache"]["queries"], 0)
+
+    def test_regressions_against_baseline_fail(self):
+        baseline = {"dashboard": {"queries": 1, "ms": 1.0}}
+        results = {"dashboard": {"queries": 2, "ms": 50.0}}
+        self.assertEqual(len(benchmarks.check(results, baseline)), 2)
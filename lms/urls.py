@@ -1,28 +1,45 @@
 # lms/urls.py
 
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Read-heavy pages are served by their async twins under ASGI.
+read_views = async_views if settings.LMS_ASYNC_VIEWS else views
 
 urlpatterns = [
     path("", views.index, name="index"),
 
-    path("dashboard/", views.dashboard, name="dashboard"),
-    path("course/<int:course_id>/", views.course_detail, name="course_detail"),
+    path("dashboard/", read_views.dashboard, name="dashboard"),
+    path("course/<int:course_id>/", read_views.course_detail, name="course_detail"),
 
-    path("leaderboard/", views.leaderboard, name="leaderboard"),
-    path("lectures/", views.lectures, name="lectures"),
+    path("search/", views.search, name="search"),
+    path("leaderboard/", read_views.leaderboard, name="leaderboard"),
+    path("lectures/", read_views.lectures, name="lectures"),
 
-    path("/quizzes/", views.quiz_list, name="quiz_list"),
+    path("/quizzes/", read_views.quiz_list, name="quiz_list"),
     path("quiz/<int:quiz_id>/take/", views.take_quiz, name="take_quiz"),
     path("quiz/attempt/<int:attempt_id>/", views.quiz_result, name="quiz_result"),
+    path("quiz/submission/<int:submission_id>/", views.submission_status, name="submission_status"),
 
     path("admin-dashboard/", views.admin_dashboard, name="admin_dashboard"),
     path("admin-dashboard/quiz/add/", views.admin_add_quiz, name="admin_add_quiz"),
     path("admin-dashboard/video/upload/", views.admin_upload_video, name="admin_upload_video"),
     path("admin-dashboard/pdf/upload/", views.admin_upload_pdf, name="admin_upload_pdf"),
+    path("admin-dashboard/attempts/export/", views.admin_export_attempts, name="admin_export_attempts"),
+    path("admin-dashboard/analytics/", views.admin_analytics, name="admin_analytics"),
+    path("admin-dashboard/analytics/quiz/<int:quiz_id>/", views.admin_quiz_analytics, name="admin_quiz_analytics"),
+    path("admin-dashboard/analytics/quiz/<int:quiz_id>/items/", views.admin_item_analysis, name="admin_item_analysis"),
 
     path("student-dashboard/", views.student_dashboard, name="student_dashboard"),
 
+    path("api/courses/", views.api_courses, name="api_courses"),
+    path("api/videos/", views.api_videos, name="api_videos"),
+    path("api/pdfs/", views.api_pdfs, name="api_pdfs"),
+    path("api/quizzes/", views.api_quizzes, name="api_quizzes"),
+    path("api/leaderboard/", views.api_leaderboard, name="api_leaderboard"),
+    path("api/search/", views.api_search, name="api_search"),
+
     path("login/", views.StudybunLoginView.as_view(), name="login"),
     path("logout/", views.StudybunLogoutView.as_view(), name="logout"),
     path("signup/", views.signup, name="signup"),
@@ -0,0 +1,59 @@
+# lms/versions.py
+
+"""
+Version stamps for HTTP conditional requests.
+
+``Course.version`` / ``Course.updated_at`` change whenever the course or one
+of its units, videos, PDFs or quizzes is saved or deleted, and a
+``ContentVersion`` row per kind of listed content changes whenever any row of
+that kind does. The signals in ``lms.signals`` call ``bump_course`` and
+``bump``; bulk paths that skip signals call them directly.
+
+Reading a stamp is a single primary-key lookup.
+"""
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ContentVersion, Course, Quiz
+
+COURSES, VIDEOS, PDFS, QUIZZES = "courses", "videos", "pdfs", "quizzes"
+
+
+def bump(*keys):
+    now = timezone.now()
+    for key in keys:
+        updated = ContentVersion.objects.filter(key=key).update(
+            version=F("version") + 1, updated_at=now
+        )
+        if not updated:
+            ContentVersion.objects.get_or_create(key=key, defaults={"version": 1, "updated_at": now})
+
+
+def bump_course(course_id):
+    Course.objects.filter(pk=course_id).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def bump_quiz_content(quiz_id):
+    Quiz.objects.filter(pk=quiz_id).update(content_version=F("content_version") + 1)
+
+
+def list_stamp(*keys):
+    """``(token, last_modified)`` for the given content kinds, in one query."""
+    versions = {
+        key: (version, updated_at)
+        for key, version, updated_at in ContentVersion.objects.filter(key__in=keys).values_list(
+            "key", "version", "updated_at"
+        )
+    }
+    token = ".".join(str(versions.get(key, (0, None))[0]) for key in keys)
+    modified = [updated_at for _, updated_at in versions.values() if updated_at]
+    return token, max(modified) if modified else None
+
+
+def course_stamp(course_id):
+    """``(token, last_modified)`` for one course page, or None if it does not exist."""
+    row = Course.objects.filter(pk=course_id).values_list("version", "updated_at").first()
+    if row is None:
+        return None
+    return str(row[0]), row[1]
@@ -1,20 +1,28 @@
 # lms/views.py
 
+import math
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView, LogoutView
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 
 from .models import (
     Course,
+    CourseCard,
     StudentProfile,
     Quiz,
     Video,
     PDFResource,
-    Choice,
     Attempt,
+    QuizStats,
+    Submission,
 )
 from .forms import (
     SignUpForm,
@@ -23,7 +31,24 @@ from .forms import (
     VideoForm,
     PDFResourceForm,
     QuizForm,
+    AttemptExportForm,
 )
+from core.db import read_replica
+from core.http import conditional_page
+
+from . import leaderboard as ranking
+from . import submission_guard as guard
+from .course_summary import get_course_summary
+from .exports import CONTENT_TYPES, STREAMS, attempt_rows
+from .fragments import rows_version
+from .grading import submit_answers
+from .item_analysis import get_report as get_item_report
+from .pagination import page_payload, paginate, paginate_ranked
+from .papers import get_quiz_paper
+from .search import search as search_index
+from .student_summary import get_student_summary
+from .tasks import accept_submission
+from .versions import COURSES, PDFS, QUIZZES, VIDEOS, course_stamp, list_stamp
 
 
 def index(request):
@@ -31,66 +56,229 @@ def index(request):
 
 
 @login_required
+@read_replica
+@conditional_page(partial(list_stamp, COURSES))
 def dashboard(request):
-    courses = Course.objects.all()
+    courses = paginate(request, CourseCard.objects.all(), ("pk",))
     return render(request, "dashboard.html", {"courses": courses})
 
 
+def course_context(summary):
+    if summary is None:
+        raise Http404("No Course matches the given query.")
+    counts = summary["counts"]
+    return {
+        **summary,
+        "sections": [
+            ("Units", counts["units"]),
+            ("Videos", counts["videos"]),
+            ("PDFs", counts["pdfs"]),
+            ("Quizzes", counts["quizzes"]),
+        ],
+    }
+
+
 @login_required
+@conditional_page(course_stamp)
 def course_detail(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    context = {
-        "course": course,
-        "units": course.units.all(),
-        "videos": course.videos.all(),
-        "pdfs": course.pdfs.all(),
-        "quizzes": course.quizzes.all(),
-        "sections": ["Units", "Videos", "PDFs", "Quizzes"],  
-    }
-    print(f'quizzes: {course.quizzes.all()}')
+    context = course_context(get_course_summary(course_id))
     return render(request, "courses_details.html", context=context)
 
 
+def leaderboard_queryset():
+    return StudentProfile.objects.filter(
+        user__isnull=False, coins__isnull=False
+    ).select_related("user")
 
 
+def leaders_version(leaders):
+    """Fragment version of a leaderboard page: everything its rows display."""
+    return rows_version(leaders, "user_id", "coins", "user.full_name", "user.email")
+
 
 @login_required
+@read_replica
 def leaderboard(request):
-    leaders = StudentProfile.objects.select_related("user").order_by("-coins")
-    return render(request, "leaderboard.html", {"leaders": leaders})
+    rank, coins = ranking.rank_of(request.user.pk)
+    leaders = paginate(
+        request, leaderboard_queryset(), ("-coins", "user_id"), settings.LEADERBOARD_SIZE
+    )
+    context = {
+        "leaders": leaders,
+        "leaders_version": leaders_version(leaders),
+        "my_rank": rank,
+        "my_coins": coins,
+        "neighbours": ranking.around(request.user.pk, rank=rank) if rank else [],
+    }
+    return render(request, "leaderboard.html", context)
 
 
 @login_required
+@read_replica
+@conditional_page(partial(list_stamp, VIDEOS, PDFS))
 def lectures(request):
-    videos = Video.objects.all()
-    pdfs = PDFResource.objects.all()
+    videos = paginate(request, Video.objects.all(), prefix="video_")
+    pdfs = paginate(request, PDFResource.objects.all(), prefix="pdf_")
     return render(request, "lectures.html", {"videos": videos, "pdfs": pdfs})
 
 
 @login_required
+@read_replica
+@conditional_page(partial(list_stamp, QUIZZES))
 def quiz_list(request):
-    quizzes = Quiz.objects.all()
+    quizzes = paginate(request, Quiz.objects.all())
     return render(request, "quiz_list.html", {"quizzes": quizzes})
 
 
+def search_results(request):
+    query = request.GET.get("q", "").strip()
+    return query, paginate_ranked(
+        request, lambda limit, offset: search_index(query, limit, offset)
+    )
+
+
 @login_required
-def take_quiz(request, quiz_id):
-    quiz = Quiz.objects.get(pk=quiz_id)
-    questions = quiz.questions.all()
+def search(request):
+    query, hits = search_results(request)
+    return render(request, "search.html", {"query": query, "hits": hits})
+
+
+@login_required
+def api_search(request):
+    _, hits = search_results(request)
+    return JsonResponse(
+        page_payload(
+            hits,
+            lambda hit: {
+                "kind": hit.kind,
+                "title": hit.title,
+                "snippet": str(hit.snippet),
+                "url": hit.url,
+                "score": round(hit.score, 4),
+            },
+        )
+    )
+
+
+def _resource_json(resource):
+    return {"id": resource.id, "course_id": resource.course_id, "title": resource.title, "url": resource.url}
+
+
+@login_required
+def api_courses(request):
+    page = paginate(request, Course.objects.values("id", "title", "faculty_id", "credits", "semester"))
+    return JsonResponse(page_payload(page, dict))
+
+
+@login_required
+def api_videos(request):
+    return JsonResponse(page_payload(paginate(request, Video.objects.all()), _resource_json))
+
+
+@login_required
+def api_pdfs(request):
+    return JsonResponse(page_payload(paginate(request, PDFResource.objects.all()), _resource_json))
+
+
+@login_required
+def api_quizzes(request):
+    page = paginate(request, Quiz.objects.values("id", "course_id", "title", "description"))
+    return JsonResponse(page_payload(page, dict))
 
+
+@login_required
+def api_leaderboard(request):
+    page = paginate(request, leaderboard_queryset(), ("-coins", "user_id"), settings.LEADERBOARD_SIZE)
+    return JsonResponse(
+        page_payload(
+            page,
+            lambda profile: {
+                "user_id": profile.user_id,
+                "name": profile.user.full_name or profile.user.email,
+                "coins": profile.coins,
+            },
+        )
+    )
+
+
+@login_required
+def take_quiz(request, quiz_id):
     if request.method == "POST":
-        correct = 0
-        for q in questions:
-            selected = request.POST.get(str(q.id))
-            if selected and q.choices.filter(id=selected, is_correct=True).exists():
-                correct += 1
-        score = int((correct / len(questions)) * 100)
-        coins = 10 if score >= 80 else 5 if score >= 50 else 2
-        attempt = Attempt.objects.create(user=request.user, quiz=quiz, score=score, coins_earned=coins)
-        messages.success(request, f"You scored {score}% and earned {coins} coins! 🎉")
-        return redirect("quiz_result", attempt.id)
+        return submit_quiz(request, quiz_id)
+
+    quiz = get_object_or_404(Quiz, pk=quiz_id)
+    context = {
+        "quiz": quiz,
+        "paper": get_quiz_paper(quiz.id),
+        "submission_token": guard.new_token(),
+    }
+    return render(request, "take_quiz.html", context)
+
+
+def submit_quiz(request, quiz_id):
+    user_id = request.user.pk
+    token = guard.request_token(request)
+    # A repeated form costs one cache lookup: no grading, no insert.
+    done = guard.outcome(user_id, quiz_id, token) if token else None
+    if done:
+        return duplicate_redirect(request, done)
+
+    retry_after = guard.submit_rate_limit(user_id)
+    if retry_after:
+        response = HttpResponse("Too many submissions; please wait a moment.", status=429)
+        response["Retry-After"] = str(math.ceil(retry_after))
+        return response
+
+    if token and not guard.claim(user_id, quiz_id, token):
+        return duplicate_redirect(request, guard.PENDING)
+    try:
+        quiz = get_object_or_404(Quiz, pk=quiz_id)
+        if settings.LMS_BACKGROUND_GRADING:
+            submission = accept_submission(request.user, quiz, request.POST, token)
+            response = redirect("submission_status", submission.id)
+        else:
+            result = submit_answers(request.user, quiz, request.POST, token)
+            response = graded_redirect(request, result.attempt)
+    except IntegrityError:
+        # Another worker claimed the token too (the cache claim is not atomic
+        # on every backend); the unique constraint let only one through.
+        done = guard.result_url(user_id, quiz_id, token) if token else None
+        if done is None:
+            raise
+        response = duplicate_redirect(request, done)
+    except Exception:
+        if token:
+            guard.release(user_id, quiz_id, token)
+        raise
+    if token:
+        guard.record(user_id, quiz_id, token, response.url)
+    return response
+
+
+def duplicate_redirect(request, done):
+    if done == guard.PENDING:
+        messages.info(request, "This quiz is already being submitted.")
+        return redirect("student_dashboard")
+    messages.info(request, "This quiz was already submitted.")
+    return redirect(done)
+
+
+def graded_redirect(request, attempt):
+    messages.success(
+        request, f"You scored {attempt.score}% and earned {attempt.coins_earned} coins! 🎉"
+    )
+    return redirect("quiz_result", attempt.id)
+
+
+@login_required
+def submission_status(request, submission_id):
+    submission = get_object_or_404(
+        Submission.objects.select_related("attempt", "quiz"), id=submission_id, user=request.user
+    )
+    if submission.attempt_id:
+        return graded_redirect(request, submission.attempt)
+    return render(request, "submission_pending.html", {"submission": submission})
 
-    return render(request, "take_quiz.html", {"quiz": quiz, "questions": questions})
 
 @login_required
 def quiz_result(request, attempt_id):
@@ -155,9 +343,47 @@ def admin_upload_pdf(request):
     )
 
 
+@user_passes_test(is_staff_user)
+def admin_export_attempts(request):
+    form = AttemptExportForm(request.GET or None)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    data = form.cleaned_data
+    fmt = data["format"]
+    rows = attempt_rows(
+        course_id=data["course"], quiz_id=data["quiz"], since=data["since"], until=data["until"]
+    )
+    response = StreamingHttpResponse(STREAMS[fmt](rows), content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="attempts.{fmt}"'
+    return response
+
+
+@user_passes_test(is_staff_user)
+def admin_analytics(request):
+    stats = paginate(request, QuizStats.objects.select_related("quiz__course"), ("quiz_id",))
+    return render(request, "admin/analytics.html", {"stats": stats})
+
+
+@user_passes_test(is_staff_user)
+def admin_quiz_analytics(request, quiz_id):
+    quiz = get_object_or_404(Quiz.objects.select_related("stats"), pk=quiz_id)
+    questions = quiz.question_stats.select_related("question").order_by("question_id")
+    return render(
+        request, "admin/quiz_analytics.html", {"quiz": quiz, "questions": questions}
+    )
+
+
+@user_passes_test(is_staff_user)
+def admin_item_analysis(request, quiz_id):
+    quiz = get_object_or_404(Quiz, pk=quiz_id)
+    return render(
+        request, "admin/item_analysis.html", {"quiz": quiz, "report": get_item_report(quiz.id)}
+    )
+
+
 @login_required
 def student_dashboard(request):
-    return render(request, "student_dashboard.html")
+    return render(request, "student_dashboard.html", get_student_summary(request.user.pk))
 
 
 class StudybunLoginView(LoginView):
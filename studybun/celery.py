@@ -0,0 +1,16 @@
+"""
+Celery app for studybun, used when CELERY_BROKER_URL is set.
+
+Start a worker with ``celery -A studybun worker``. Background tasks are
+dispatched by ``core.tasks``.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'studybun.settings')
+
+app = Celery('studybun')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -1,5 +1,9 @@
+import os
 from pathlib import Path
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,8 +29,19 @@ INSTALLED_APPS = [
 ]
 AUTH_USER_MODEL = "lms.CustomUser"
 
+# request.user is served from the cache (lms.auth); see lms.signals for
+# what invalidates it.
+AUTHENTICATION_BACKENDS = ['lms.auth.CachedModelBackend']
+
+# SESSION_BACKEND: "cached_db" (cache in front of the session table),
+# "signed_cookies" (no server-side storage; the data is signed, not
+# encrypted, and visible to the client), "cache" or "db".
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "cached_db")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_BACKEND}"
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryProfilerMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # <--
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -44,8 +59,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR /'templates'],  
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compile each template once per process, in development too.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -59,13 +80,99 @@ TEMPLATES = [
 WSGI_APPLICATION = 'studybun.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgres uses the POSTGRES_* variables below; anything else is a
+# local SQLite file (SQLITE_PATH). POSTGRES_REPLICA_HOST adds a "replica"
+# alias that core.db.ReplicaRouter uses for the read-only views.
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+DATABASE_REPLICA = "replica"
+
+
+def postgres_database(host):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get("POSTGRES_DB", "studybun"),
+        'USER': os.environ.get("POSTGRES_USER", "studybun"),
+        'PASSWORD': os.environ.get("POSTGRES_PASSWORD", ""),
+        'HOST': host,
+        'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+        # Persistent connections, checked before reuse.
+        'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
+    pool_size = int(os.environ.get("DB_POOL_SIZE", 0))
+    if pool_size and django.VERSION < (5, 1):
+        raise ImproperlyConfigured(
+            f"DB_POOL_SIZE needs Django 5.1 or later (running {django.get_version()}); "
+            "unset it and use DB_CONN_MAX_AGE."
+        )
+    if pool_size:
+        # psycopg 3 connection pool (needs psycopg[pool]); replaces CONN_MAX_AGE.
+        database['OPTIONS']['pool'] = {"min_size": 2, "max_size": pool_size, "timeout": 10}
+        database['CONN_MAX_AGE'] = 0
+    return database
+
+
+if DB_ENGINE == "postgres":
+    DATABASES = {'default': postgres_database(os.environ.get("POSTGRES_HOST", "localhost"))}
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES[DATABASE_REPLICA] = {
+            **postgres_database(os.environ["POSTGRES_REPLICA_HOST"]),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+
+# Applied to every SQLite connection by core.db.configure_sqlite: WAL lets
+# readers run alongside the single writer, and writers wait for the lock
+# instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,
 }
 
+# Cache
+# CACHE_URL selects the shared cache used by every worker:
+#   redis://host:6379/0, memcached://host:11211, db://table_name (run
+#   "manage.py createcachetable" first), file:///some/dir or locmem://.
+# Left empty it is a file cache in BASE_DIR/.cache, shared by the processes
+# on one machine. Tests and benchmarks get a private cache through
+# core.testing.isolated_cache.
+CACHE_URL = os.environ.get("CACHE_URL", "")
+
+
+def cache_from_url(url):
+    scheme, _, location = url.partition("://")
+    if scheme in ("redis", "rediss"):
+        cache = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    elif scheme == "memcached":
+        cache = {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': location}
+    elif scheme == "db":
+        cache = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': location or 'django_cache'}
+    elif scheme == "locmem":
+        cache = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': location}
+    else:
+        cache = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location or BASE_DIR / '.cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    cache['KEY_PREFIX'] = 'studybun'
+    return cache
+
+
+CACHES = {'default': cache_from_url(CACHE_URL)}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -96,3 +203,42 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "dashboard"
 LOGOUT_REDIRECT_URL = "index"
+
+# Serve the read-heavy LMS pages from lms.async_views (for uvicorn/ASGI)
+LMS_ASYNC_VIEWS = os.environ.get("LMS_ASYNC_VIEWS", "").lower() in ("1", "true", "yes")
+
+# Leaderboard ranks (lms.leaderboard): "redis://..." for a shared sorted set
+# with O(log n) ranks (recommended in production), "memory://" for a
+# single-process one; empty counts them in the database, O(rank) per lookup.
+LEADERBOARD_URL = os.environ.get("LEADERBOARD_URL", os.environ.get("LEADERBOARD_REDIS_URL", ""))
+LEADERBOARD_SIZE = 50
+
+# Full-text search backend (lms.search): "sqlite" (FTS5), "postgres"
+# (tsvector) or "memory"; empty picks the database's own when available.
+LMS_SEARCH_BACKEND = os.environ.get("LMS_SEARCH_BACKEND", "")
+
+# Seconds to keep rendered template fragments (lms.fragments); 0 disables.
+LMS_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("LMS_FRAGMENT_CACHE_TIMEOUT", 60 * 60))
+
+# Update the quiz analytics rollups on every submission; when off, refresh
+# them periodically with "manage.py rebuild_analytics".
+LMS_ANALYTICS_ON_SUBMIT = os.environ.get("LMS_ANALYTICS_ON_SUBMIT", "1") == "1"
+
+# Quiz submissions per student (lms.submission_guard): a burst of
+# LMS_SUBMIT_BURST, refilled at LMS_SUBMIT_PER_MINUTE. Either 0 disables.
+LMS_SUBMIT_BURST = int(os.environ.get("LMS_SUBMIT_BURST", 5))
+LMS_SUBMIT_PER_MINUTE = float(os.environ.get("LMS_SUBMIT_PER_MINUTE", 6))
+
+# Grade quiz submissions in the background (lms.tasks). TASK_BACKEND is one of
+# "celery", "thread", "database" or "immediate"; left empty it is "celery" when
+# CELERY_BROKER_URL is set and "thread" otherwise.
+LMS_BACKGROUND_GRADING = os.environ.get("LMS_BACKGROUND_GRADING", "").lower() in ("1", "true", "yes")
+TASK_BACKEND = os.environ.get("TASK_BACKEND", "")
+TASK_THREADS = int(os.environ.get("TASK_THREADS", 4))
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "")
+CELERY_TASK_ACKS_LATE = True
+
+# Per-request query profiling (core.middleware.QueryProfilerMiddleware).
+# A statement repeated this many times in one request is reported as an N+1.
+PROFILING_REPEAT_THRESHOLD = int(os.environ.get("PROFILING_REPEAT_THRESHOLD", 5))
+PROFILING_SERVER_TIMING = os.environ.get("PROFILING_SERVER_TIMING", "1") == "1"
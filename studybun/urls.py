@@ -3,5 +3,6 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('_profiling/', include('core.urls')),
     path('', include('lms.urls')),
 ]